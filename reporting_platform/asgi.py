@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'reporting_platform.settings')
+# Downloads and exports are served by async views under ASGI (reports.async_views)
+os.environ.setdefault('ASYNC_DOWNLOADS', '1')
 
 application = get_asgi_application()
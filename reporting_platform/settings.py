@@ -42,7 +42,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # Must be high in the list
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'reports.middleware.WhiteNoiseMiddleware',  # WhiteNoise, async-capable for ASGI
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -100,6 +100,53 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'mediafiles')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# -------------------
+# PDF RENDERING
+# -------------------
+# Process-pool size for class-wide PDF generation (/bulk_pdf/ and render_exam_reports)
+REPORT_BULK_WORKERS = int(os.environ.get("REPORT_BULK_WORKERS", "2"))
+# Embed pre-subset Noto Nastaliq Urdu in Urdu PDFs (reports.font_subsets) and where the subsets are cached
+REPORT_FONT_SUBSETS = os.environ.get("REPORT_FONT_SUBSETS", "1") == "1"
+FONT_SUBSET_DIR = os.environ.get("FONT_SUBSET_DIR", os.path.join(BASE_DIR, "font_subsets"))
+# weasyprint (HTML/CSS), reportlab (direct drawing, reports.fast_pdf) or auto (reportlab where possible)
+REPORT_PDF_ENGINE = os.environ.get("REPORT_PDF_ENGINE", "weasyprint")
+# TTF with Arabic presentation forms (e.g. Noto Naskh Arabic) for Urdu in the reportlab engine
+REPORTLAB_URDU_FONT = os.environ.get("REPORTLAB_URDU_FONT") or None
+
+# -------------------
+# CACHING
+# -------------------
+# Redis (or any Redis-protocol server such as Valkey) in production; a shared
+# directory or per-process memory otherwise
+REDIS_URL = os.environ.get("REDIS_URL")
+CACHE_DIR = os.environ.get("CACHE_DIR")
+if REDIS_URL:
+    CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "KEY_PREFIX": "reports",
+    }}
+elif CACHE_DIR:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": CACHE_DIR}}
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "reports"}}
+# Cache GET responses of the catalog endpoints (reports.response_cache). Only
+# with a cache shared by every worker: a write invalidates entries by bumping
+# versions in the cache, which per-process memory would hide from the other
+# workers until the TTL. API_RESPONSE_CACHE=0 turns it off anyway.
+API_RESPONSE_CACHE = bool(REDIS_URL or CACHE_DIR) and os.environ.get("API_RESPONSE_CACHE", "1") == "1"
+
+# -------------------
+# ASYNC SERVING
+# -------------------
+# Serve PDF downloads and exports from async views (reports.async_views); on by
+# default under reporting_platform.asgi (SERVER_MODE=asgi, see gunicorn.conf.py)
+ASYNC_DOWNLOADS = os.environ.get("ASYNC_DOWNLOADS", "0") == "1"
+# Per-server-process pool for renders requested by async views (reports.render_pool):
+# renders running at once (0 = in a thread), and how many more may wait before a 503
+REPORT_RENDER_POOL_WORKERS = int(os.environ.get("REPORT_RENDER_POOL_WORKERS", "2"))
+REPORT_RENDER_POOL_QUEUE = int(os.environ.get("REPORT_RENDER_POOL_QUEUE", "8"))
+
 # -------------------
 # CORS CONFIGURATION
 # -------------------
@@ -114,7 +161,7 @@ CORS_ALLOW_CREDENTIALS = True
 # -------------------
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "reports.authentication.TutorJWTAuthentication",
     ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
@@ -124,6 +171,8 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "AUTH_HEADER_TYPES": ("Bearer",),
+    # Adds the tutor_id claim used for per-tutor scoping
+    "TOKEN_OBTAIN_SERIALIZER": "reports.authentication.TutorTokenObtainPairSerializer",
 }
 
 # Security settings for production
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     Tutor, Student, Subject, Exam,
-    Report, PerformanceEntry, MessageLog
+    Report, PerformanceEntry, MessageLog, RenderJob
 )
 
 # ----------------------------
@@ -46,6 +46,8 @@ class StudentAdmin(admin.ModelAdmin):
 @admin.register(Subject)
 class SubjectAdmin(admin.ModelAdmin):
     list_display = ('name', 'name_urdu', 'category')
+    # name_urdu is auto-filled on save; correct translations right in the list
+    list_editable = ('name_urdu',)
     search_fields = ('name', 'name_urdu', 'category')
     ordering = ('name',)
 
@@ -65,8 +67,10 @@ class ExamAdmin(admin.ModelAdmin):
 # ----------------------------
 @admin.register(Report)
 class ReportAdmin(admin.ModelAdmin):
-    list_display = ('student', 'tutor', 'exam', 'report_date')
+    list_display = ('student', 'tutor', 'exam', 'report_date', 'finalized_at')
     search_fields = ('student__full_name', 'exam__name', 'tutor__full_name')
+    # Set by the finalize action; edits to a finalized report re-render its PDFs (reports.renditions)
+    readonly_fields = ('finalized_at', 'snapshot_version')
     list_filter = ('report_date', 'exam__exam_type')
     date_hierarchy = 'report_date'
     list_select_related = ('student', 'tutor', 'exam')
@@ -114,3 +118,14 @@ class MessageLogAdmin(admin.ModelAdmin):
     search_fields = ('student__full_name', 'message')
     date_hierarchy = 'timestamp'
     list_select_related = ('student',)
+
+# ----------------------------
+# RenderJob
+# ----------------------------
+@admin.register(RenderJob)
+class RenderJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'report', 'lang', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'lang')
+    readonly_fields = ('error', 'attempts', 'created_at', 'started_at', 'finished_at')
+    list_select_related = ('report__student', 'report__exam')
+    raw_id_fields = ('report',)
@@ -0,0 +1,101 @@
+"""
+Set-based analytics over PerformanceEntry.
+
+Percentages and aggregates are computed by the database (annotations, window
+functions) and only the needed columns come back, so
+these helpers answer in one query regardless of how much history a student has.
+"""
+
+from django.db.models import Case, Count, F, FloatField, Value, When, Window
+from django.db.models.functions import Lag
+from django.db.models import Avg, Max, Min
+
+from .models import PerformanceEntry
+
+
+def percentage_expression(obtained="marks_obtained", total="total_marks"):
+    """SQL equivalent of PerformanceEntry.percentage (0 when total is 0)."""
+    return Case(
+        When(**{total: 0}, then=Value(0.0)),
+        default=F(obtained) * 100.0 / F(total),
+        output_field=FloatField(),
+    )
+
+
+PROGRESS_FIELDS = (
+    "subject__name", "report__exam__name", "report__exam__exam_type", "report__exam__date",
+    "marks_obtained", "total_marks", "pct", "prev_pct", "rank", "ranked_of",
+    "subject_min", "subject_max", "subject_avg", "subject_count",
+)
+
+
+def student_progress_rows(student_id, session_id=None, exam_type=None, date_from=None, date_to=None):
+    """
+    One query: every entry of the student (optionally filtered) with its
+    percentage, previous percentage in the same subject, stored subject rank
+    (within the exam's grade-level cohort; None until ranked) and per-subject
+    min/max/mean/count windows. Returns a list of dicts.
+    """
+    qs = PerformanceEntry.objects.filter(report__student_id=student_id)
+    if session_id:
+        qs = qs.filter(report__exam__session_id=session_id)
+    if exam_type:
+        qs = qs.filter(report__exam__exam_type=exam_type)
+    if date_from:
+        qs = qs.filter(report__exam__date__gte=date_from)
+    if date_to:
+        qs = qs.filter(report__exam__date__lte=date_to)
+
+    by_subject = [F("subject_id")]
+    chronological = [F("report__exam__date").asc(), F("report__exam_id").asc()]
+    qs = (
+        qs.annotate(pct=percentage_expression())
+        .annotate(
+            prev_pct=Window(Lag("pct"), partition_by=by_subject, order_by=chronological),
+            subject_min=Window(Min("pct"), partition_by=by_subject),
+            subject_max=Window(Max("pct"), partition_by=by_subject),
+            subject_avg=Window(Avg("pct"), partition_by=by_subject),
+            subject_count=Window(Count("id"), partition_by=by_subject),
+            # Stored per grade-level cohort by reports.ranking, so this matches the printed report
+            rank=F("subject_rank"),
+            ranked_of=F("subject_cohort_size"),
+        )
+        .order_by("report__exam__date", "report__exam_id", "subject__name")
+    )
+    return [dict(zip(PROGRESS_FIELDS, row)) for row in qs.values_list(*PROGRESS_FIELDS)]
+
+
+def trend_slope(values):
+    """Least-squares slope of `values` against their position (percentage points per exam)."""
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    num = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    den = sum((x - mean_x) ** 2 for x in range(n))
+    return num / den
+
+
+def summarize_progress(rows):
+    """Per-subject summary from student_progress_rows() output (rows are chronological)."""
+    series = {}
+    for row in rows:
+        series.setdefault(row["subject__name"], []).append(row)
+
+    summary = {}
+    for subject, points in series.items():
+        last = points[-1]
+        summary[subject] = {
+            "count": last["subject_count"],
+            "min": last["subject_min"],
+            "max": last["subject_max"],
+            "mean": last["subject_avg"],
+            "trend_slope": trend_slope([p["pct"] for p in points]),
+            "latest": last["pct"],
+            "previous": last["prev_pct"],
+            "delta": None if last["prev_pct"] is None else last["pct"] - last["prev_pct"],
+            "latest_rank": last["rank"],
+            "latest_ranked_of": last["ranked_of"],
+        }
+    return summary
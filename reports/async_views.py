@@ -0,0 +1,131 @@
+"""
+Async versions of the download and export endpoints, for ASGI deployments.
+
+With ASYNC_DOWNLOADS on (the default under reporting_platform.asgi) these
+views answer the same URLs as the DRF actions they mirror:
+
+  GET /api/reports/<id>/pdf/?lang=en|ur           ReportViewSet.pdf
+  GET /api/render-jobs/<id>/download/             RenderJobViewSet.download
+  GET /api/exam-sessions/<id>/export/?output=     ExamSessionViewSet.export
+
+A slow client or a long render then no longer holds a server worker: a render
+runs in the bounded process pool of reports.render_pool while the event loop
+serves other requests, and exports are fetched in batches from a thread and
+streamed asynchronously. Authentication (JWT) and per-tutor scoping are the
+same as the API's; responses are built by the same helpers as the DRF views.
+"""
+
+import logging
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
+
+from .authentication import TutorJWTAuthentication
+from .models import ExamSession, RenderJob, Report
+from .render_pool import RenderPoolBusy, run_render
+from .renditions import current_rendition, render_rendition
+from .serializers import RenderJobSerializer
+from .scoping import scope_queryset, scope_tutor_id, tutor_id_for
+from .utils import normalize_lang
+from .views import (
+    export_response, job_file_response, rendition_response, report_file_response, session_export_rows,
+)
+
+logger = logging.getLogger(__name__)
+
+# Export rows fetched per hop to the database thread
+EXPORT_BATCH_ROWS = 500
+RETRY_AFTER_SECONDS = 5
+
+
+async def _authenticate(request):
+    """(user, None), or (None, 401 response) like DRF's JWT authentication."""
+    try:
+        result = await sync_to_async(TutorJWTAuthentication().authenticate)(request)
+    except AuthenticationFailed as e:
+        detail = e.detail if isinstance(e.detail, dict) else {'detail': e.detail}
+        return None, JsonResponse(detail, status=401)
+    if result is None:
+        return None, JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    user = result[0]
+    # Cached on the user, so scope_queryset() below runs no query of its own
+    await sync_to_async(tutor_id_for)(user)
+    return user, None
+
+
+def _not_found():
+    return JsonResponse({'detail': 'No such object.'}, status=404)
+
+
+async def _aiter_rows(rows):
+    """Consume a sync row iterator (a DB cursor) in batches on the request's DB thread."""
+    rows = iter(rows)
+    take = sync_to_async(lambda: list(islice(rows, EXPORT_BATCH_ROWS)))
+    while True:
+        batch = await take()
+        if not batch:
+            return
+        yield "".join(batch)
+
+
+async def report_pdf(request, pk):
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    report = await scope_queryset(Report.objects.all(), user).filter(pk=pk).afirst()
+    if report is None:
+        return _not_found()
+    if not report.finalized_at:
+        if not report.pdf_file:
+            return JsonResponse({'detail': 'PDF not generated for this report.'}, status=404)
+        return report_file_response(report, await sync_to_async(report.pdf_file.open)('rb'))
+
+    lang = normalize_lang(request.GET.get('lang'))
+    rendition = await sync_to_async(current_rendition)(report, lang)
+    fresh = rendition is not None
+    if not fresh:
+        try:
+            rendition = await run_render(render_rendition, report.pk, lang)
+        except RenderPoolBusy:
+            response = JsonResponse({'detail': 'All PDF renderers are busy; retry shortly.'}, status=503)
+            response['Retry-After'] = str(RETRY_AFTER_SECONDS)
+            return response
+        except Exception as e:
+            logger.exception("PDF generation failed for report=%s lang=%s", pk, lang)
+            return JsonResponse({'error': str(e)}, status=500)
+    pdf_file = await sync_to_async(rendition.file.open)('rb')
+    return rendition_response(report, rendition, pdf_file, lang, fresh)
+
+
+async def render_job_download(request, pk):
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    job = await scope_queryset(RenderJob.objects.select_related('report'), user).filter(pk=pk).afirst()
+    if job is None:
+        return _not_found()
+    if job.status != RenderJob.DONE:
+        return JsonResponse(RenderJobSerializer(job).data, status=409)
+    report = job.report
+    if not report.pdf_file:
+        return JsonResponse({'detail': 'Rendered file is missing.'}, status=404)
+    return job_file_response(report, job, await sync_to_async(report.pdf_file.open)('rb'))
+
+
+async def session_export(request, pk):
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    if not await ExamSession.objects.filter(pk=pk).aexists():
+        return _not_found()
+    try:
+        tutor_id = scope_tutor_id(user)
+    except PermissionDenied as e:
+        return JsonResponse({'detail': e.detail}, status=403)
+    export = session_export_rows(pk, request.GET, tutor_id)
+    if export is None:
+        return JsonResponse({'detail': "output must be csv or jsonl."}, status=400)
+    rows, output, content_type = export
+    return export_response(_aiter_rows(rows), pk, output, content_type)
@@ -0,0 +1,31 @@
+"""
+JWT authentication that carries the user's tutor id in the token.
+
+Tokens issued by /api/token/ get a "tutor_id" claim (copied to access tokens on
+refresh), and TutorJWTAuthentication caches it on request.user, so scoping
+(reports.scoping) never needs a query to find the requesting tutor. Tokens
+without a tutor id in the claim fall back to one lookup per request.
+"""
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from .scoping import TUTOR_ID_CLAIM, cache_tutor_id, tutor_id_for
+
+
+class TutorTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[TUTOR_ID_CLAIM] = tutor_id_for(user)
+        return token
+
+
+class TutorJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        # No claim (or a user who signed up as a tutor after logging in): look it up
+        tutor_id = validated_token.get(TUTOR_ID_CLAIM)
+        if tutor_id is not None:
+            cache_tutor_id(user, tutor_id)
+        return user
@@ -0,0 +1,182 @@
+"""
+Class-wide PDF generation for an Exam or ExamSession.
+
+All report data is fetched up front in one query (reports joined with their
+snapshots, see reports.snapshots), then rendered across a process pool. Each
+pool worker builds its render context (stylesheets, fonts, template) once at
+start-up and reuses it for every document. Results are either streamed as a ZIP or laid out into one
+merged PDF.
+"""
+
+import logging
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.db import connections
+from django.template.loader import get_template
+from django.utils.text import get_valid_filename
+
+from .models import Report
+from .render_context import warm_render_context
+from .snapshots import attach_snapshots
+from .font_subsets import FONT_FAMILY_PLACEHOLDER, FONT_URL_PLACEHOLDER, urdu_font_url, with_urdu_font
+from .utils import TOC_TEMPLATE, exam_display, normalize_lang, render_html_document, render_report_html
+
+logger = logging.getLogger(__name__)
+
+
+def bulk_reports(exam_id=None, session_id=None, student_id=None, report_ids=None, tutor_id=None):
+    """
+    Reports for an exam, a whole session, a student (optionally within a
+    session) or an explicit list of ids, with everything the template needs.
+    `tutor_id` keeps only that tutor's students (reports.scoping).
+    One query (reports + snapshots) however many reports/entries there are,
+    plus two when some reports have no snapshot yet.
+    """
+    if exam_id is None and session_id is None and student_id is None and report_ids is None:
+        raise ValueError("Pass exam_id, session_id, student_id or report_ids.")
+    qs = Report.objects.select_related("snapshot")
+    if exam_id is not None:
+        qs = qs.filter(exam_id=exam_id)
+    if session_id is not None:
+        qs = qs.filter(exam__session_id=session_id)
+    if student_id is not None:
+        qs = qs.filter(student_id=student_id)
+    if report_ids is not None:
+        qs = qs.filter(pk__in=report_ids)
+    if tutor_id is not None:
+        qs = qs.filter(student__tutor_id=tutor_id)
+    return attach_snapshots(list(qs.order_by("exam__date", "student__full_name", "id")))
+
+
+def report_filename(report, lang):
+    return get_valid_filename(f"{report.student.full_name}_{report.pk}_{normalize_lang(lang)}.pdf")
+
+
+def _init_bulk_worker():
+    import django
+    django.setup()
+    connections.close_all()
+    warm_render_context()
+
+
+def _render_one(report, entries, lang):
+    """Pool task: returns (report_id, pdf_bytes)."""
+    # Imported lazily: pdf_cache pulls in the template loader, which needs django.setup()
+    from .pdf_cache import get_or_render_pdf
+    pdf_bytes, _, _ = get_or_render_pdf(report, entries, lang)
+    return report.pk, pdf_bytes
+
+
+def iter_rendered(reports, lang='en', workers=2, progress=None):
+    """
+    Yield (report, pdf_bytes) as renders finish.
+    `progress(done, total, report)` is called after each document.
+    workers <= 1 renders in-process (handy for tests and tiny classes).
+    """
+    lang = normalize_lang(lang)
+    total = len(reports)
+    by_id = {r.pk: r for r in reports}
+    done = 0
+
+    if workers <= 1 or total <= 1:
+        for report in reports:
+            _, pdf_bytes = _render_one(report, list(report.entries.all()), lang)
+            done += 1
+            if progress:
+                progress(done, total, report)
+            yield report, pdf_bytes
+        return
+
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_bulk_worker) as pool:
+        futures = [pool.submit(_render_one, r, list(r.entries.all()), lang) for r in reports]
+        for future in as_completed(futures):
+            report_id, pdf_bytes = future.result()
+            report = by_id[report_id]
+            done += 1
+            if progress:
+                progress(done, total, report)
+            yield report, pdf_bytes
+
+
+class _ZipStream:
+    """Write-only sink for ZipFile; hands finished chunks to the response generator."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return b"".join(chunks)
+
+
+def stream_zip(rendered, lang='en'):
+    """Turn (report, pdf_bytes) pairs into ZIP bytes chunks, one archive member at a time."""
+    sink = _ZipStream()
+    # PDFs are already compressed; storing avoids burning CPU for ~0% gain
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for report, pdf_bytes in rendered:
+            archive.writestr(report_filename(report, lang), pdf_bytes)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _toc_html(reports, documents, lang, first_page, font_url):
+    items, page = [], first_page
+    for report, document in zip(reports, documents):
+        items.append({"report": report, "exam_display": exam_display(report.exam), "page": page})
+        page += len(document.pages)
+    html = get_template(TOC_TEMPLATE).render({
+        "items": items, "lang": lang,
+        "urdu_font_url": FONT_URL_PLACEHOLDER, "urdu_font_family": FONT_FAMILY_PLACEHOLDER,
+    })
+    return with_urdu_font(html, font_url)
+
+
+def render_merged_pdf(reports, lang='en', progress=None, toc=False):
+    """
+    Lay out every report and write a single PDF. Runs in-process because laid-out
+    WeasyPrint documents can't cross process boundaries.
+
+    All pages go through one write_pdf(), so the fonts (one Urdu subset chosen
+    for the whole set) and stylesheets are embedded once. With toc=True a
+    contents page listing each report's first page (linked) comes first; every
+    report heading is also a PDF bookmark.
+    """
+    lang = normalize_lang(lang)
+    if not reports:
+        return b""
+    htmls = [render_report_html(report, list(report.entries.all()), lang, font_url=FONT_URL_PLACEHOLDER)
+             for report in reports]
+    font_url = ""
+    if lang == "ur":
+        # One font for every page (the smallest cached subset covering all of them)
+        font_url = urdu_font_url(set().union(*map(set, htmls)))
+        htmls = [with_urdu_font(html, font_url) for html in htmls]
+
+    documents = []
+    for done, (report, html) in enumerate(zip(reports, htmls), start=1):
+        documents.append(render_html_document(html, lang))
+        if progress:
+            progress(done, len(reports), report)
+
+    pages = [page for document in documents for page in document.pages]
+    if toc:
+        # The contents may itself run over several pages: lay it out again until the
+        # page numbers it prints assume its actual length. Larger numbers never make
+        # it shorter, so the length only grows and this ends (usually after one pass).
+        toc_pages = 1
+        toc_document = render_html_document(_toc_html(reports, documents, lang, toc_pages + 1, font_url), lang)
+        while len(toc_document.pages) != toc_pages:
+            toc_pages = len(toc_document.pages)
+            toc_document = render_html_document(_toc_html(reports, documents, lang, toc_pages + 1, font_url), lang)
+        pages = list(toc_document.pages) + pages
+    return documents[0].copy(pages).write_pdf()
@@ -0,0 +1,101 @@
+"""
+Streaming export of every result (PerformanceEntry) of an ExamSession.
+
+One query reads the session's reports with their snapshots (reports.snapshots)
+as plain tuples (values_list) with .iterator(chunk_size=...), so rows are
+encoded and sent as they arrive instead of building the whole result set.
+Reports without a current snapshot are read from the live tables, one batch
+per chunk.
+"""
+
+import csv
+import json
+from itertools import islice
+
+from .models import Report
+from .snapshots import SNAPSHOT_SCHEMA, entry_rows, live_reports, snapshot_data
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (output column, path in the row's snapshot; "entry" is the result's entry)
+COLUMNS = (
+    ("session", "session"),
+    ("exam_id", "exam.id"),
+    ("exam", "exam.name"),
+    ("exam_type", "exam.exam_type"),
+    ("exam_date", "exam.date"),
+    ("report_id", "report_id"),
+    ("student_id", "student.id"),
+    ("student", "student.full_name"),
+    ("grade_level", "student.grade_level"),
+    ("tutor", "tutor.full_name"),
+    ("subject", "entry.subject"),
+    ("marks_obtained", "entry.marks_obtained"),
+    ("total_marks", "entry.total_marks"),
+    ("percentage", "entry.percentage"),
+)
+URDU_COLUMNS = (
+    ("student_urdu", "student.full_name_urdu"),
+    ("tutor_urdu", "tutor.full_name_urdu"),
+    ("subject_urdu", "entry.subject_urdu"),
+)
+
+
+def export_columns(urdu=False):
+    return COLUMNS + URDU_COLUMNS if urdu else COLUMNS
+
+
+def _getter(path):
+    section, _, key = path.partition(".")
+    if not key:
+        return lambda row: row[section]
+    return lambda row: row[section][key]
+
+
+def session_results(session_id, urdu=False, chunk_size=EXPORT_CHUNK_SIZE, tutor_id=None):
+    """
+    Lazily yield one tuple per entry of the session, in export_columns() order
+    (by exam date, exam, report, then subject name).
+    `tutor_id` limits the export to that tutor's students.
+    """
+    getters = [_getter(path) for _, path in export_columns(urdu)]
+    qs = Report.objects.filter(exam__session_id=session_id)
+    if tutor_id is not None:
+        qs = qs.filter(student__tutor_id=tutor_id)
+    rows = (
+        qs.order_by("exam__date", "exam_id", "id")
+        .values_list("id", "exam__session__name", "snapshot__schema", "snapshot__data")
+        .iterator(chunk_size=chunk_size)
+    )
+    while batch := list(islice(rows, chunk_size)):
+        missing = [report_id for report_id, _, schema, _ in batch if schema != SNAPSHOT_SCHEMA]
+        live = {r.pk: snapshot_data(r, list(r.entries.all())) for r in live_reports(missing)} if missing else {}
+        for report_id, session, _, data in batch:
+            data = live.get(report_id, data)
+            if data is None:
+                continue  # deleted since the chunk was read
+            row = {**data, "session": session, "report_id": report_id}
+            for entry in sorted(entry_rows(data), key=lambda e: e["subject"]):
+                row["entry"] = entry
+                yield tuple(get(row) for get in getters)
+
+
+class _Echo:
+    """csv.writer target that hands each encoded line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(session_id, urdu=False, tutor_id=None):
+    writer = csv.writer(_Echo())
+    # BOM so Excel opens Urdu text as UTF-8
+    yield "\ufeff" + writer.writerow([name for name, _ in export_columns(urdu)])
+    for row in session_results(session_id, urdu, tutor_id=tutor_id):
+        yield writer.writerow(row)
+
+
+def iter_jsonl(session_id, urdu=False, tutor_id=None):
+    names = [name for name, _ in export_columns(urdu)]
+    for row in session_results(session_id, urdu, tutor_id=tutor_id):
+        yield json.dumps(dict(zip(names, row)), ensure_ascii=False, default=str) + "\n"
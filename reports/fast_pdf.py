@@ -0,0 +1,312 @@
+"""
+ReportLab fast path for the standard report layout.
+
+Almost every report is a few header lines plus one marks table, which this
+module draws straight onto a ReportLab canvas instead of laying out HTML/CSS
+with WeasyPrint. The text comes from report_blocks(), which mirrors
+report_template.html line for line (same labels, number/date formatting and
+Urdu names), so both engines print the same content.
+
+Urdu is reshaped (arabic_reshaper) and put in visual order (python-bidi)
+before drawing, since ReportLab does no OpenType shaping. That needs a font
+that maps the Arabic presentation forms, e.g. Noto Naskh Arabic or DejaVu Sans,
+set with REPORTLAB_URDU_FONT. Noto Nastaliq only works through GSUB, so it
+can't be used here. Reports the fast path can't draw faithfully raise
+FastPathUnavailable: an Urdu report with no suitable font, English text
+outside the built-in Helvetica's character set, or a table row too tall for
+one page.
+"""
+
+import io
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import List
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.formats import date_format
+
+from .localization import format_decimal, localize_marks_table, to_urdu_digits, urdu_date
+from .utils import _urdu_subject_name, exam_display, normalize_lang
+
+logger = logging.getLogger(__name__)
+
+URDU_FONT_NAME = "ReportUrdu"
+
+# report_template.html in points (1px = 0.75pt): 40px padding, 14px text, 18px heading
+PAGE_MARGIN = 30
+FONT_SIZE = 10.5
+HEADING_SIZE = 13.5
+LINE_GAP = 6
+CELL_PAD_X = 7.5
+CELL_PAD_Y = 6
+BORDER_GREY = 0xAA / 255
+# Subject column first, then marks, total, percentage
+COLUMN_WIDTHS = (0.4, 0.2, 0.2, 0.2)
+
+
+class FastPathUnavailable(Exception):
+    """The report can't be drawn faithfully by the ReportLab engine."""
+
+
+@dataclass
+class ReportBlocks:
+    """The text of one report, in reading order, exactly as the template prints it."""
+    lang: str
+    heading: str
+    lines: List[str] = field(default_factory=list)
+    header: List[str] = field(default_factory=list)
+    rows: List[List[str]] = field(default_factory=list)
+
+    def texts(self):
+        yield self.heading
+        yield from self.lines
+        yield from self.header
+        for row in self.rows:
+            yield from row
+
+
+def _summary(report):
+    try:
+        return report.summary
+    except ObjectDoesNotExist:
+        return None
+
+
+def report_blocks(report, entries, lang="en"):
+    """Build the ReportBlocks for `report` (student/tutor/exam/summary loaded) and `entries`."""
+    lang = normalize_lang(lang)
+    summary = _summary(report)
+    ranked = summary is not None and summary.class_rank
+    exam = exam_display(report.exam)
+
+    if lang == "ur":
+        blocks = ReportBlocks(
+            lang,
+            f"رپورٹ برائے {report.student.full_name_urdu or report.student.full_name}",
+            [
+                f"استاد: {report.tutor.full_name_urdu or report.tutor.full_name}",
+                f"امتحان: {exam}",
+                f"تاریخ: {urdu_date(report.report_date)}",
+            ],
+            ["مضمون", "حاصل کردہ نمبر", "کل نمبر", "فیصد"],
+        )
+        if ranked:
+            blocks.lines.append(
+                f"جماعت میں پوزیشن: {to_urdu_digits(summary.class_rank)} / {to_urdu_digits(summary.cohort_size)}"
+            )
+        if report.remarks:
+            blocks.lines.append(f"تبصرہ: {report.remarks}")
+        blocks.rows = [
+            [row["subject"], row["marks_obtained"], row["total_marks"], f"{row['percentage']}%"]
+            for row in localize_marks_table(entries, _urdu_subject_name)
+        ]
+        return blocks
+
+    blocks = ReportBlocks(
+        lang,
+        f"Report for {report.student.full_name}",
+        [
+            f"Tutor: {report.tutor.full_name}",
+            f"Exam: {exam}",
+            f"Date: {date_format(report.report_date)}",
+        ],
+        ["Subject", "Marks", "Total", "Percentage"],
+    )
+    if ranked:
+        blocks.lines.append(f"Position in class: {summary.class_rank} / {summary.cohort_size}")
+    if report.remarks:
+        blocks.lines.append(f"Remarks: {report.remarks}")
+    blocks.rows = [
+        [e.subject.name, str(e.marks_obtained), str(e.total_marks), f"{format_decimal(e.percentage, 2)}%"]
+        for e in entries
+    ]
+    return blocks
+
+
+# ---------------------------------------------------------------------------
+# Fonts
+# ---------------------------------------------------------------------------
+
+_font_lock = threading.Lock()
+_urdu_font = None  # (path, set of mapped code points) once registered
+
+
+def _register_urdu_font():
+    """Register REPORTLAB_URDU_FONT once per process; returns its code points (None if unset)."""
+    global _urdu_font
+    path = getattr(settings, "REPORTLAB_URDU_FONT", None)
+    if not path:
+        return None
+    if _urdu_font is not None and _urdu_font[0] == path:
+        return _urdu_font[1]
+    with _font_lock:
+        if _urdu_font is None or _urdu_font[0] != path:
+            from reportlab.pdfbase import pdfmetrics
+            from reportlab.pdfbase.ttfonts import TTFont
+
+            font = TTFont(URDU_FONT_NAME, path)
+            pdfmetrics.registerFont(font)
+            _urdu_font = (path, frozenset(font.face.charToGlyph))
+    return _urdu_font[1]
+
+
+def _visual(text):
+    """Urdu/Arabic text shaped and reordered for left-to-right drawing."""
+    import arabic_reshaper
+    from bidi.algorithm import get_display
+
+    return get_display(arabic_reshaper.reshape(text))
+
+
+def _check_drawable(blocks):
+    texts = list(blocks.texts())
+    if blocks.lang == "en":
+        try:
+            "".join(texts).encode("cp1252")  # Helvetica's WinAnsi encoding
+        except UnicodeEncodeError:
+            raise FastPathUnavailable("English text outside the built-in font's character set")
+        return
+    codepoints = _register_urdu_font()
+    if codepoints is None:
+        raise FastPathUnavailable("REPORTLAB_URDU_FONT is not set")
+    missing = {c for c in _visual("".join(texts)) if not c.isspace() and ord(c) not in codepoints}
+    if missing:
+        raise FastPathUnavailable(f"REPORTLAB_URDU_FONT lacks {len(missing)} glyph(s) for this report")
+
+
+# ---------------------------------------------------------------------------
+# Drawing
+# ---------------------------------------------------------------------------
+
+class _Writer:
+    """Cursor over a canvas that draws LTR or RTL lines, wrapping and paging as needed."""
+
+    def __init__(self, canvas, lang, page_size):
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+
+        self.canvas = canvas
+        self.rtl = lang == "ur"
+        self.width, self.height = page_size
+        self.left = PAGE_MARGIN
+        self.right = self.width - PAGE_MARGIN
+        self.y = self.height - PAGE_MARGIN
+        self.regular = URDU_FONT_NAME if self.rtl else "Helvetica"
+        self.bold = URDU_FONT_NAME if self.rtl else "Helvetica-Bold"
+        self.string_width = stringWidth
+        # Nastaliq-style scripts need taller lines than Latin text
+        self.leading = 1.9 if self.rtl else 1.3
+
+    def text_width(self, text, font, size):
+        return self.string_width(_visual(text) if self.rtl else text, font, size)
+
+    def wrap(self, text, font, size, width):
+        """Split logical `text` into lines no wider than `width` (before reordering)."""
+        lines, current = [], ""
+        for word in text.split():
+            candidate = f"{current} {word}" if current else word
+            if current and self.text_width(candidate, font, size) > width:
+                lines.append(current)
+                current = word
+            else:
+                current = candidate
+        return lines + [current] if current else lines or [""]
+
+    def draw(self, text, x_left, x_right, y, font, size):
+        self.canvas.setFont(font, size)
+        if self.rtl:
+            self.canvas.drawRightString(x_right, y, _visual(text))
+        else:
+            self.canvas.drawString(x_left, y, text)
+
+    def new_page(self):
+        self.canvas.showPage()
+        self.y = self.height - PAGE_MARGIN
+
+    def paragraph(self, text, font, size, space_after):
+        line_height = size * self.leading
+        for line in self.wrap(text, font, size, self.right - self.left):
+            if self.y - line_height < PAGE_MARGIN:
+                self.new_page()
+            self.y -= line_height
+            self.draw(line, self.left, self.right, self.y + size * 0.3, font, size)
+        self.y -= space_after
+
+    def columns(self):
+        """(x_left, x_right) of each column in reading order (mirrored for RTL)."""
+        total = self.right - self.left
+        edges, x = [], self.left
+        for fraction in COLUMN_WIDTHS:
+            edges.append((x, x + total * fraction))
+            x += total * fraction
+        if self.rtl:
+            edges = [(self.left + self.right - b, self.left + self.right - a) for a, b in edges]
+        return edges
+
+    def row(self, cells, font):
+        columns = self.columns()
+        wrapped = [
+            self.wrap(cell, font, FONT_SIZE, (b - a) - 2 * CELL_PAD_X) for cell, (a, b) in zip(cells, columns)
+        ]
+        line_height = FONT_SIZE * self.leading
+        height = max(len(lines) for lines in wrapped) * line_height + 2 * CELL_PAD_Y
+        if self.y - height < PAGE_MARGIN:
+            return False
+        top = self.y
+        for lines, (a, b) in zip(wrapped, columns):
+            self.canvas.rect(a, top - height, b - a, height, stroke=1, fill=0)
+            y = top - CELL_PAD_Y
+            for line in lines:
+                y -= line_height
+                self.draw(line, a + CELL_PAD_X, b - CELL_PAD_X, y + FONT_SIZE * 0.3, font, FONT_SIZE)
+        self.y -= height
+        return True
+
+    def table(self, header, rows):
+        self.canvas.setStrokeGray(BORDER_GREY)
+        self.canvas.setLineWidth(0.75)
+        self.y -= 15  # margin-top: 20px
+        if not self.row(header, self.bold):
+            self.new_page()
+            self.fresh_page_row(header, self.bold)
+        for cells in rows:
+            if not self.row(cells, self.regular):
+                # Repeat the header on every page, like <thead> does in WeasyPrint
+                self.new_page()
+                self.fresh_page_row(header, self.bold)
+                self.fresh_page_row(cells, self.regular)
+
+    def fresh_page_row(self, cells, font):
+        # Rows aren't split across pages here; WeasyPrint does that
+        if not self.row(cells, font):
+            raise FastPathUnavailable("a table row is taller than a page")
+
+
+def render_blocks_pdf(blocks, title=""):
+    """Draw ReportBlocks as PDF bytes (A4)."""
+    _check_drawable(blocks)
+
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen.canvas import Canvas
+
+    buffer = io.BytesIO()
+    canvas = Canvas(buffer, pagesize=A4, pageCompression=1)
+    canvas.setTitle(title)
+    writer = _Writer(canvas, blocks.lang, A4)
+    writer.paragraph(blocks.heading, writer.bold, HEADING_SIZE, space_after=LINE_GAP)
+    for line in blocks.lines:
+        writer.paragraph(line, writer.regular, FONT_SIZE, space_after=LINE_GAP)
+    writer.table(blocks.header, blocks.rows)
+    canvas.showPage()
+    canvas.save()
+    return buffer.getvalue()
+
+
+def render_report_pdf_fast(report, entries, lang="en"):
+    """
+    Render a report with ReportLab. Raises FastPathUnavailable when the report
+    needs the WeasyPrint engine (see module docstring).
+    """
+    blocks = report_blocks(report, entries, lang)
+    return render_blocks_pdf(blocks, title=blocks.heading)
@@ -0,0 +1,192 @@
+"""
+Pre-subset Noto Nastaliq Urdu for the Urdu reports.
+
+The full font is ~1 MB and WeasyPrint loads and re-subsets it for every
+document. Report text is drawn from a small, stable alphabet (the subject
+dictionaries, Urdu digits and month names, the template's own labels), so we
+subset the font once per glyph set with fontTools and point @font-face at the
+cached file. Subsetting Nastaliq takes seconds (GSUB closure), so there are
+two fixed tiers rather than one subset per report:
+
+  vocabulary  characters of the dictionaries/digits/template + printable ASCII
+  urdu        vocabulary + every Arabic-script code point the font maps
+
+A report uses the smallest tier covering its characters, or the full font if
+neither does. Each font file gets its own @font-face family name: WeasyPrint's
+process-wide FontConfiguration keeps every face it has loaded, and faces of
+different subsets under one family would let a page take glyphs from a subset
+it wasn't shaped with, breaking Nastaliq joining. Files live in settings.FONT_SUBSET_DIR named by a hash of the
+font and the code point set, so a new font or vocabulary gets new files.
+Prebuild them at deploy time with `manage.py build_font_subsets`.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.template.loader import get_template
+
+from .localization import DECIMAL_SEPARATOR, URDU_DIGITS, URDU_MONTHS
+from .subject_names import ALIASES, GENERIC_CHILDREN, PARENT_MAP, STUDIES_SUFFIX, SUB_MAP
+
+logger = logging.getLogger(__name__)
+
+FONT_STATIC_PATH = "reports/fonts/NotoNastaliqUrdu-Regular.ttf"
+
+FONT_FAMILY = "Noto Nastaliq Urdu"
+# Swapped for the real font URL and its family once the page's characters are known
+FONT_URL_PLACEHOLDER = "urdu-font-subset:pending"
+FONT_FAMILY_PLACEHOLDER = "urdu-font-family:pending"
+
+ARABIC_RANGES = ((0x0600, 0x06FF), (0x0750, 0x077F), (0xFB50, 0xFDFF), (0xFE70, 0xFEFF))
+
+
+def vocabulary_chars():
+    """Characters the Urdu report prints from its fixed vocabulary."""
+    from .utils import REPORT_TEMPLATE, TOC_TEMPLATE
+
+    texts = [URDU_DIGITS, DECIMAL_SEPARATOR, STUDIES_SUFFIX, "".join(URDU_MONTHS.values())]
+    texts += list(PARENT_MAP.values()) + list(ALIASES.values()) + list(GENERIC_CHILDREN.values())
+    texts += [urdu for subs in SUB_MAP.values() for urdu in subs.values()]
+    for name in (REPORT_TEMPLATE, TOC_TEMPLATE):
+        with open(get_template(name).origin.name, encoding="utf-8") as fh:
+            texts.append(fh.read())  # labels such as "رپورٹ برائے"
+    texts.append("".join(chr(c) for c in range(0x20, 0x7F)))
+    return set("".join(texts))
+
+
+def _subset_options():
+    from fontTools import subset
+
+    options = subset.Options()
+    options.layout_features = ["*"]  # Nastaliq shaping needs every GSUB/GPOS feature
+    options.name_IDs = ["*"]
+    options.name_languages = ["*"]
+    options.notdef_outline = True
+    options.glyph_names = False
+    return options
+
+
+class FontSubsetCache:
+    def __init__(self, font_path, cache_dir):
+        from fontTools.ttLib import TTFont
+
+        self.font_path = font_path
+        self.cache_dir = Path(cache_dir)
+        with open(font_path, "rb") as fh:
+            self.font_digest = hashlib.sha256(fh.read()).hexdigest()
+        self.cmap = frozenset(TTFont(font_path, lazy=True).getBestCmap())
+
+        vocabulary = frozenset(ord(c) for c in vocabulary_chars()) & self.cmap
+        arabic = frozenset(c for c in self.cmap if any(lo <= c <= hi for lo, hi in ARABIC_RANGES))
+        self.tiers = [("vocabulary", vocabulary), ("urdu", vocabulary | arabic)]
+        self._lock = threading.Lock()
+
+    def subset_path(self, codepoints):
+        key = hashlib.sha256(
+            (self.font_digest + ":" + ",".join(map(str, sorted(codepoints)))).encode()
+        ).hexdigest()[:20]
+        stem = Path(self.font_path).stem
+        return self.cache_dir / f"{stem}.{key}.ttf"
+
+    def build(self, codepoints):
+        """Path of the subset for `codepoints`, creating it if it isn't cached yet."""
+        path = self.subset_path(codepoints)
+        if path.exists():
+            return path
+        with self._lock:
+            if path.exists():
+                return path
+            from fontTools import subset
+            from fontTools.ttLib import TTFont
+
+            started = time.perf_counter()
+            font = TTFont(self.font_path)
+            subsetter = subset.Subsetter(_subset_options())
+            subsetter.populate(unicodes=codepoints)
+            subsetter.subset(font)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            font.save(str(tmp))
+            os.replace(tmp, path)  # atomic: concurrent workers never see a partial file
+            logger.info(
+                "Built font subset %s (%d code points, %d bytes) in %.1fs",
+                path.name, len(codepoints), path.stat().st_size, time.perf_counter() - started,
+            )
+        return path
+
+    def tier_for(self, chars):
+        """(tier name, code points) of the smallest tier covering `chars`, or None."""
+        needed = {ord(c) for c in chars} & self.cmap
+        for name, codepoints in self.tiers:
+            if needed <= codepoints:
+                return name, codepoints
+        return None
+
+    def font_path_for(self, chars):
+        tier = self.tier_for(chars)
+        if tier is None:
+            return Path(self.font_path)
+        return self.build(tier[1])
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def full_font_path():
+    return finders.find(FONT_STATIC_PATH)
+
+
+def get_font_subsets():
+    """Process-wide FontSubsetCache (None when disabled or the font/fontTools is missing)."""
+    global _cache
+    if not getattr(settings, "REPORT_FONT_SUBSETS", True):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                font_path = full_font_path()
+                if not font_path:
+                    logger.warning("Urdu font %s not found in static files", FONT_STATIC_PATH)
+                    return None
+                try:
+                    _cache = FontSubsetCache(font_path, settings.FONT_SUBSET_DIR)
+                except ImportError:
+                    logger.warning("fontTools is not installed; embedding the full Urdu font")
+                    return None
+    return _cache
+
+
+def reset_font_subsets():
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def urdu_font_url(chars):
+    """file:// URL of the smallest cached font covering `chars` (full font as fallback)."""
+    cache = get_font_subsets()
+    path = cache.font_path_for(chars) if cache is not None else full_font_path()
+    return Path(path).as_uri() if path else ""
+
+
+def urdu_font_family(font_url):
+    """@font-face family name of the font at `font_url` (one per file, see above)."""
+    return f"{FONT_FAMILY} {hashlib.sha256(font_url.encode()).hexdigest()[:12]}"
+
+
+def with_urdu_font(html, font_url=None):
+    """
+    Replace the font placeholders in rendered HTML with `font_url` (default:
+    the font for that HTML's characters) and its family name.
+    """
+    if FONT_URL_PLACEHOLDER not in html:
+        return html
+    font_url = font_url or urdu_font_url(set(html))
+    return html.replace(FONT_URL_PLACEHOLDER, font_url).replace(FONT_FAMILY_PLACEHOLDER, urdu_font_family(font_url))
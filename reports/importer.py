@@ -0,0 +1,372 @@
+"""
+Streaming CSV/XLSX import of subjects, students and results (marks).
+
+Files are read row by row (csv.reader / openpyxl read-only mode), so memory
+stays flat however long the sheet is. Tutors, subjects and exams are resolved
+through lookup maps built once per import; students and reports are looked up
+per batch. Each batch is written with bulk_create (students' subject links go
+straight into the M2M through table, marks use INSERT ... ON CONFLICT), all in
+one transaction that a dry run rolls back.
+
+Expected columns (header row, case-insensitive):
+  subjects  name, name_urdu, category
+  students  full_name, gender, grade_level, tutor, full_name_urdu, subjects
+            (tutor = id, username or phone; subjects = unique names/ids split by ";")
+  results   student, exam, subject, marks_obtained, total_marks
+            (student = id; exam, subject = id or unique name)
+"""
+
+import csv
+import io
+import os
+import time
+from itertools import islice
+
+from django.db import transaction
+
+from .models import Tutor, Student, Subject, Exam, Report, PerformanceEntry
+from .pdf_cache import invalidate_report_pdfs
+from .renditions import report_changed
+from .response_cache import bump_versions
+from .summaries import entries_changed
+from .urdu_names import fill_urdu_name
+
+KINDS = ("subjects", "students", "results")
+BATCH_SIZE = 500
+# Only the first errors are kept; the rest are just counted
+MAX_REPORTED_ERRORS = 100
+
+GENDERS = {"m": "Male", "male": "Male", "f": "Female", "female": "Female"}
+
+
+class ImportFileError(ValueError):
+    """The file as a whole can't be imported (format, header, missing dependency)."""
+
+
+# ---------------------------------------------------------------------------
+# Row sources
+# ---------------------------------------------------------------------------
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Excel stores ids as floats
+    return str(value).strip()
+
+
+def _iter_csv(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if not header:
+            return
+        header = [h.strip().lower() for h in header]
+        for line, values in enumerate(reader, start=2):
+            if any(v.strip() for v in values):
+                yield line, dict(zip(header, (v.strip() for v in values)))
+    finally:
+        text.detach()  # leave the caller's file open
+
+
+def _iter_xlsx(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError("XLSX import needs openpyxl (pip install openpyxl); or upload a CSV.")
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            return
+        header = [_cell(h).lower() for h in header]
+        for line, values in enumerate(rows, start=2):
+            values = [_cell(v) for v in values]
+            if any(values):
+                yield line, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def iter_rows(fileobj, filename):
+    """Yield (line_number, {column: text}) from a binary CSV or XLSX file object."""
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext == ".xlsx":
+        return _iter_xlsx(fileobj)
+    if ext in ("", ".csv", ".txt"):
+        return _iter_csv(fileobj)
+    raise ImportFileError(f"Unsupported file type {ext!r}; use .csv or .xlsx.")
+
+
+def _batches(rows, size):
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+# ---------------------------------------------------------------------------
+# Import bookkeeping
+# ---------------------------------------------------------------------------
+
+class ImportResult:
+    def __init__(self, kind, dry_run):
+        self.kind = kind
+        self.dry_run = dry_run
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+        self.error_count = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    def error(self, line, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "errors": errors})
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        return {
+            "kind": self.kind,
+            "dry_run": self.dry_run,
+            "rows": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+def _required(row, *columns):
+    return {c: ["This field is required."] for c in columns if not row.get(c)}
+
+
+def _number(row, column, errors):
+    try:
+        value = float(row.get(column, ""))
+    except ValueError:
+        errors[column] = ["A valid number is required."]
+        return None
+    if value < 0:
+        errors[column] = ["Ensure this value is greater than or equal to 0."]
+    return value
+
+
+def _lookup_map(model):
+    """
+    Lookup of `model` rows by id and by case-insensitive name, built with one
+    query. Names shared by several rows are left out as ambiguous.
+    """
+    ids, names, ambiguous = {}, {}, set()
+    for pk, name in model.objects.values_list("id", "name"):
+        ids[str(pk)] = pk
+        key = name.strip().lower()
+        if key in names:
+            ambiguous.add(key)
+        names.setdefault(key, pk)
+    for key in ambiguous:
+        names.pop(key)
+    return {**names, **ids}
+
+
+# ---------------------------------------------------------------------------
+# Importers (one per kind); each consumes batches of (line, row)
+# ---------------------------------------------------------------------------
+
+def _import_subjects(batches, result, progress):
+    known = {name.strip().lower() for name in Subject.objects.values_list("name", flat=True)}
+    for batch in batches:
+        objs = []
+        for line, row in batch:
+            errors = _required(row, "name")
+            if errors:
+                result.error(line, errors)
+                continue
+            key = row["name"].lower()
+            if key in known:
+                result.skipped += 1
+                continue
+            known.add(key)
+            objs.append(Subject(
+                name=row["name"], name_urdu=row.get("name_urdu") or None, category=row.get("category") or None,
+            ))
+        for obj in objs:
+            fill_urdu_name(obj)  # bulk_create skips the pre_save signal
+        Subject.objects.bulk_create(objs)
+        if objs:
+            bump_versions(Subject)  # bulk_create skips the signal that invalidates cached catalogs
+        result.created += len(objs)
+        progress(result)
+
+
+def _import_students(batches, result, progress, tutor_id=None):
+    tutors = {}
+    tutor_qs = Tutor.objects.all() if tutor_id is None else Tutor.objects.filter(pk=tutor_id)
+    for pk, username, phone in tutor_qs.values_list("id", "user__username", "phone"):
+        tutors[str(pk)] = pk
+        tutors.setdefault(username.lower(), pk)
+        if phone:
+            tutors.setdefault(phone, pk)
+    subjects = _lookup_map(Subject)
+    Link = Student.subjects.through
+
+    for batch in batches:
+        students, links = [], []
+        for line, row in batch:
+            errors = _required(row, "full_name", "gender", "grade_level", "tutor")
+            row_tutor_id = tutors.get(row.get("tutor", "").lower())
+            gender = GENDERS.get(row.get("gender", "").lower())
+            if row.get("tutor") and row_tutor_id is None:
+                errors["tutor"] = ["Unknown tutor."]
+            if row.get("gender") and gender is None:
+                errors["gender"] = ["Gender must be Male or Female."]
+            names = [s.strip() for s in row.get("subjects", "").split(";") if s.strip()]
+            subject_ids = [subjects.get(name.lower()) for name in names]
+            unknown = [name for name, pk in zip(names, subject_ids) if pk is None]
+            if unknown:
+                errors["subjects"] = [f"Unknown (or ambiguous) subject(s): {', '.join(unknown)}."]
+            if errors:
+                result.error(line, errors)
+                continue
+            students.append(Student(
+                tutor_id=row_tutor_id, full_name=row["full_name"], full_name_urdu=row.get("full_name_urdu") or None,
+                gender=gender, grade_level=row["grade_level"],
+            ))
+            links.append(set(subject_ids))
+
+        Student.objects.bulk_create(students)  # sets pks (RETURNING on PostgreSQL/SQLite)
+        Link.objects.bulk_create(
+            [Link(student_id=s.pk, subject_id=pk) for s, ids in zip(students, links) for pk in ids],
+            ignore_conflicts=True,
+        )
+        if students:
+            # Students are listed per tutor, but ?student= subject lists are cached
+            bump_versions(Link)
+        result.created += len(students)
+        progress(result)
+
+
+def _import_results(batches, result, progress, dry_run, tutor_id=None):
+    subjects = _lookup_map(Subject)
+    exams = _lookup_map(Exam)
+
+    for batch in batches:
+        parsed = []
+        for line, row in batch:
+            errors = _required(row, "student", "exam", "subject", "marks_obtained", "total_marks")
+            exam_id = exams.get(row.get("exam", "").lower())
+            subject_id = subjects.get(row.get("subject", "").lower())
+            if row.get("exam") and exam_id is None:
+                errors["exam"] = ["Unknown (or ambiguous) exam."]
+            if row.get("subject") and subject_id is None:
+                errors["subject"] = ["Unknown (or ambiguous) subject."]
+            if row.get("student") and not row["student"].isdigit():
+                errors["student"] = ["Student must be an id."]
+            obtained = _number(row, "marks_obtained", errors)
+            total = _number(row, "total_marks", errors)
+            if obtained is not None and total is not None and not errors and obtained > total:
+                errors["marks_obtained"] = ["Obtained marks cannot exceed total marks."]
+            if errors:
+                result.error(line, errors)
+                continue
+            parsed.append((line, int(row["student"]), exam_id, subject_id, obtained, total))
+
+        # Per-batch lookups: students, then existing reports for those students
+        students = Student.objects.filter(pk__in={p[1] for p in parsed})
+        if tutor_id is not None:
+            students = students.filter(tutor_id=tutor_id)
+        student_tutor = dict(students.values_list("id", "tutor_id"))
+        report_ids = {
+            (student_id, exam_id): pk
+            for pk, student_id, exam_id in Report.objects.filter(
+                student_id__in=student_tutor, exam_id__in={p[2] for p in parsed},
+            ).values_list("id", "student_id", "exam_id")
+        }
+        missing = {
+            (p[1], p[2]) for p in parsed if p[1] in student_tutor and (p[1], p[2]) not in report_ids
+        }
+        new_reports = [Report(student_id=s, exam_id=e, tutor_id=student_tutor[s]) for s, e in missing]
+        Report.objects.bulk_create(new_reports)
+        report_ids.update({(r.student_id, r.exam_id): r.pk for r in new_reports})
+
+        entries = {}
+        for line, student_id, exam_id, subject_id, obtained, total in parsed:
+            if student_id not in student_tutor:
+                result.error(line, {"student": ["Unknown student."]})
+                continue
+            key = (report_ids[(student_id, exam_id)], subject_id)
+            if key in entries:
+                result.skipped += 1  # later duplicate rows are ignored
+                continue
+            entries[key] = PerformanceEntry(
+                report_id=key[0], subject_id=subject_id, marks_obtained=obtained, total_marks=total,
+            )
+        if entries:
+            touched = {report for report, _ in entries}
+            existing = set(
+                PerformanceEntry.objects.filter(report_id__in=touched).values_list("report_id", "subject_id")
+            )
+            PerformanceEntry.objects.bulk_create(
+                list(entries.values()),
+                update_conflicts=True,
+                unique_fields=["report", "subject"],
+                update_fields=["marks_obtained", "total_marks"],
+            )
+            updated = sum(1 for key in entries if key in existing)
+            result.updated += updated
+            result.created += len(entries) - updated
+            # bulk_create skips model signals: refresh derived data explicitly
+            entries_changed(touched)
+            report_changed(touched)
+            if not dry_run:
+                for report in touched:
+                    invalidate_report_pdfs(report)
+        progress(result)
+
+
+def import_file(fileobj, filename, kind, dry_run=False, batch_size=BATCH_SIZE, progress=None, tutor_id=None):
+    """
+    Import one CSV/XLSX file of `kind` ("subjects", "students" or "results").
+    `tutor_id` restricts students to that tutor and results to their students.
+    Row errors are collected (not raised); ImportFileError for unusable files.
+    Returns an ImportResult.
+    """
+    if kind not in KINDS:
+        raise ImportFileError(f"Unknown import kind {kind!r}; expected one of {', '.join(KINDS)}.")
+    result = ImportResult(kind, dry_run)
+    started = time.perf_counter()
+
+    def counted(rows):
+        for item in rows:
+            result.rows += 1
+            yield item
+
+    def report_progress(res):
+        res.seconds = time.perf_counter() - started
+        if progress:
+            progress(res)
+
+    batches = _batches(counted(iter_rows(fileobj, filename)), batch_size)
+    with transaction.atomic():
+        if kind == "subjects":
+            _import_subjects(batches, result, report_progress)
+        elif kind == "students":
+            _import_students(batches, result, report_progress, tutor_id)
+        else:
+            _import_results(batches, result, report_progress, dry_run, tutor_id)
+        if dry_run:
+            transaction.set_rollback(True)  # also drops the scheduled summary refreshes
+
+    result.seconds = time.perf_counter() - started
+    return result
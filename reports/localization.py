@@ -0,0 +1,78 @@
+"""
+Urdu number and date localization.
+
+Digits are mapped with one str.translate table (a single C-level pass per
+string) and the decimal point is always rendered as the Arabic decimal
+separator "٫", for every number on the report. Formatted dates are memoized,
+and the batch helpers localize a whole marks table in one call so the
+template only prints ready strings.
+"""
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
+
+URDU_DIGITS = "۰۱۲۳۴۵۶۷۸۹"
+EN_DIGITS = "0123456789"
+DECIMAL_SEPARATOR = "٫"
+
+URDU_TABLE = str.maketrans(EN_DIGITS + ".", URDU_DIGITS + DECIMAL_SEPARATOR)
+
+URDU_MONTHS = {
+    "January": "جنوری", "February": "فروری", "March": "مارچ", "April": "اپریل",
+    "May": "مئی", "June": "جون", "July": "جولائی", "August": "اگست",
+    "September": "ستمبر", "October": "اکتوبر", "November": "نومبر", "December": "دسمبر"
+}
+# Indexed by date.month, so formatting doesn't depend on the process locale
+_MONTHS_BY_NUMBER = (None,) + tuple(URDU_MONTHS.values())
+
+
+def to_urdu_digits(value):
+    """str(value) with Urdu digits and "٫" as the decimal separator."""
+    return str(value).translate(URDU_TABLE)
+
+
+def format_decimal(value, places=2):
+    """
+    Fixed-point string, rounded half-up like Django's floatformat filter
+    (so Urdu and English reports agree on the last digit). Non-numbers pass through.
+    """
+    try:
+        d = Decimal(repr(value)) if isinstance(value, float) else Decimal(value)
+        return str(d.quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, TypeError, ValueError):
+        return str(value)
+
+
+def format_urdu_number(value, places=None):
+    """Localized number; `places` fixes the decimals (half-up), None keeps str(value)."""
+    return to_urdu_digits(value if places is None else format_decimal(value, places))
+
+
+def localize_many(values, places=None):
+    """format_urdu_number() over an iterable."""
+    if places is None:
+        return [str(v).translate(URDU_TABLE) for v in values]
+    return [format_decimal(v, places).translate(URDU_TABLE) for v in values]
+
+
+@lru_cache(maxsize=4096)
+def urdu_date(date):
+    """Report date as "<year> <day>, <month>" in Urdu digits/month names."""
+    return f"{to_urdu_digits(date.year)} {to_urdu_digits(date.day)}, {_MONTHS_BY_NUMBER[date.month]}"
+
+
+def localize_marks_table(entries, subject_name=None):
+    """
+    Rows for the Urdu marks table, localized in one pass:
+    [{"subject", "marks_obtained", "total_marks", "percentage"}, ...].
+    `subject_name(entry)` supplies the Urdu subject label.
+    """
+    rows = []
+    for entry in entries:
+        rows.append({
+            "subject": subject_name(entry) if subject_name else entry.subject.name,
+            "marks_obtained": str(entry.marks_obtained).translate(URDU_TABLE),
+            "total_marks": str(entry.total_marks).translate(URDU_TABLE),
+            "percentage": format_decimal(entry.percentage, 2).translate(URDU_TABLE),
+        })
+    return rows
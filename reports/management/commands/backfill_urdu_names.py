@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Fill the stored Urdu subject names (Subject.name_urdu).
+
+Usage:
+  python manage.py backfill_urdu_names
+  python manage.py backfill_urdu_names --model subject --dry-run
+  python manage.py backfill_urdu_names --overwrite
+
+New and renamed rows are filled on save; run this once for existing data (or
+after extending the dictionaries in reports.subject_names). Only empty fields
+are touched unless --overwrite, which also replaces hand-corrected values.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from reports.models import Subject
+from reports.urdu_names import backfill_urdu_names
+
+# Student/Tutor Urdu names are entered by hand (see reports.urdu_names)
+MODELS = {"subject": Subject}
+
+
+class Command(BaseCommand):
+    help = "Backfills stored Urdu subject names from the subject_to_urdu translator."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", choices=sorted(MODELS), action="append",
+                            help="Limit to this model (repeatable). Default: all.")
+        parser.add_argument("--overwrite", action="store_true", help="Recompute non-empty values too.")
+        parser.add_argument("--dry-run", action="store_true", help="Count changes, then roll back.")
+
+    def handle(self, *args, **options):
+        models = [MODELS[name] for name in options["model"]] if options["model"] else None
+        started = time.perf_counter()
+        counts = backfill_urdu_names(models, overwrite=options["overwrite"], dry_run=options["dry_run"])
+        elapsed = time.perf_counter() - started
+        details = ", ".join(f"{name}={n}" for name, n in counts.items())
+        prefix = "Dry run, rolled back: would update" if options["dry_run"] else "Updated"
+        self.stdout.write(self.style.SUCCESS(f"{prefix} {details} in {elapsed:.2f}s."))
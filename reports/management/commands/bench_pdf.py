@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the report PDF pipeline stage by stage.
+
+Usage:
+  python manage.py bench_pdf
+  python manage.py bench_pdf --reports 20 --subjects 12 --iterations 5 --output bench.json
+  python manage.py bench_pdf --langs ur --compare bench_previous.json
+  python manage.py bench_pdf --langs ur --full-font   # without the Urdu font subset cache
+  python manage.py bench_pdf --engine both --reports 50   # WeasyPrint vs the ReportLab fast path
+
+Seeds synthetic tutors/students/subjects/reports (rolled back afterwards unless
+--keep), then times each stage per render:
+  fetch     ORM load of report + entries
+  template  rendering the report template to HTML
+  css       resolving + parsing the stylesheets from scratch
+  layout    WeasyPrint HTML -> laid-out Document
+  write     Document -> PDF bytes
+With --engine reportlab the stages are fetch, template (building the report
+text) and write (drawing the PDF). Results are keyed "en"/"ur" for WeasyPrint
+and "en/reportlab"/"ur/reportlab" for the fast path.
+Reports p50/p95 per stage and language, reports/second, mean PDF size, peak
+RSS, and writes JSON so runs can be compared between releases (--compare
+prints p50 deltas).
+"""
+
+import json
+import platform
+import resource
+import statistics
+import sys
+import time
+from contextlib import nullcontext
+from datetime import date, datetime, timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+import weasyprint
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+
+from reports.fast_pdf import FastPathUnavailable, render_blocks_pdf, report_blocks
+from reports.models import Tutor, Student, Subject, Exam, Report, PerformanceEntry
+from reports.render_context import get_render_context, render_context_stats
+from reports.utils import load_report, render_report_html, stylesheet_paths
+
+STAGES = ("fetch", "template", "css", "layout", "write", "total")
+ENGINES = {"weasyprint": ("weasyprint",), "reportlab": ("reportlab",), "both": ("weasyprint", "reportlab")}
+
+SUBJECT_NAMES = [
+    "Mathematics", "English Language", "Urdu Literature", "Physics: Optics", "Chemistry - Organic",
+    "Biology", "Computer Science (Programming)", "Islamic Studies", "Pakistan Studies: History",
+    "Geography", "Economics", "Statistics", "General Science", "Arabic", "Art",
+]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile; good enough for benchmark summaries."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[k]
+
+
+def summarize(samples):
+    return {
+        "n": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3) if samples else 0.0,
+        "max_ms": round(max(samples) * 1000, 3) if samples else 0.0,
+    }
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+class Command(BaseCommand):
+    help = "Times each stage of report PDF generation on synthetic data and writes JSON results."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reports", type=int, default=10, help="Synthetic reports to seed.")
+        parser.add_argument("--subjects", type=int, default=8, help="Entries per report (max %d)." % len(SUBJECT_NAMES))
+        parser.add_argument("--iterations", type=int, default=3, help="Passes over all reports per language.")
+        parser.add_argument("--langs", default="en,ur", help="Comma-separated languages.")
+        parser.add_argument("--output", help="Write JSON results to this path.")
+        parser.add_argument("--compare", help="Previous JSON results to diff p50s against.")
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded rows instead of rolling back.")
+        parser.add_argument("--full-font", action="store_true",
+                            help="Embed the full Urdu font instead of the cached subsets (for comparison).")
+        parser.add_argument("--engine", choices=sorted(ENGINES), default="weasyprint",
+                            help="PDF engine(s) to time.")
+
+    def handle(self, *args, **options):
+        langs = [l.strip() for l in options["langs"].split(",") if l.strip()]
+        if not set(langs) <= {"en", "ur"}:
+            raise CommandError("--langs accepts en and/or ur.")
+
+        runs = []  # (result key, lang, engine)
+        for engine in ENGINES[options["engine"]]:
+            runs += [(lang if engine == "weasyprint" else f"{lang}/{engine}", lang, engine) for lang in langs]
+        self.pdf_sizes = {key: [] for key, _, _ in runs}
+        font_setting = override_settings(REPORT_FONT_SUBSETS=False) if options["full_font"] else nullcontext()
+        with transaction.atomic(), font_setting:
+            report_ids = self.seed(options["reports"], min(options["subjects"], len(SUBJECT_NAMES)))
+            get_render_context()  # measure steady state, not the one-off build
+            for lang in langs:
+                # Builds the font subset if it isn't cached yet, outside the timings
+                render_report_html(*load_report(report_ids[0]), lang)
+            runs = [run for run in runs if self.engine_available(run, report_ids[0])]
+            timings = {key: {stage: [] for stage in STAGES} for key, _, _ in runs}
+            for _ in range(options["iterations"]):
+                for key, lang, engine in runs:
+                    time_render = self.time_render if engine == "weasyprint" else self.time_fast_render
+                    for report_id in report_ids:
+                        time_render(report_id, lang, timings[key], self.pdf_sizes[key])
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+        results = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "weasyprint": weasyprint.__version__,
+                "database": settings.DATABASES["default"]["ENGINE"],
+                "reports": options["reports"],
+                "subjects": options["subjects"],
+                "iterations": options["iterations"],
+                "font_subsets": getattr(settings, "REPORT_FONT_SUBSETS", True) and not options["full_font"],
+                "engine": options["engine"],
+            },
+            "stages": {key: {stage: summarize(s) for stage, s in stages.items()} for key, stages in timings.items()},
+            "reports_per_second": {
+                key: round(len(stages["total"]) / sum(stages["total"]), 1) if stages["total"] else 0.0
+                for key, stages in timings.items()
+            },
+            "pdf_kib": {
+                key: round(statistics.fmean(sizes) / 1024, 1) if sizes else 0.0
+                for key, sizes in self.pdf_sizes.items() if key in timings
+            },
+            "peak_rss_mb": peak_rss_mb(),
+            "render_context": render_context_stats(),
+        }
+        self.print_table(results)
+
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as fh:
+                self.print_comparison(json.load(fh), results)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def seed(self, n_reports, n_subjects):
+        user = User.objects.create_user(username=f"bench-{time.time_ns()}")
+        tutor = Tutor.objects.create(user=user, full_name="Bench Tutor", full_name_urdu="بینچ استاد")
+        subjects = [Subject.objects.create(name=name) for name in SUBJECT_NAMES[:n_subjects]]
+        exam = Exam.objects.create(name="Bench Final", exam_type="Final", date=date.today())
+        report_ids = []
+        for i in range(n_reports):
+            student = Student.objects.create(
+                tutor=tutor, full_name=f"Bench Student {i}", gender="Male" if i % 2 else "Female", grade_level="9",
+            )
+            report = Report.objects.create(student=student, tutor=tutor, exam=exam, remarks="Synthetic benchmark report.")
+            PerformanceEntry.objects.bulk_create(
+                PerformanceEntry(report=report, subject=s, marks_obtained=40 + (i * 7 + j * 3) % 60, total_marks=100)
+                for j, s in enumerate(subjects)
+            )
+            report_ids.append(report.pk)
+        return report_ids
+
+    def engine_available(self, run, report_id):
+        key, lang, engine = run
+        if engine == "weasyprint":
+            return True
+        try:
+            render_blocks_pdf(report_blocks(*load_report(report_id), lang))
+        except FastPathUnavailable as exc:
+            self.stderr.write(f"Skipping {key}: {exc}")
+            return False
+        return True
+
+    def time_render(self, report_id, lang, bucket, pdf_sizes):
+        t0 = time.perf_counter()
+        report, entries = load_report(report_id)
+        t1 = time.perf_counter()
+        html_string = render_report_html(report, entries, lang)
+        t2 = time.perf_counter()
+        # Cold resolution, as every render did before the shared render context
+        font_config = FontConfiguration()
+        for static_path in stylesheet_paths(lang):
+            fs_path = finders.find(static_path)
+            if fs_path:
+                CSS(filename=fs_path, font_config=font_config)
+        t3 = time.perf_counter()
+        ctx = get_render_context()
+        base_url = settings.STATIC_ROOT or settings.BASE_DIR
+        document = HTML(string=html_string, base_url=base_url).render(
+            stylesheets=ctx.stylesheets[lang], font_config=ctx.font_config,
+        )
+        t4 = time.perf_counter()
+        pdf_bytes = document.write_pdf()
+        t5 = time.perf_counter()
+        pdf_sizes.append(len(pdf_bytes or b""))
+
+        for stage, seconds in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4, t5 - t0)):
+            bucket[stage].append(seconds)
+
+    def time_fast_render(self, report_id, lang, bucket, pdf_sizes):
+        t0 = time.perf_counter()
+        report, entries = load_report(report_id)
+        t1 = time.perf_counter()
+        blocks = report_blocks(report, entries, lang)
+        t2 = time.perf_counter()
+        pdf_bytes = render_blocks_pdf(blocks, title=blocks.heading)
+        t3 = time.perf_counter()
+        pdf_sizes.append(len(pdf_bytes))
+
+        for stage, seconds in (("fetch", t1 - t0), ("template", t2 - t1), ("write", t3 - t2), ("total", t3 - t0)):
+            bucket[stage].append(seconds)
+
+    def print_table(self, results):
+        self.stdout.write(f"{'lang':<14}{'stage':<10}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}")
+        for key, stages in results["stages"].items():
+            for stage, s in stages.items():
+                if s["n"]:
+                    self.stdout.write(f"{key:<14}{stage:<10}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['mean_ms']:>10.2f}")
+        for key, rate in results["reports_per_second"].items():
+            self.stdout.write(f"{key} throughput: {rate} reports/s")
+        for key, kib in results["pdf_kib"].items():
+            self.stdout.write(f"{key} mean PDF size: {kib} KiB")
+        self.stdout.write(f"peak RSS: {results['peak_rss_mb']} MB")
+
+    def print_comparison(self, previous, current):
+        self.stdout.write("p50 change vs previous run:")
+        for lang, stages in current["stages"].items():
+            for stage, s in stages.items():
+                old = previous.get("stages", {}).get(lang, {}).get(stage)
+                if not old or not old["p50_ms"]:
+                    continue
+                delta = (s["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100
+                self.stdout.write(f"  {lang} {stage:<9} {old['p50_ms']:>9.2f} -> {s['p50_ms']:>9.2f} ms ({delta:+.1f}%)")
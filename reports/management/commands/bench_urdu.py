@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Check and benchmark the Urdu translation/localization helpers.
+
+Usage:
+  python manage.py bench_urdu
+  python manage.py bench_urdu --iterations 5 --output bench_urdu.json
+
+Builds the full dictionary corpus (reports.subject_names.dictionary_corpus),
+asserts the indexed translator returns exactly what the original
+implementation returns for every title (exits non-zero on any difference),
+then times:
+  legacy    original regex/scan implementation
+  cold      indexed translator with an empty LRU on each pass
+  warm      indexed translator, cache already populated (the steady state)
+  report    translate_many() over a typical report's subject list
+and the digit/date localization (reports.localization) against the previous
+per-character filters:
+  digits    marks/percentage strings, filter per cell vs one translate table
+  table     a whole report's marks table, filters vs localize_marks_table()
+  dates     convert_urdu_date, strftime + per-char vs memoized urdu_date()
+"""
+
+import json
+import statistics
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+
+from django.template.defaultfilters import floatformat
+
+from reports.localization import URDU_MONTHS, localize_marks_table, to_urdu_digits, urdu_date
+from reports.subject_names import (
+    CACHE_SIZE, clear_translation_cache, dictionary_corpus, legacy_subject_to_urdu,
+    subject_to_urdu, translate_many,
+)
+
+REPORT_SUBJECTS = [
+    "Mathematics", "English Language", "Urdu Literature", "Physics: Optics", "Chemistry - Organic",
+    "Biology", "Computer Science (Programming)", "Islamic Studies", "Pakistan Studies: History",
+]
+
+
+# The filters as they were before reports.localization (reference for timing and parity)
+def legacy_urdu_number(val):
+    urdu_digits, en_digits = "۰۱۲۳۴۵۶۷۸۹", "0123456789"
+    return "".join(urdu_digits[en_digits.index(ch)] if ch in en_digits else ch for ch in str(val))
+
+
+def legacy_urdu_date(d):
+    return f"{legacy_urdu_number(d.year)} {legacy_urdu_number(d.day)}, {URDU_MONTHS[d.strftime('%B')]}"
+
+
+def timed(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+class Command(BaseCommand):
+    help = "Verifies subject_to_urdu against the original implementation and times both."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=3, help="Timed passes per variant.")
+        parser.add_argument("--output", help="Write JSON results to this path.")
+
+    def handle(self, *args, **options):
+        corpus = dictionary_corpus()
+        clear_translation_cache()
+        mismatches = [t for t in corpus if subject_to_urdu(t) != legacy_subject_to_urdu(t)]
+        if mismatches:
+            for title in mismatches[:20]:
+                self.stderr.write(
+                    f"{title!r}: {subject_to_urdu(title)!r} != legacy {legacy_subject_to_urdu(title)!r}"
+                )
+            raise CommandError(f"{len(mismatches)} of {len(corpus)} titles differ from the original translator.")
+        self.stdout.write(self.style.SUCCESS(f"Parity OK: {len(corpus)} titles translate identically."))
+
+        # The cold pass uses a slice that fits the LRU so "warm" really is all hits
+        hot = corpus[:CACHE_SIZE]
+
+        def legacy():
+            for title in corpus:
+                legacy_subject_to_urdu(title)
+
+        def cold():
+            clear_translation_cache()
+            for title in corpus:
+                subject_to_urdu(title)
+
+        def warm():
+            for title in hot:
+                subject_to_urdu(title)
+
+        def report():
+            for _ in range(1000):
+                translate_many(REPORT_SUBJECTS)
+
+        warm()
+        results = {"titles": len(corpus), "timings": {}, "localization": {}}
+        for name, fn, calls in (
+            ("legacy", legacy, len(corpus)),
+            ("cold", cold, len(corpus)),
+            ("warm", warm, len(hot)),
+            ("report", report, 1000 * len(REPORT_SUBJECTS)),
+        ):
+            samples = timed(fn, options["iterations"])
+            best = min(samples)
+            results["timings"][name] = {
+                "calls": calls,
+                "best_s": round(best, 4),
+                "mean_s": round(statistics.fmean(samples), 4),
+                "us_per_call": round(best / calls * 1e6, 3),
+            }
+
+        self.stdout.write(f"{'variant':<8}{'calls':>9}{'best s':>10}{'us/call':>10}")
+        for name, t in results["timings"].items():
+            self.stdout.write(f"{name:<8}{t['calls']:>9}{t['best_s']:>10.4f}{t['us_per_call']:>10.3f}")
+        legacy_us = results["timings"]["legacy"]["us_per_call"]
+        warm_us = results["timings"]["warm"]["us_per_call"]
+        if warm_us:
+            self.stdout.write(f"warm speedup vs legacy: {legacy_us / warm_us:.1f}x")
+
+        results["localization"] = self.bench_localization(options["iterations"])
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def bench_localization(self, iterations):
+        numbers = [i / 4 for i in range(4000)] + [i * 100 / 7 for i in range(4000)]
+        days = [date(2024, 1, 1) + timedelta(days=i % 400) for i in range(8000)]
+        entries = [
+            SimpleNamespace(subject=SimpleNamespace(name=name), marks_obtained=40.0 + i, total_marks=100.0,
+                            percentage=(40.0 + i) * 100 / 100.0)
+            for i, name in enumerate(REPORT_SUBJECTS)
+        ]
+
+        # Parity: identical apart from the decimal point, which is now always "٫"
+        for value in numbers:
+            if to_urdu_digits(value) != legacy_urdu_number(value).replace(".", "٫"):
+                raise CommandError(f"Digit localization differs for {value!r}.")
+        for d in days[:400]:
+            if urdu_date(d) != legacy_urdu_date(d):
+                raise CommandError(f"Date localization differs for {d}.")
+        legacy_rows = [
+            [legacy_urdu_number(e.marks_obtained), legacy_urdu_number(e.total_marks),
+             legacy_urdu_number(floatformat(e.percentage, 2))]
+            for e in entries
+        ]
+        new_rows = [[r["marks_obtained"], r["total_marks"], r["percentage"]] for r in localize_marks_table(entries)]
+        if new_rows != [[c.replace(".", "٫") for c in row] for row in legacy_rows]:
+            raise CommandError("Marks table localization differs from the previous filters.")
+        self.stdout.write(self.style.SUCCESS("Localization parity OK (decimal point now \"٫\" everywhere)."))
+
+        cases = {
+            "digits": (lambda: [legacy_urdu_number(v) for v in numbers],
+                       lambda: [to_urdu_digits(v) for v in numbers], len(numbers)),
+            "table": (lambda: [[legacy_urdu_number(e.marks_obtained), legacy_urdu_number(e.total_marks),
+                                legacy_urdu_number(floatformat(e.percentage, 2))] for e in entries * 100],
+                      lambda: localize_marks_table(entries * 100), 100 * len(entries)),
+            "dates": (lambda: [legacy_urdu_date(d) for d in days],
+                      lambda: [urdu_date(d) for d in days], len(days)),
+        }
+        results = {}
+        self.stdout.write(f"{'case':<8}{'calls':>9}{'old us':>10}{'new us':>10}{'speedup':>9}")
+        for name, (old, new, calls) in cases.items():
+            old_best = min(timed(old, iterations)) / calls * 1e6
+            new_best = min(timed(new, iterations)) / calls * 1e6
+            results[name] = {"calls": calls, "old_us": round(old_best, 3), "new_us": round(new_best, 3)}
+            speedup = old_best / new_best if new_best else 0.0
+            self.stdout.write(f"{name:<8}{calls:>9}{old_best:>10.3f}{new_best:>10.3f}{speedup:>8.1f}x")
+        return results
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Prebuild the cached Noto Nastaliq Urdu subsets used by Urdu PDFs.
+
+Usage:
+  python manage.py build_font_subsets
+
+Subsetting the Nastaliq font takes several seconds per tier, so run this at
+deploy time (after collectstatic); otherwise the first Urdu render of each
+tier builds it. Files are written to settings.FONT_SUBSET_DIR.
+"""
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.font_subsets import full_font_path, get_font_subsets
+
+
+class Command(BaseCommand):
+    help = "Builds the cached Urdu font subsets (reports.font_subsets)."
+
+    def handle(self, *args, **options):
+        cache = get_font_subsets()
+        if cache is None:
+            raise CommandError("Font subsets are disabled, or the font/fontTools is missing.")
+        full_size = os.path.getsize(full_font_path())
+        for name, codepoints in cache.tiers:
+            started = time.perf_counter()
+            path = cache.build(codepoints)
+            size = path.stat().st_size
+            self.stdout.write(
+                f"{name:<11} {len(codepoints):>4} code points  {size / 1024:>7.0f} KiB "
+                f"({size / full_size:.0%} of full font)  {time.perf_counter() - started:.1f}s  {path.name}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Font subsets ready in {cache.cache_dir}"))
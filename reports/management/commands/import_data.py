@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Import subjects, students or results from a CSV/XLSX file.
+
+Usage:
+  python manage.py import_data subjects subjects.csv
+  python manage.py import_data students students.xlsx --dry-run
+  python manage.py import_data results marks.csv --batch-size 1000
+
+Rows are streamed (constant memory) and written in batches in one
+transaction; see reports.importer for the expected columns. Import order for
+a new school: subjects, then students, then results.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.importer import BATCH_SIZE, KINDS, ImportFileError, import_file
+
+
+class Command(BaseCommand):
+    help = "Streams a CSV/XLSX file of subjects, students or results into the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=KINDS)
+        parser.add_argument("path", help="CSV or XLSX file.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate and write, then roll back.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        def progress(result):
+            self.stdout.write(f"  {result.rows} rows ({result.rows_per_second:.0f} rows/s)")
+
+        try:
+            with open(options["path"], "rb") as fh:
+                result = import_file(
+                    fh, options["path"], options["kind"],
+                    dry_run=options["dry_run"], batch_size=options["batch_size"], progress=progress,
+                )
+        except (OSError, ImportFileError) as exc:
+            raise CommandError(str(exc))
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(f"... {result.error_count - len(result.errors)} more error(s)")
+
+        summary = (
+            f"{result.rows} rows: {result.created} created, {result.updated} updated, "
+            f"{result.skipped} skipped, {result.error_count} error(s) in {result.seconds:.2f}s "
+            f"({result.rows_per_second:.0f} rows/s)"
+        )
+        if result.dry_run:
+            self.stdout.write(self.style.WARNING(f"Dry run, rolled back. {summary}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Imported {result.kind}. {summary}"))
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Load-test a running server: short API requests while downloads are in flight.
+
+Usage:
+  SERVER_MODE=wsgi gunicorn &   python manage.py load_test --username t --password p --output wsgi.json
+  SERVER_MODE=asgi gunicorn &   python manage.py load_test --username t --password p --compare wsgi.json
+  python manage.py load_test --url https://staging.example.com --token <access> --slow 16 --fast 8 --duration 60
+
+Two groups of clients run side by side for --duration seconds:
+  slow  download PDFs and session exports (--slow-path, repeatable), reading
+        the body at --read-kbps like a phone on a poor connection
+  fast  request a small API endpoint (--fast-path) back to back
+On sync workers every slow download holds a worker until the client has read
+it all, so the fast group's latency climbs with --slow; under ASGI it should
+stay flat. Reports p50/p95/max latency, requests/second, errors and 503s per
+group, and writes JSON so the two modes can be compared (--compare).
+
+By default the slow paths are the first report's PDF (en and ur) and the first
+exam session's CSV export visible to the authenticated user.
+"""
+
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.management.commands.bench_pdf import summarize
+
+READ_CHUNK = 8192
+
+
+class Command(BaseCommand):
+    help = "Measures API latency on a running server while slow PDF/export downloads are in flight."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the running server.")
+        parser.add_argument("--token", help="JWT access token (otherwise obtained with --username/--password).")
+        parser.add_argument("--username")
+        parser.add_argument("--password")
+        parser.add_argument("--slow", type=int, default=8, help="Concurrent download clients.")
+        parser.add_argument("--fast", type=int, default=4, help="Concurrent API clients.")
+        parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run.")
+        parser.add_argument("--read-kbps", type=float, default=64.0,
+                            help="Download read rate per slow client in KiB/s (0 = as fast as possible).")
+        parser.add_argument("--slow-path", action="append", help="Download path (repeatable).")
+        parser.add_argument("--fast-path", default="/api/subjects/", help="API path timed under load.")
+        parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds.")
+        parser.add_argument("--label", help="Name of this run in the JSON (e.g. wsgi, asgi).")
+        parser.add_argument("--output", help="Write JSON results to this path.")
+        parser.add_argument("--compare", help="Previous JSON results to diff against.")
+
+    def handle(self, *args, **options):
+        base = urlsplit(options["url"])
+        if base.scheme not in ("http", "https") or not base.netloc:
+            raise CommandError("--url must be an http(s) URL.")
+        self.base = base
+        self.timeout = options["timeout"]
+        token = options["token"] or self.obtain_token(options["username"], options["password"])
+        self.headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+        slow_paths = options["slow_path"] or self.discover_slow_paths()
+        if not slow_paths:
+            raise CommandError("No reports or sessions visible to this user; pass --slow-path.")
+
+        self.stdout.write(f"{options['slow']} slow client(s) on {', '.join(slow_paths)}")
+        self.stdout.write(f"{options['fast']} fast client(s) on {options['fast_path']} for {options['duration']}s")
+        groups = {"slow": [], "fast": []}
+        lock = threading.Lock()
+        stop_at = time.monotonic() + options["duration"]
+        rate = options["read_kbps"] * 1024
+
+        def client(group, paths, read_rate, index):
+            samples = []
+            i = index
+            while time.monotonic() < stop_at:
+                samples.append(self.timed_request(paths[i % len(paths)], read_rate))
+                i += 1
+            with lock:
+                groups[group].extend(samples)
+
+        threads = [
+            threading.Thread(target=client, args=("slow", slow_paths, rate, i), daemon=True)
+            for i in range(options["slow"])
+        ] + [
+            threading.Thread(target=client, args=("fast", [options["fast_path"]], 0, i), daemon=True)
+            for i in range(options["fast"])
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        results = {
+            "label": options["label"] or "",
+            "url": options["url"],
+            "config": {
+                key: options[key] for key in ("slow", "fast", "duration", "read_kbps", "fast_path")
+            } | {"slow_paths": slow_paths},
+            "groups": {group: self.group_stats(samples, elapsed) for group, samples in groups.items()},
+        }
+        self.print_table(results)
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as fh:
+                self.print_comparison(json.load(fh), results)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    # -- HTTP -------------------------------------------------------------
+
+    def connection(self):
+        cls = http.client.HTTPSConnection if self.base.scheme == "https" else http.client.HTTPConnection
+        return cls(self.base.netloc, timeout=self.timeout)
+
+    def request(self, method, path, body=None, headers=None):
+        """(status, body bytes) of one request."""
+        conn = self.connection()
+        try:
+            conn.request(method, self.base.path.rstrip("/") + path, body=body, headers=headers or self.headers)
+            response = conn.getresponse()
+            return response.status, response.read()
+        finally:
+            conn.close()
+
+    def get_json(self, path):
+        status, body = self.request("GET", path)
+        if status != 200:
+            raise CommandError(f"GET {path} returned {status}.")
+        return json.loads(body)
+
+    def obtain_token(self, username, password):
+        if not username or not password:
+            raise CommandError("Pass --token, or --username and --password.")
+        status, body = self.request(
+            "POST", "/api/token/", json.dumps({"username": username, "password": password}),
+            {"Content-Type": "application/json"},
+        )
+        if status != 200:
+            raise CommandError(f"Could not obtain a token ({status}).")
+        return json.loads(body)["access"]
+
+    def discover_slow_paths(self):
+        paths = []
+        reports = self.get_json("/api/reports/?page_size=1")["results"]
+        if reports:
+            paths += [f"/api/reports/{reports[0]['id']}/pdf/?lang={lang}" for lang in ("en", "ur")]
+        sessions = self.get_json("/api/exam-sessions/")["results"]
+        if sessions:
+            paths.append(f"/api/exam-sessions/{sessions[0]['id']}/export/")
+        return paths
+
+    def timed_request(self, path, read_rate):
+        """(seconds, status, bytes): time to the last byte, reading at `read_rate` bytes/s (0 = unthrottled)."""
+        started = time.monotonic()
+        conn = self.connection()
+        size, status = 0, 0
+        try:
+            conn.request("GET", self.base.path.rstrip("/") + path, headers=self.headers)
+            response = conn.getresponse()
+            status = response.status
+            while True:
+                chunk = response.read(READ_CHUNK)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if read_rate:
+                    # Sleep until the client "should" have received this many bytes
+                    lag = size / read_rate - (time.monotonic() - started)
+                    if lag > 0:
+                        time.sleep(lag)
+        except (OSError, http.client.HTTPException):
+            status = 0
+        finally:
+            conn.close()
+        return time.monotonic() - started, status, size
+
+    # -- Reporting ----------------------------------------------------------
+
+    def group_stats(self, samples, elapsed):
+        ok = [seconds for seconds, status, _ in samples if 200 <= status < 400]
+        return {
+            **summarize(ok),
+            "requests": len(samples),
+            "requests_per_second": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+            "errors": sum(1 for _, status, _ in samples if status == 0 or (status >= 400 and status != 503)),
+            "busy_503": sum(1 for _, status, _ in samples if status == 503),
+            "mean_kib": round(sum(size for _, _, size in samples) / len(samples) / 1024, 1) if samples else 0.0,
+        }
+
+    def print_table(self, results):
+        self.stdout.write(f"{'group':<8}{'ok':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'req/s':>8}{'err':>6}{'503':>6}")
+        for group, s in results["groups"].items():
+            self.stdout.write(
+                f"{group:<8}{s['n']:>7}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['max_ms']:>10.1f}"
+                f"{s['requests_per_second']:>8.2f}{s['errors']:>6}{s['busy_503']:>6}"
+            )
+
+    def print_comparison(self, previous, current):
+        name = previous.get("label") or "previous run"
+        self.stdout.write(f"change vs {name}:")
+        for group, s in current["groups"].items():
+            old = previous.get("groups", {}).get(group)
+            if not old:
+                continue
+            for metric in ("p50_ms", "p95_ms", "requests_per_second"):
+                if not old[metric]:
+                    continue
+                delta = (s[metric] - old[metric]) / old[metric] * 100
+                self.stdout.write(f"  {group:<5} {metric:<20} {old[metric]:>10.2f} -> {s[metric]:>10.2f} ({delta:+.1f}%)")
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Backfill / repair the precomputed summary tables.
+
+Usage:
+  python manage.py rebuild_summaries
+  python manage.py rebuild_summaries --exam 12
+
+Recomputes ReportSummary, ExamSummary and ExamSubjectStats from PerformanceEntry
+in one transaction, then rebuilds the report snapshots (ReportSnapshot).
+Day-to-day these rows are maintained by signals; run this after migrating
+(0013 adds the snapshots; reports without one are read from the live tables
+until then), after raw SQL imports, or if the tables are ever suspect.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from reports.summaries import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the report/exam summary tables and report snapshots from performance entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--exam", type=int, help="Only rebuild rows of this exam id.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = rebuild_summaries(exam_id=options["exam"])
+        elapsed = time.perf_counter() - started
+        details = ", ".join(f"{name}={n}" for name, n in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt summaries ({details}) in {elapsed:.2f}s."))
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Process queued PDF render jobs (see reports.render_queue).
+
+Usage:
+  python manage.py run_render_worker
+  python manage.py run_render_worker --workers 4 --poll-interval 1
+  python manage.py run_render_worker --once        # drain the queue and exit
+
+Renders run in a local process pool, so long Urdu layouts never block the
+web workers. Jobs left 'running' by a crashed worker are re-queued at startup.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from reports.models import RenderJob
+from reports.render_queue import claim_next_job, requeue_stale_jobs, run_job, init_worker
+
+
+class Command(BaseCommand):
+    help = "Runs the background PDF render worker pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Size of the render process pool.")
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds to sleep when idle.")
+        parser.add_argument("--stale-after", type=int, default=600,
+                            help="Re-queue jobs running longer than this many seconds at startup.")
+        parser.add_argument("--once", action="store_true", help="Exit when the queue is empty.")
+
+    def handle(self, *args, **options):
+        workers = max(1, options["workers"])
+        requeued = requeue_stale_jobs(timedelta(seconds=options["stale_after"]))
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Re-queued {requeued} stale job(s)."))
+
+        # Children must not share the parent's DB sockets
+        connections.close_all()
+        in_flight = {}
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+            self.stdout.write(self.style.SUCCESS(f"Render worker started with {workers} process(es)."))
+            while True:
+                while len(in_flight) < workers:
+                    job_id = claim_next_job()
+                    if job_id is None:
+                        break
+                    in_flight[pool.submit(run_job, job_id)] = job_id
+
+                if not in_flight:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = in_flight.pop(future)
+                    try:
+                        self.stdout.write(f"job {job_id}: {future.result()}")
+                    except Exception as e:  # the worker process itself died
+                        RenderJob.objects.filter(pk=job_id).update(
+                            status=RenderJob.FAILED, error=f"worker crashed: {e}", finished_at=timezone.now(),
+                        )
+                        self.stdout.write(self.style.ERROR(f"job {job_id}: crashed ({e})"))
+
+        self.stdout.write(self.style.SUCCESS("Render queue drained."))
@@ -0,0 +1,97 @@
+"""
+Bulk mark-sheet upsert for PerformanceEntry.
+
+A whole report's (or exam's) marks arrive in one payload. Every row is
+validated in a single pass against lookup maps built with one query each
+(reports, subjects, existing entries), then all valid rows are written with a
+single INSERT ... ON CONFLICT (report, subject) DO UPDATE inside one
+transaction. Invalid rows are reported back by index; they don't block the rest.
+"""
+
+from django.db import transaction
+
+from .models import Report, Subject, PerformanceEntry
+from .pdf_cache import invalidate_report_pdfs
+from .renditions import report_changed
+from .serializers import MarkSheetRowSerializer
+from .summaries import entries_changed
+
+
+def upsert_mark_sheet(rows, report_id=None, exam_id=None, tutor_id=None):
+    """
+    rows: list of dicts (see MarkSheetRowSerializer).
+    tutor_id: only that tutor's students' reports can be written (reports.scoping).
+    Returns {"created": n, "updated": n, "errors": [{"index": i, "errors": {...}}]}.
+    """
+    errors = []
+    cleaned = []
+    for index, row in enumerate(rows):
+        serializer = MarkSheetRowSerializer(data=row)
+        if serializer.is_valid():
+            cleaned.append((index, serializer.validated_data))
+        else:
+            errors.append({"index": index, "errors": serializer.errors})
+
+    # Lookup maps: one query each
+    report_qs = Report.objects.all() if tutor_id is None else Report.objects.filter(student__tutor_id=tutor_id)
+    if report_id is not None:
+        reports = {r.pk: r for r in report_qs.filter(pk=report_id).only("id")}
+        by_student = {}
+    else:
+        exam_reports = list(report_qs.filter(exam_id=exam_id).only("id", "student_id"))
+        reports = {r.pk: r for r in exam_reports}
+        by_student = {r.student_id: r.pk for r in exam_reports}
+    subject_ids = set(
+        Subject.objects.filter(pk__in={data["subject"] for _, data in cleaned}).values_list("id", flat=True)
+    )
+
+    objs = {}
+    for index, data in cleaned:
+        if report_id is not None:
+            target = report_id if data.get("report", report_id) == report_id else None
+        elif "report" in data:
+            target = data["report"] if data["report"] in reports else None
+        else:
+            target = by_student.get(data.get("student"))
+
+        row_errors = {}
+        if target is None or target not in reports:
+            row_errors["report"] = ["No matching report for this row."]
+        if data["subject"] not in subject_ids:
+            row_errors["subject"] = ["Unknown subject."]
+        elif target is not None and (target, data["subject"]) in objs:
+            row_errors["subject"] = ["Duplicate subject for this report in the payload."]
+        if row_errors:
+            errors.append({"index": index, "errors": row_errors})
+            continue
+        objs[(target, data["subject"])] = PerformanceEntry(
+            report_id=target, subject_id=data["subject"],
+            marks_obtained=data["marks_obtained"], total_marks=data["total_marks"],
+        )
+
+    result = {"created": 0, "updated": 0, "errors": sorted(errors, key=lambda e: e["index"])}
+    if not objs:
+        return result
+
+    touched_reports = {report for report, _ in objs}
+    with transaction.atomic():
+        existing = set(
+            PerformanceEntry.objects.filter(report_id__in=touched_reports)
+            .values_list("report_id", "subject_id")
+        )
+        PerformanceEntry.objects.bulk_create(
+            list(objs.values()),
+            update_conflicts=True,
+            unique_fields=["report", "subject"],
+            update_fields=["marks_obtained", "total_marks"],
+            batch_size=500,
+        )
+        # bulk_create skips model signals: refresh derived data explicitly
+        entries_changed(touched_reports)
+        report_changed(touched_reports)
+    for report in touched_reports:
+        invalidate_report_pdfs(report)
+
+    result["updated"] = sum(1 for key in objs if key in existing)
+    result["created"] = len(objs) - result["updated"]
+    return result
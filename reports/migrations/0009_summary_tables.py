@@ -0,0 +1,65 @@
+# Generated by Django 5.2.4 on 2026-10-17 18:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0008_renderjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamSummary',
+            fields=[
+                ('count', models.PositiveIntegerField(default=0)),
+                ('mean', models.FloatField(default=0)),
+                ('stddev', models.FloatField(default=0)),
+                ('minimum', models.FloatField(default=0)),
+                ('p25', models.FloatField(default=0)),
+                ('median', models.FloatField(default=0)),
+                ('p75', models.FloatField(default=0)),
+                ('p90', models.FloatField(default=0)),
+                ('maximum', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('exam', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='reports.exam')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ReportSummary',
+            fields=[
+                ('report', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='reports.report')),
+                ('total_obtained', models.FloatField(default=0)),
+                ('total_marks', models.FloatField(default=0)),
+                ('percentage', models.FloatField(default=0)),
+                ('subject_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ExamSubjectStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('mean', models.FloatField(default=0)),
+                ('stddev', models.FloatField(default=0)),
+                ('minimum', models.FloatField(default=0)),
+                ('p25', models.FloatField(default=0)),
+                ('median', models.FloatField(default=0)),
+                ('p75', models.FloatField(default=0)),
+                ('p90', models.FloatField(default=0)),
+                ('maximum', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_stats', to='reports.exam')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_stats', to='reports.subject')),
+            ],
+            options={
+                'unique_together': {('exam', 'subject')},
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-17 18:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0009_summary_tables'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='performanceentry',
+            name='subject_cohort_size',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='performanceentry',
+            name='subject_percentile',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='performanceentry',
+            name='subject_rank',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='reportsummary',
+            name='class_percentile',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reportsummary',
+            name='class_rank',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reportsummary',
+            name='cohort_size',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.4 on 2026-10-17 19:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_reports(apps, schema_editor):
+    """Fail with a readable message instead of an IntegrityError if uniq_report_student_exam can't be added."""
+    Report = apps.get_model('reports', 'Report')
+    duplicates = list(
+        Report.objects.values('student_id', 'exam_id').annotate(n=Count('id')).filter(n__gt=1)[:20]
+    )
+    if duplicates:
+        pairs = ", ".join(f"student={d['student_id']} exam={d['exam_id']} ({d['n']} reports)" for d in duplicates)
+        raise RuntimeError(f"Merge or delete duplicate reports before migrating: {pairs}")
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0011_report_renditions'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_reports, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['session', 'exam_type'], name='exam_session_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['date'], name='exam_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='messagelog',
+            index=models.Index(fields=['student', 'timestamp'], name='messagelog_student_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='messagelog',
+            index=models.Index(fields=['timestamp'], name='messagelog_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['report_date'], name='report_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentsession',
+            index=models.Index(fields=['session', 'student'], name='studentsession_session_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tutor',
+            index=models.Index(fields=['created_at'], name='tutor_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='report',
+            constraint=models.UniqueConstraint(fields=('student', 'exam'), name='uniq_report_student_exam'),
+        ),
+        # The new indexes lead with these columns, so the single-column FK indexes are redundant
+        migrations.AlterField(
+            model_name='exam',
+            name='session',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='exams', to='reports.examsession'),
+        ),
+        migrations.AlterField(
+            model_name='messagelog',
+            name='student',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='reports.student'),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='student',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reports', to='reports.student'),
+        ),
+        migrations.AlterField(
+            model_name='studentsession',
+            name='session',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='reports.examsession'),
+        ),
+    ]
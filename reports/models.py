@@ -24,6 +24,8 @@ class Tutor(models.Model):
                 condition=Q(phone__isnull=False) & ~Q(phone=''),
             )
         ]
+        # Admin lists tutors newest first
+        indexes = [models.Index(fields=['created_at'], name='tutor_created_idx')]
 
 class Student(models.Model):
     tutor = models.ForeignKey(Tutor, on_delete=models.CASCADE, related_name='students')
@@ -59,11 +61,15 @@ class ExamSession(models.Model):
 # NEW: enrollment of a student in a session
 class StudentSession(models.Model):
     student = models.ForeignKey('Student', on_delete=models.CASCADE, related_name='enrollments')
-    session = models.ForeignKey('ExamSession', on_delete=models.CASCADE, related_name='exams', null=False, blank=False)
+    # Indexed by the (session, student) index below
+    session = models.ForeignKey('ExamSession', on_delete=models.CASCADE, related_name='enrollments', null=False, blank=False,
+                                db_index=False)
 
 
     class Meta:
         unique_together = ('student', 'session')
+        # "who is enrolled in this session", answered from the index alone
+        indexes = [models.Index(fields=['session', 'student'], name='studentsession_session_idx')]
 
 class Exam(models.Model):
     name = models.CharField(max_length=100)
@@ -72,29 +78,52 @@ class Exam(models.Model):
     # OPTION A (Step 1): make this nullable FIRST so migrations apply without a default prompt.
     # After backfilling in a data migration, set null=False/blank=False (Step 3).
     session = models.ForeignKey('ExamSession', on_delete=models.CASCADE, related_name='exams',
-                                null=True, blank=True)
+                                null=True, blank=True, db_index=False)  # leads exam_session_type_idx
 
     date = models.DateField()
 
     def __str__(self):
         return f"{self.name} ({self.exam_type})"
 
+    class Meta:
+        indexes = [
+            # /api/exams/?session=&exam_type=, session-wide exports and bulk PDFs
+            models.Index(fields=['session', 'exam_type'], name='exam_session_type_idx'),
+            # Admin/summary ordering and progress date ranges
+            models.Index(fields=['date'], name='exam_date_idx'),
+        ]
+
 class Report(models.Model):
-    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='reports')
+    # Indexed by uniq_report_student_exam, which leads with student
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='reports', db_index=False)
     tutor = models.ForeignKey(Tutor, on_delete=models.CASCADE)
     exam = models.ForeignKey(Exam, on_delete=models.CASCADE)
     remarks = models.TextField(blank=True)
     report_date = models.DateField(auto_now_add=True)
     pdf_file = models.FileField(upload_to='reports/', null=True, blank=True)
+    # Set by finalizing (reports.renditions); the version is bumped whenever the printed content changes
+    finalized_at = models.DateTimeField(null=True, blank=True)
+    snapshot_version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"Report for {self.student.full_name} - {self.exam.name}"
 
+    class Meta:
+        constraints = [
+            # One report per student per exam (imports and mark sheets already look reports up this way)
+            models.UniqueConstraint(fields=['student', 'exam'], name='uniq_report_student_exam'),
+        ]
+        indexes = [models.Index(fields=['report_date'], name='report_date_idx')]
+
 class PerformanceEntry(models.Model):
     report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='entries')
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
     marks_obtained = models.FloatField()
     total_marks = models.FloatField()
+    # Position among entries of the same subject, exam and grade level (maintained by reports.ranking)
+    subject_rank = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    subject_percentile = models.FloatField(null=True, blank=True, editable=False)
+    subject_cohort_size = models.PositiveIntegerField(null=True, blank=True, editable=False)
 
     class Meta:
         unique_together = ('report', 'subject')
@@ -107,7 +136,7 @@ class PerformanceEntry(models.Model):
         return f"{self.subject.name} - {self.marks_obtained}/{self.total_marks}"
 
 class MessageLog(models.Model):
-    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, db_index=False)  # leads messagelog_student_ts_idx
     contact_type = models.CharField(max_length=10, choices=[('WhatsApp', 'WhatsApp'), ('SMS', 'SMS'), ('Email', 'Email')])
     status = models.CharField(max_length=20)
     message = models.TextField()
@@ -116,6 +145,14 @@ class MessageLog(models.Model):
     def __str__(self):
         return f"{self.contact_type} to {self.student.full_name} at {self.timestamp}"
 
+    class Meta:
+        indexes = [
+            # A student's message history, newest first
+            models.Index(fields=['student', 'timestamp'], name='messagelog_student_ts_idx'),
+            # Admin date hierarchy / filtering across all students
+            models.Index(fields=['timestamp'], name='messagelog_ts_idx'),
+        ]
+
 class Feedback(models.Model):
     tutor = models.ForeignKey(Tutor, on_delete=models.CASCADE)
     message = models.TextField()
@@ -123,3 +160,102 @@ class Feedback(models.Model):
 
     def __str__(self):
         return f"Feedback by {self.tutor.full_name} at {self.created_at}"
+
+class RenderJob(models.Model):
+    """A queued PDF render, processed by `manage.py run_render_worker`."""
+    QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+    STATUS_CHOICES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='render_jobs')
+    lang = models.CharField(max_length=2, default='en')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'], name='renderjob_status_created_idx')]
+
+    def __str__(self):
+        return f"Render job {self.pk} for report {self.report_id} ({self.lang}, {self.status})"
+
+class ReportRendition(models.Model):
+    """Stored PDF of a finalized report in one language, rendered from `version` of its snapshot."""
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='renditions')
+    lang = models.CharField(max_length=2)
+    version = models.PositiveIntegerField(default=0)
+    file = models.FileField(upload_to='renditions/', null=True, blank=True)
+    rendered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('report', 'lang')
+
+    def __str__(self):
+        return f"Rendition of report {self.report_id} ({self.lang}, v{self.version})"
+
+# Precomputed aggregates, kept current by reports.summaries (see signals.py);
+# rebuild with `manage.py rebuild_summaries`.
+class ReportSummary(models.Model):
+    report = models.OneToOneField(Report, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+    total_obtained = models.FloatField(default=0)
+    total_marks = models.FloatField(default=0)
+    percentage = models.FloatField(default=0)
+    subject_count = models.PositiveIntegerField(default=0)
+    # Position in class: same exam and grade level (maintained by reports.ranking)
+    class_rank = models.PositiveIntegerField(null=True, blank=True)
+    class_percentile = models.FloatField(null=True, blank=True)
+    cohort_size = models.PositiveIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Summary of report {self.report_id}: {self.percentage:.2f}%"
+
+class DistributionStats(models.Model):
+    count = models.PositiveIntegerField(default=0)
+    mean = models.FloatField(default=0)
+    stddev = models.FloatField(default=0)
+    minimum = models.FloatField(default=0)
+    p25 = models.FloatField(default=0)
+    median = models.FloatField(default=0)
+    p75 = models.FloatField(default=0)
+    p90 = models.FloatField(default=0)
+    maximum = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+class ExamSummary(DistributionStats):
+    """Distribution of report percentages for one exam."""
+    exam = models.OneToOneField(Exam, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+
+    def __str__(self):
+        return f"Summary of exam {self.exam_id}"
+
+class ExamSubjectStats(DistributionStats):
+    """Distribution of entry percentages for one subject in one exam."""
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='subject_stats')
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='exam_stats')
+
+    class Meta:
+        unique_together = ('exam', 'subject')
+
+    def __str__(self):
+        return f"Stats for subject {self.subject_id} in exam {self.exam_id}"
+
+class ReportSnapshot(models.Model):
+    """
+    Everything a report prints or lists, denormalized into one JSON row (see
+    reports.snapshots): names in English and Urdu, marks, percentages, totals
+    and ranks. Rebuilt when any of it changes; the live tables stay the
+    source of truth.
+    """
+    report = models.OneToOneField(Report, on_delete=models.CASCADE, primary_key=True, related_name='snapshot')
+    schema = models.PositiveSmallIntegerField(default=1)
+    data = models.JSONField()
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Snapshot of report {self.report_id}"
@@ -0,0 +1,108 @@
+"""
+Pagination for the large list endpoints (/api/reports/, /api/entries/, /api/messages/).
+
+KeysetOrPagePagination keeps the classic ?page=N responses for existing clients
+and switches to keyset (cursor) pagination when the client sends ?cursor=... or
+?pagination=cursor. Keyset pages use `WHERE id < last_seen ORDER BY id` on the
+primary-key index: no OFFSET scan and no COUNT(*) unless the client asks for it
+with ?count=exact (or ?count=approx for the planner's estimate on PostgreSQL).
+"""
+
+from collections import OrderedDict
+
+from django.db import connections
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+MAX_PAGE_SIZE = 200
+
+
+class PagePagination(PageNumberPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+
+
+class KeysetPagination(CursorPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+    # Views override with `keyset_ordering`; must be unique and indexed (the PK is both)
+    ordering = '-id'
+    count_query_param = 'count'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'keyset_ordering', None) or self.ordering
+        return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = self._count(queryset, request.query_params.get(self.count_query_param))
+        return super().paginate_queryset(queryset, request, view)
+
+    def _count(self, queryset, mode):
+        if mode == 'exact':
+            return queryset.count()
+        if mode == 'approx':
+            return approximate_count(queryset)
+        return None
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict([('next', self.get_next_link()), ('previous', self.get_previous_link())])
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        response = super().get_paginated_response_schema(schema)
+        response['properties']['count'] = {'type': 'integer', 'example': 123}
+        return response
+
+
+def approximate_count(queryset):
+    """
+    Planner estimate for an unfiltered table on PostgreSQL (no scan at all);
+    falls back to an exact COUNT(*) for filtered querysets or other backends.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+    return queryset.count()
+
+
+class KeysetOrPagePagination(BasePagination):
+    """Page numbers by default; keyset when ?cursor= or ?pagination=cursor is present."""
+
+    def __init__(self):
+        self.pages = PagePagination()
+        self.keyset = KeysetPagination()
+        self.active = self.pages
+
+    def wants_keyset(self, request):
+        params = request.query_params
+        return self.keyset.cursor_query_param in params or params.get('pagination') == 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.active = self.keyset if self.wants_keyset(request) else self.pages
+        return self.active.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.pages.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return self.pages.get_schema_operation_parameters(view) + self.keyset.get_schema_operation_parameters(view)
+
+    def to_html(self):
+        return self.active.to_html()
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.active, 'display_page_controls', False)
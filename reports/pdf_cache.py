@@ -0,0 +1,158 @@
+"""
+Content-addressed cache for rendered report PDFs.
+
+Each PDF is stored under ``pdf_cache/report_<id>/<lang>_<fingerprint>.pdf`` in
+the default storage. The fingerprint hashes everything that ends up in the
+document (report + entries + names, template source, stylesheets, Urdu fonts
+and subset mode, lang, PDF engine), so a stale file can never be served: any change simply produces a new
+key. Signals (see ``reports.signals``) additionally delete old files so storage
+doesn't grow.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .font_subsets import full_font_path
+from .render_context import get_render_context
+from .utils import normalize_lang, pdf_engine, render_report_pdf
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = "pdf_cache"
+
+# Bump to invalidate every cached PDF (e.g. after changing the render code).
+CACHE_VERSION = "1"
+
+# (path, mtime, size) -> sha256 of the file, so unchanged files are hashed once per process
+_file_digests = {}
+
+
+def _file_digest(path):
+    if not path or not os.path.exists(path):
+        return "missing"
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    digest = _file_digests.get(key)
+    if digest is None:
+        with open(path, "rb") as fh:
+            digest = hashlib.sha256(fh.read()).hexdigest()
+        _file_digests[key] = digest
+    return digest
+
+
+def _asset_digests(lang):
+    """Digests of the template and stylesheets that shape the output."""
+    return [_file_digest(path) for path in get_render_context().files]
+
+
+def _font_digests(lang):
+    """Digests of the Urdu fonts (WeasyPrint's, ReportLab's) and whether subsets are embedded."""
+    if lang != "ur":
+        return None
+    return [
+        _file_digest(full_font_path()),
+        _file_digest(getattr(settings, "REPORTLAB_URDU_FONT", None)),
+        bool(getattr(settings, "REPORT_FONT_SUBSETS", True)),
+    ]
+
+
+def _rank(report):
+    try:
+        summary = report.summary
+    except ObjectDoesNotExist:
+        return None
+    return [summary.class_rank, summary.cohort_size]
+
+
+def report_fingerprint(report, entries, lang):
+    """
+    Stable hex digest for (report data, template, CSS, fonts, lang).
+    `report` must have student/tutor/exam loaded and `entries` their subject.
+    """
+    lang = normalize_lang(lang)
+    payload = {
+        "v": CACHE_VERSION,
+        "lang": lang,
+        "engine": pdf_engine(),
+        "report": [report.pk, report.remarks, str(report.report_date)],
+        "student": [report.student.full_name, report.student.full_name_urdu],
+        "tutor": [report.tutor.full_name, report.tutor.full_name_urdu],
+        "exam": [report.exam.name, report.exam.exam_type, str(report.exam.date)],
+        "rank": _rank(report),
+        "entries": [
+            [e.pk, e.subject.name, e.subject.name_urdu, e.marks_obtained, e.total_marks]
+            for e in entries
+        ],
+        "assets": _asset_digests(lang),
+        "fonts": _font_digests(lang),
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _report_dir(report_id):
+    return f"{CACHE_DIR}/report_{report_id}"
+
+
+def cache_path(report_id, lang, fingerprint):
+    return f"{_report_dir(report_id)}/{normalize_lang(lang)}_{fingerprint}.pdf"
+
+
+def get_cached_pdf(report_id, lang, fingerprint):
+    """Return cached PDF bytes, or None on a miss."""
+    path = cache_path(report_id, lang, fingerprint)
+    try:
+        if not default_storage.exists(path):
+            return None
+        with default_storage.open(path, "rb") as fh:
+            return fh.read()
+    except OSError:
+        logger.warning("Unreadable PDF cache entry %s", path, exc_info=True)
+        return None
+
+
+def store_pdf(report_id, lang, fingerprint, pdf_bytes):
+    """Persist rendered bytes under their content address. Returns the storage path."""
+    path = cache_path(report_id, lang, fingerprint)
+    if default_storage.exists(path):
+        return path
+    return default_storage.save(path, ContentFile(pdf_bytes))
+
+
+def get_or_render_pdf(report, entries, lang, fingerprint=None, stylesheets=None):
+    """
+    Serve from the cache or render and store.
+    Returns (pdf_bytes, fingerprint, hit).
+    """
+    fingerprint = fingerprint or report_fingerprint(report, entries, lang)
+    pdf_bytes = get_cached_pdf(report.pk, lang, fingerprint)
+    if pdf_bytes is not None:
+        return pdf_bytes, fingerprint, True
+
+    pdf_bytes = render_report_pdf(report, entries, lang=lang, stylesheets=stylesheets)
+    try:
+        store_pdf(report.pk, lang, fingerprint, pdf_bytes)
+    except OSError:
+        logger.warning("Could not store cached PDF for report=%s lang=%s", report.pk, lang, exc_info=True)
+    return pdf_bytes, fingerprint, False
+
+
+def invalidate_report_pdfs(report_id):
+    """Delete every cached PDF of a report (all languages/fingerprints)."""
+    directory = _report_dir(report_id)
+    try:
+        if not default_storage.exists(directory):
+            return 0
+        _, files = default_storage.listdir(directory)
+    except (OSError, NotImplementedError):
+        return 0
+    for name in files:
+        default_storage.delete(f"{directory}/{name}")
+    return len(files)
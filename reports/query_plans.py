@@ -0,0 +1,77 @@
+"""
+EXPLAIN checks for the hot query paths of the API and admin.
+
+HOT_QUERIES builds the querysets that reports/views.py and reports/admin.py run
+on every page load (filters, lookups and orderings on the indexed columns), and
+sequential_scans() reports which tables a query would read in full. The test
+suite asserts that none of them does, so dropping or forgetting an index fails
+CI instead of showing up as a slow page in production.
+
+SQLite plans come from EXPLAIN QUERY PLAN ("SCAN <table>" without an index);
+on PostgreSQL sequential scans are disabled for the EXPLAIN so a "Seq Scan"
+only appears when no index can serve the query at all (tiny test tables would
+otherwise always be scanned).
+"""
+
+import re
+from datetime import date, datetime, timezone
+
+from django.db import connection, transaction
+
+from .models import Exam, MessageLog, PerformanceEntry, RenderJob, Report, StudentSession, Tutor
+
+# SQLite: "SCAN reports_exam" (full scan) vs "SCAN reports_exam USING INDEX ..." / "SEARCH ..."
+_SQLITE_SCAN = re.compile(r"\bSCAN (?:TABLE )?(\w+)(?! USING (?:COVERING )?INDEX)(?:\s|$)")
+_POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+# Any id works: plans don't depend on whether rows exist
+_ID = 1
+_DATE = date(2025, 1, 1)
+_DATETIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def hot_queries():
+    """{name: queryset} for the filters and orderings the views and admin rely on."""
+    return {
+        # ExamViewSet: ?session=&exam_type=
+        "exams by session and type": Exam.objects.filter(session_id=_ID, exam_type="Final"),
+        # ExamAdmin ordering / date hierarchy
+        "exams by date": Exam.objects.filter(date__gte=_DATE).order_by("-date")[:100],
+        # Importer / mark sheets: the report of a student in an exam
+        "report of student in exam": Report.objects.filter(student_id=_ID, exam_id=_ID),
+        "reports of student": Report.objects.filter(student_id=_ID),
+        # ReportAdmin date hierarchy / list_filter
+        "reports by date": Report.objects.filter(report_date__gte=_DATE).order_by("-report_date")[:100],
+        # A student's messages, newest first; MessageLogAdmin date hierarchy
+        "messages of student": MessageLog.objects.filter(student_id=_ID).order_by("-timestamp")[:50],
+        "messages by date": MessageLog.objects.filter(timestamp__gte=_DATETIME),
+        # Enrollments of a session (ExamSessionViewSet ?student= joins the other way)
+        "students in session": StudentSession.objects.filter(session_id=_ID).values_list("student_id", flat=True),
+        "sessions of student": StudentSession.objects.filter(student_id=_ID),
+        # Per-tutor scoping (reports.scoping): Report -> Student -> Tutor
+        "reports of tutor": Report.objects.filter(student__tutor_id=_ID),
+        "entries of tutor": PerformanceEntry.objects.filter(report__student__tutor_id=_ID),
+        # TutorAdmin ordering
+        "tutors newest first": Tutor.objects.order_by("-created_at")[:100],
+        # PerformanceEntryViewSet ?report=
+        "entries of report": PerformanceEntry.objects.filter(report_id=_ID).order_by("id"),
+        # Render worker polling
+        "queued render jobs": RenderJob.objects.filter(status=RenderJob.QUEUED).order_by("created_at")[:1],
+    }
+
+
+def explain(queryset):
+    """The database's plan for `queryset` as text."""
+    if connection.vendor == "postgresql":
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            return queryset.explain()
+    return queryset.explain()
+
+
+def sequential_scans(queryset):
+    """Tables `queryset` reads in full (empty if every table is reached through an index)."""
+    plan = explain(queryset)
+    pattern = _POSTGRES_SCAN if connection.vendor == "postgresql" else _SQLITE_SCAN
+    return sorted(set(pattern.findall(plan)))
@@ -0,0 +1,115 @@
+"""
+Class ranks and percentiles per Exam.
+
+A cohort is every report of one exam whose student has the same grade level.
+Within a cohort we rank reports by overall percentage (stored on ReportSummary)
+and entries by subject percentage (stored on PerformanceEntry). Ties share a
+rank ("1224" competition ranking). The percentile is the percentile rank
+100 * (below + 0.5 * tied) / cohort size, where `tied` includes the row itself.
+
+recompute_exam_ranks() reads the exam in two queries and only writes rows
+whose rank actually changed, so a single mark edit touches few rows. The
+snapshots (reports.snapshots) of re-ranked reports are rebuilt before their
+finalized PDFs are queued for re-rendering, which reads them.
+"""
+
+from collections import defaultdict
+
+from django.db.models import Sum
+
+from .analytics import percentage_expression
+from .models import PerformanceEntry, ReportSummary
+from .renditions import report_changed
+from .snapshots import refresh_snapshots
+
+
+def competition_ranks(scores):
+    """
+    {key: score} -> {key: (rank, percentile, cohort_size)}.
+    Higher score ranks first; equal scores share the best rank.
+    """
+    n = len(scores)
+    ordered = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+    result = {}
+    i = 0
+    while i < n:
+        j = i
+        while j < n and ordered[j][1] == ordered[i][1]:
+            j += 1
+        tied = j - i
+        below = n - j
+        percentile = round(100.0 * (below + 0.5 * tied) / n, 2)
+        for key, _ in ordered[i:j]:
+            result[key] = (i + 1, percentile, n)
+        i = j
+    return result
+
+
+def _round(value):
+    # Avoid float noise turning equal marks into different ranks
+    return round(value, 6)
+
+
+def recompute_exam_ranks(exam_id, update_snapshots=True):
+    """
+    Recompute overall and per-subject ranks for every cohort of one exam.
+    Returns the ids of the reports whose ranks (overall or of an entry) changed;
+    their snapshots are rebuilt unless `update_snapshots` is False.
+    """
+    # Overall: per-report percentage from the entries themselves
+    report_rows = (
+        PerformanceEntry.objects.filter(report__exam_id=exam_id)
+        .values("report_id", "report__student__grade_level")
+        .annotate(obtained=Sum("marks_obtained"), total=Sum("total_marks"))
+    )
+    overall = defaultdict(dict)
+    for row in report_rows:
+        pct = (row["obtained"] / row["total"]) * 100 if row["total"] else 0
+        overall[row["report__student__grade_level"]][row["report_id"]] = _round(pct)
+
+    report_ranks = {}
+    for scores in overall.values():
+        report_ranks.update(competition_ranks(scores))
+
+    changed, reprinted = [], []
+    for summary in ReportSummary.objects.filter(report__exam_id=exam_id).only(
+        "report_id", "class_rank", "class_percentile", "cohort_size"
+    ):
+        new = report_ranks.get(summary.report_id, (None, None, None))
+        if (summary.class_rank, summary.class_percentile, summary.cohort_size) != new:
+            if (summary.class_rank, summary.cohort_size) != (new[0], new[2]):
+                reprinted.append(summary.report_id)  # the PDF prints "rank / cohort size"
+            summary.class_rank, summary.class_percentile, summary.cohort_size = new
+            changed.append(summary)
+    ReportSummary.objects.bulk_update(changed, ["class_rank", "class_percentile", "cohort_size"], batch_size=500)
+
+    # Per subject
+    entries = list(
+        PerformanceEntry.objects.filter(report__exam_id=exam_id)
+        .annotate(pct=percentage_expression())
+        .values_list("id", "report_id", "report__student__grade_level", "subject_id", "pct",
+                     "subject_rank", "subject_percentile", "subject_cohort_size")
+    )
+    cohorts = defaultdict(dict)
+    for entry_id, _, grade, subject_id, pct, *_ in entries:
+        cohorts[(grade, subject_id)][entry_id] = _round(pct)
+    entry_ranks = {}
+    for scores in cohorts.values():
+        entry_ranks.update(competition_ranks(scores))
+
+    changed_entries = [
+        PerformanceEntry(
+            id=entry_id, report_id=report_id, subject_rank=entry_ranks[entry_id][0],
+            subject_percentile=entry_ranks[entry_id][1], subject_cohort_size=entry_ranks[entry_id][2],
+        )
+        for entry_id, report_id, _, _, _, *current in entries
+        if tuple(current) != entry_ranks[entry_id]
+    ]
+    PerformanceEntry.objects.bulk_update(
+        changed_entries, ["subject_rank", "subject_percentile", "subject_cohort_size"], batch_size=500,
+    )
+    ranked = {summary.report_id for summary in changed} | {entry.report_id for entry in changed_entries}
+    if update_snapshots:
+        refresh_snapshots(ranked)
+    report_changed(reprinted)
+    return ranked
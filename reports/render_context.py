@@ -0,0 +1,111 @@
+"""
+Process-level WeasyPrint render context.
+
+Parsing the stylesheets, compiling the report template and loading the
+Noto Nastaliq @font-face into a FontConfiguration used to happen on every
+generate_report_pdf call. RenderContext does that work once per process
+(gunicorn worker, render worker, bulk pool worker) and every render reuses it.
+The context is rebuilt automatically when the template or a stylesheet changes
+on disk, and `render_context_stats()` reports how much build time reuse saved.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from django.contrib.staticfiles import finders
+from django.template.loader import get_template
+from weasyprint import CSS
+from weasyprint.text.fonts import FontConfiguration
+
+logger = logging.getLogger(__name__)
+
+LANGS = ("en", "ur")
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+
+class RenderContext:
+    """Parsed stylesheets per lang + shared FontConfiguration + compiled template."""
+
+    def __init__(self):
+        # Imported here to avoid a cycle: utils renders through this module
+        from .utils import REPORT_TEMPLATE, stylesheet_paths
+
+        started = time.perf_counter()
+        self.font_config = FontConfiguration()
+        self.template = get_template(REPORT_TEMPLATE)
+
+        self.files = [self.template.origin.name]
+        self.stylesheets = {}
+        for lang in LANGS:
+            sheets = []
+            for static_path in stylesheet_paths(lang):
+                fs_path = finders.find(static_path)
+                if fs_path and os.path.exists(fs_path):
+                    sheets.append(CSS(filename=fs_path, font_config=self.font_config))
+                    self.files.append(fs_path)
+            self.stylesheets[lang] = sheets
+        self.signature = self._current_signature()
+        self.build_seconds = time.perf_counter() - started
+
+    def _current_signature(self):
+        return tuple((path, _mtime(path)) for path in self.files)
+
+    def is_stale(self):
+        return self._current_signature() != self.signature
+
+
+_lock = threading.Lock()
+_context = None
+_stats = {"builds": 0, "reuses": 0, "build_seconds": 0.0}
+
+
+def get_render_context():
+    """Return the process' RenderContext, (re)building it if missing or stale."""
+    global _context
+    ctx = _context
+    if ctx is not None and not ctx.is_stale():
+        _stats["reuses"] += 1
+        return ctx
+    with _lock:
+        if _context is None or _context.is_stale():
+            _context = RenderContext()
+            _stats["builds"] += 1
+            _stats["build_seconds"] += _context.build_seconds
+            logger.info("Built PDF render context in %.1f ms (pid %s)", _context.build_seconds * 1000, os.getpid())
+        else:
+            _stats["reuses"] += 1
+        return _context
+
+
+def warm_render_context():
+    """Build the context eagerly; call from worker start-up hooks/initializers."""
+    return get_render_context()
+
+
+def invalidate_render_context():
+    global _context
+    with _lock:
+        _context = None
+
+
+def render_context_stats():
+    """
+    Build/reuse counters for this process. `saved_seconds` estimates the
+    per-render setup time avoided: each reuse skips one average build.
+    """
+    builds = _stats["builds"]
+    avg_build = _stats["build_seconds"] / builds if builds else 0.0
+    return {
+        "builds": builds,
+        "reuses": _stats["reuses"],
+        "avg_build_ms": round(avg_build * 1000, 3),
+        "saved_seconds": round(_stats["reuses"] * avg_build, 3),
+    }
@@ -0,0 +1,90 @@
+"""
+Bounded process pool for renders requested by the async views.
+
+Under ASGI (reports.async_views) a PDF that has to be rendered during the
+request is handed to this per-process pool, so the event loop keeps serving
+other requests while WeasyPrint lays the document out in another process.
+
+At most REPORT_RENDER_POOL_WORKERS renders run at once, and at most
+REPORT_RENDER_POOL_QUEUE more can wait. A request beyond that gets
+RenderPoolBusy (503 + Retry-After) at once instead of queueing behind minutes
+of renders. REPORT_RENDER_POOL_WORKERS=0 renders in a thread of the server
+process instead (tests, tiny deployments).
+"""
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+_lock = threading.Lock()
+_pool = None
+_slots = None
+
+
+class RenderPoolBusy(Exception):
+    """Every render slot is taken; the client should retry later."""
+
+
+def pool_size():
+    return max(0, getattr(settings, "REPORT_RENDER_POOL_WORKERS", 2))
+
+
+def _capacity():
+    return max(1, pool_size()) + max(0, getattr(settings, "REPORT_RENDER_POOL_QUEUE", 8))
+
+
+def _get_slots():
+    global _slots
+    with _lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(_capacity())
+        return _slots
+
+
+def _init_worker():
+    # Spawned children import this module before Django is set up: models only after setup
+    import django
+    django.setup()
+    from .render_queue import init_worker
+    init_worker()
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            # Spawned, not forked: the server process runs threads (sync views, DB connections)
+            _pool = ProcessPoolExecutor(
+                max_workers=pool_size(), mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker,
+            )
+        return _pool
+
+
+async def run_render(fn, *args):
+    """
+    Run `fn(*args)` (a module-level function; its arguments and result are
+    pickled) in the render pool and return its result.
+    Raises RenderPoolBusy if the pool and its queue are full.
+    """
+    slots = _get_slots()
+    if not slots.acquire(blocking=False):
+        raise RenderPoolBusy()
+    try:
+        if pool_size() == 0:
+            return await sync_to_async(fn)(*args)
+        return await asyncio.wrap_future(_get_pool().submit(fn, *args))
+    finally:
+        slots.release()
+
+
+def shutdown():
+    """Stop the pool (waits for running renders); the next render starts a new one."""
+    global _pool, _slots
+    with _lock:
+        pool, _pool, _slots = _pool, None, None
+    if pool is not None:
+        pool.shutdown(wait=True)
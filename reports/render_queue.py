@@ -0,0 +1,110 @@
+"""
+DB-backed PDF render queue.
+
+Requests enqueue a RenderJob row; `manage.py run_render_worker` claims queued
+jobs and renders them in a local process pool, writing the result into
+Report.pdf_file (and, for finalized reports, the ReportRendition served by the
+`/pdf` action). No external broker needed.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.db import connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Report, RenderJob
+from .utils import load_report, normalize_lang
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_render(report_id, lang='en', reuse_running=True):
+    """
+    Queue a render, reusing a pending job for the same report/lang. Returns (job, created).
+    reuse_running=False only reuses jobs that haven't started (their data is read later).
+    """
+    lang = normalize_lang(lang)
+    statuses = [RenderJob.QUEUED, RenderJob.RUNNING] if reuse_running else [RenderJob.QUEUED]
+    pending = (
+        RenderJob.objects
+        .filter(report_id=report_id, lang=lang, status__in=statuses)
+        .order_by('created_at')
+        .first()
+    )
+    if pending:
+        return pending, False
+    return RenderJob.objects.create(report_id=report_id, lang=lang), True
+
+
+def claim_next_job():
+    """
+    Atomically move the oldest queued job to 'running' and return its id (None if idle).
+    The conditional UPDATE makes this safe across several workers on any backend.
+    """
+    while True:
+        job_id = (
+            RenderJob.objects.filter(status=RenderJob.QUEUED)
+            .order_by('created_at', 'id')
+            .values_list('id', flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        claimed = RenderJob.objects.filter(pk=job_id, status=RenderJob.QUEUED).update(
+            status=RenderJob.RUNNING, started_at=timezone.now(), attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return job_id
+        # another worker won the race; try the next one
+
+
+def requeue_stale_jobs(older_than=timedelta(minutes=10)):
+    """Put back jobs left 'running' by a crashed worker."""
+    cutoff = timezone.now() - older_than
+    return RenderJob.objects.filter(status=RenderJob.RUNNING, started_at__lt=cutoff).update(
+        status=RenderJob.QUEUED, started_at=None,
+    )
+
+
+def run_job(job_id):
+    """
+    Render one claimed job and store the PDF on its report.
+    Runs inside a pool worker; returns the final status.
+    """
+    # Imported here so pool workers pick up the cache module after django.setup()
+    from .pdf_cache import get_or_render_pdf
+    from .renditions import store_rendition
+
+    job = RenderJob.objects.get(pk=job_id)
+    try:
+        report, entries = load_report(job.report_id)
+        pdf_bytes, _, _ = get_or_render_pdf(report, entries, job.lang)
+
+        if report.pdf_file:
+            report.pdf_file.delete(save=False)
+        report.pdf_file.save(f"report_{report.pk}_{job.lang}.pdf", ContentFile(pdf_bytes), save=False)
+        # update() instead of save(): the new file must not trigger cache invalidation signals
+        Report.objects.filter(pk=report.pk).update(pdf_file=report.pdf_file.name)
+        if report.finalized_at:
+            store_rendition(report.pk, job.lang, report.snapshot_version, pdf_bytes)
+
+        job.status, job.error = RenderJob.DONE, ''
+    except Exception as e:
+        logger.exception("Render job %s failed", job_id)
+        job.status, job.error = RenderJob.FAILED, str(e)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+    return job.status
+
+
+def init_worker():
+    """ProcessPoolExecutor initializer: set Django up, drop inherited DB connections, warm the render context."""
+    import django
+    django.setup()
+    connections.close_all()
+
+    from .render_context import warm_render_context
+    warm_render_context()
@@ -0,0 +1,98 @@
+"""
+Pre-rendered PDFs of finalized reports.
+
+Finalizing a report bumps Report.snapshot_version and queues background
+renders of both languages (reports.render_queue). Every later change to what
+the PDF prints - its entries, the report row, its class position - bumps the
+version again and re-queues. Each ReportRendition records the version its file
+was rendered from, so the `pdf` action serves stored files only while they are
+current and never has to render on a normal download.
+"""
+
+import logging
+from functools import partial
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Report, ReportRendition
+from .render_queue import enqueue_render
+from .utils import load_report, normalize_lang
+
+logger = logging.getLogger(__name__)
+
+LANGS = ("en", "ur")
+
+
+def _queue_renders(report_ids):
+    # Runs on commit: a report may have been deleted (or reopened) since it was queued
+    live = Report.objects.filter(pk__in=report_ids, finalized_at__isnull=False).values_list("pk", flat=True)
+    for report_id in live:
+        for lang in LANGS:
+            # A job already running may have read the previous snapshot
+            enqueue_render(report_id, lang, reuse_running=False)
+
+
+def finalize_report(report_id):
+    """Mark a report final and queue its renditions (once the transaction commits)."""
+    Report.objects.filter(pk=report_id).update(
+        finalized_at=timezone.now(), snapshot_version=F("snapshot_version") + 1,
+    )
+    transaction.on_commit(partial(_queue_renders, (report_id,)))
+
+
+def report_changed(report_ids):
+    """
+    Bump the snapshot version of the finalized reports among `report_ids` and
+    queue their re-render. Unfinalized reports are ignored. Returns the ids bumped.
+    """
+    ids = list(
+        Report.objects.filter(pk__in=set(report_ids), finalized_at__isnull=False).values_list("pk", flat=True)
+    )
+    if ids:
+        Report.objects.filter(pk__in=ids).update(snapshot_version=F("snapshot_version") + 1)
+        transaction.on_commit(partial(_queue_renders, ids))
+    return ids
+
+
+def current_rendition(report, lang):
+    """The stored rendition of `report` matching its snapshot version, or None."""
+    rendition = ReportRendition.objects.filter(
+        report_id=report.pk, lang=normalize_lang(lang), version=report.snapshot_version,
+    ).first()
+    if rendition is None or not rendition.file or not rendition.file.storage.exists(rendition.file.name):
+        return None
+    return rendition
+
+
+def store_rendition(report_id, lang, version, pdf_bytes):
+    """
+    Save `pdf_bytes` as the rendition of snapshot `version`. A render of an
+    older version never replaces a newer file; the newer rendition is returned then.
+    """
+    lang = normalize_lang(lang)
+    rendition, _ = ReportRendition.objects.get_or_create(report_id=report_id, lang=lang)
+    previous = rendition.file.name if rendition.file else None
+    rendition.file.save(f"report_{report_id}_{lang}_v{version}.pdf", ContentFile(pdf_bytes), save=False)
+    stored = ReportRendition.objects.filter(pk=rendition.pk, version__lte=version).update(
+        file=rendition.file.name, version=version, rendered_at=timezone.now(),
+    )
+    if not stored:
+        rendition.file.delete(save=False)
+        return ReportRendition.objects.get(pk=rendition.pk)
+    if previous and previous != rendition.file.name:
+        rendition.file.storage.delete(previous)
+    rendition.version = version
+    return rendition
+
+
+def render_rendition(report_id, lang):
+    """Render the report as it is now and store it under its current snapshot version."""
+    # Imported here so pool workers pick up the cache module after django.setup()
+    from .pdf_cache import get_or_render_pdf
+
+    report, entries = load_report(report_id)
+    pdf_bytes, _, _ = get_or_render_pdf(report, entries, lang)
+    return store_rendition(report.pk, lang, report.snapshot_version, pdf_bytes)
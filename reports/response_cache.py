@@ -0,0 +1,141 @@
+"""
+Response cache for read-heavy API endpoints.
+
+CachedResponseMixin stores the serialized data of `list` and `retrieve`
+responses in the default Django cache (Redis in production or a shared
+directory; see CACHES in settings). It is only on (API_RESPONSE_CACHE) when
+that cache is shared by every worker: with per-process memory a version bump
+would only reach the worker that handled the write. Keys contain a version per model
+listed in `cache_models`, and the signal handlers in reports.signals bump
+those versions on every save/delete, so a change makes the old entries
+unreachable instead of deleting them. A response computed while a version is
+bumped is stored under the old key, so it can't go stale either.
+
+Each cached response carries an ETag (hash of the data) and a Last-Modified
+(time of the latest version bump), and conditional GETs with If-None-Match /
+If-Modified-Since get a 304 without touching the database.
+
+Tutor-scoped viewsets (reports.scoping), and shared ones when a query param
+in `tutor_scoped_params` is given (e.g. ?student=), key their entries by the
+requesting tutor, so one tutor's cached response is never served to another.
+
+Queryset .update()/.bulk_create() bypass signals: call bump_versions() after
+bulk writes to cached models.
+"""
+
+import hashlib
+import json
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .scoping import TutorScopedMixin, is_unscoped, tutor_id_for
+
+KEY_PREFIX = "api"
+# Versions live longer than any response TTL; a lost version just resets them
+VERSION_TTL = 60 * 60 * 24 * 30
+
+
+def _version_key(model):
+    return f"{KEY_PREFIX}:version:{model._meta.label_lower}"
+
+
+def _bump(models):
+    now = time.time()
+    cache.set_many({_version_key(model): now for model in models}, VERSION_TTL)
+
+
+def bump_versions(*models):
+    """
+    Invalidate every cached response that depends on `models`, once the
+    current transaction commits (a reader could otherwise cache the
+    uncommitted, old rows under the new version).
+    """
+    transaction.on_commit(partial(_bump, models))
+
+
+def _versions(models):
+    """Current version (time of last change) of each model, initialising missing ones."""
+    keys = [_version_key(model) for model in models]
+    found = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, VERSION_TTL)
+        found.update(missing)
+    return [found[key] for key in keys]
+
+
+def _etag(data):
+    payload = json.dumps(data, sort_keys=True, default=str, ensure_ascii=False)
+    return quote_etag(hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32])
+
+
+class CachedResponseMixin:
+    """
+    ViewSet mixin caching GET list/retrieve responses.
+
+    `cache_models` are the models whose changes invalidate the responses (the
+    viewset's own model by default) and `cache_ttl` bounds how long an entry
+    is kept, in seconds. `tutor_scoped_params` are query params whose results
+    depend on the requesting tutor.
+    """
+    cache_ttl = 300
+    cache_models = None
+    tutor_scoped_params = ()
+
+    def get_cache_models(self):
+        return self.cache_models or (self.get_queryset().model,)
+
+    def _cache_scope(self):
+        scoped = isinstance(self, TutorScopedMixin) or any(
+            name in self.request.query_params for name in self.tutor_scoped_params
+        )
+        if not scoped or is_unscoped(self.request.user):
+            return "all"
+        return f"tutor{tutor_id_for(self.request.user)}"
+
+    def _cache_key(self, request, versions):
+        query = sorted(request.query_params.lists())
+        digest = hashlib.sha256(
+            json.dumps([request.path, query, request.accepted_renderer.format]).encode("utf-8")
+        ).hexdigest()[:32]
+        version = hashlib.sha256(repr(versions).encode("utf-8")).hexdigest()[:16]
+        return f"{KEY_PREFIX}:{self.basename}:{self._cache_scope()}:{version}:{digest}"
+
+    def _cached(self, request, handler, *args, **kwargs):
+        if not getattr(settings, "API_RESPONSE_CACHE", False):
+            return handler(request, *args, **kwargs)
+        versions = _versions(self.get_cache_models())
+        key = self._cache_key(request, versions)
+        entry = cache.get(key)
+        if entry is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            entry = {"data": response.data, "etag": _etag(response.data), "last_modified": max(versions)}
+            cache.set(key, entry, self.cache_ttl)
+            cache_status = "MISS"
+        else:
+            cache_status = "HIT"
+
+        response = Response(entry["data"])
+        response["ETag"] = entry["etag"]
+        response["Last-Modified"] = http_date(entry["last_modified"])
+        response["Cache-Control"] = "private, no-cache"
+        response["X-Cache"] = cache_status
+        patch_vary_headers(response, ("Authorization",))
+        return get_conditional_response(
+            request._request, etag=entry["etag"], last_modified=int(entry["last_modified"]), response=response,
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(request, super().retrieve, *args, **kwargs)
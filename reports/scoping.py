@@ -0,0 +1,143 @@
+"""
+Per-tutor data scoping for the API.
+
+Every tutor-owned queryset is filtered by the requesting user's Tutor through
+indexed foreign keys: students by tutor_id, then reports by student_id (the
+leading column of uniq_report_student_exam), then entries/summaries/jobs by
+report_id. A tutor's queries therefore cost in proportion to their own
+students and reports, not the whole table.
+
+Ownership follows Report -> Student -> Tutor (the student's tutor owns the
+report), so reports stay visible to the tutor who teaches the student even if
+Report.tutor still names a previous tutor.
+
+The tutor id comes from the access token's "tutor_id" claim
+(reports.authentication) and is cached on request.user, the User instance
+loaded for this request; without the claim it is looked up once per request. Staff users see
+everything; authenticated users without a Tutor profile see nothing.
+"""
+
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import SAFE_METHODS, BasePermission, IsAuthenticated
+
+from .models import Tutor, Student, Report
+
+TUTOR_ID_CLAIM = "tutor_id"
+_TUTOR_ID_ATTR = "_reports_tutor_id"
+_MISSING = object()
+
+# Owner lookup (path to the Tutor's id) per scoped model, following the indexed chain
+OWNER_PATHS = {
+    "Tutor": "id",
+    "Student": "tutor_id",
+    "Feedback": "tutor_id",
+    "Report": "student__tutor_id",
+    "MessageLog": "student__tutor_id",
+    "StudentSession": "student__tutor_id",
+    "PerformanceEntry": "report__student__tutor_id",
+    "RenderJob": "report__student__tutor_id",
+    "ReportSummary": "report__student__tutor_id",
+}
+
+
+def is_unscoped(user):
+    """Staff see every tutor's data (admin dashboards, support)."""
+    return bool(user and user.is_authenticated and user.is_staff)
+
+
+class IsStaffOrReadOnly(BasePermission):
+    """
+    Shared catalogs (sessions, exams, subjects): every authenticated user reads,
+    only staff write. Deleting an exam cascades into every tutor's reports.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        return request.method in SAFE_METHODS or is_unscoped(user)
+
+
+def cache_tutor_id(user, tutor_id):
+    """Remember `user`'s tutor id (e.g. from a token claim) for this request."""
+    setattr(user, _TUTOR_ID_ATTR, tutor_id)
+
+
+def tutor_id_for(user):
+    """Id of `user`'s Tutor (None if it has none), cached on the user object."""
+    if user is None or not user.is_authenticated:
+        return None
+    tutor_id = getattr(user, _TUTOR_ID_ATTR, _MISSING)
+    if tutor_id is _MISSING:
+        tutor_id = Tutor.objects.filter(user_id=user.pk).values_list("id", flat=True).first()
+        cache_tutor_id(user, tutor_id)
+    return tutor_id
+
+
+def scope_queryset(queryset, user, owner_path=None):
+    """`queryset` restricted to rows owned by `user`'s tutor."""
+    if is_unscoped(user):
+        return queryset
+    tutor_id = tutor_id_for(user)
+    if tutor_id is None:
+        return queryset.none()
+    owner_path = owner_path or OWNER_PATHS[queryset.model.__name__]
+    return queryset.filter(**{owner_path: tutor_id})
+
+
+def scope_tutor_id(user):
+    """Tutor id to filter helper queries by (None = unrestricted, for staff)."""
+    if is_unscoped(user):
+        return None
+    tutor_id = tutor_id_for(user)
+    if tutor_id is None:
+        raise PermissionDenied("This account has no tutor profile.")
+    return tutor_id
+
+
+def check_owned(user, validated_data):
+    """
+    Reject writes that point at another tutor's tutor/student/report.
+    Checks every Tutor, Student and Report value in `validated_data`.
+    """
+    if is_unscoped(user):
+        return
+    tutor_id = tutor_id_for(user)
+    for value in validated_data.values():
+        if isinstance(value, Tutor):
+            owned = tutor_id is not None and value.pk == tutor_id
+        elif isinstance(value, Student):
+            owned = tutor_id is not None and value.tutor_id == tutor_id
+        elif isinstance(value, Report):
+            owned = tutor_id is not None and Student.objects.filter(
+                pk=value.student_id, tutor_id=tutor_id,
+            ).exists()
+        else:
+            continue
+        if not owned:
+            raise PermissionDenied("You can only use your own students, reports and tutor profile.")
+
+
+class TutorScopedMixin:
+    """
+    ViewSet mixin: authenticated access only, querysets filtered to the
+    requesting tutor (OWNER_PATHS, or `owner_path` on the view), and writes
+    checked with check_owned().
+    """
+    permission_classes = [IsAuthenticated]
+    owner_path = None
+
+    def get_queryset(self):
+        return scope_queryset(super().get_queryset(), self.request.user, self.owner_path)
+
+    @property
+    def scope_tutor_id(self):
+        return scope_tutor_id(self.request.user)
+
+    def perform_create(self, serializer):
+        check_owned(self.request.user, serializer.validated_data)
+        super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        check_owned(self.request.user, serializer.validated_data)
+        super().perform_update(serializer)
@@ -2,7 +2,8 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import (
     Tutor, Student, Subject, Exam, Report,
-    PerformanceEntry, MessageLog, Feedback, ExamSession, StudentSession, 
+    PerformanceEntry, MessageLog, Feedback, ExamSession, StudentSession, RenderJob,
+    ReportSummary, ExamSummary, ExamSubjectStats,
 )
 
 class UserSerializer(serializers.ModelSerializer):
@@ -107,6 +108,7 @@ class StudentSessionSerializer(serializers.ModelSerializer):
 class PerformanceEntrySerializer(serializers.ModelSerializer):
     percentage = serializers.ReadOnlyField()
     subject_name = serializers.CharField(source='subject.name', read_only=True)
+    subject_name_urdu = serializers.CharField(source='subject.name_urdu', read_only=True)
 
     class Meta:
         model = PerformanceEntry
@@ -118,17 +120,27 @@ class ReportSerializer(serializers.ModelSerializer):
     Report:
     - Includes read-only 'entries'
     - Convenience read-only fields for student/exam/tutor names and exam_type
+    - Class position from the precomputed summary row
     """
     entries = PerformanceEntrySerializer(many=True, read_only=True)
     student_name = serializers.CharField(source='student.full_name', read_only=True)
+    student_name_urdu = serializers.CharField(source='student.full_name_urdu', read_only=True)
     tutor_name = serializers.CharField(source='tutor.full_name', read_only=True)
+    tutor_name_urdu = serializers.CharField(source='tutor.full_name_urdu', read_only=True)
     exam_name = serializers.CharField(source='exam.name', read_only=True)
     exam_type = serializers.CharField(source='exam.exam_type', read_only=True)
     exam_date = serializers.DateField(source='exam.date', read_only=True)
+    # Precomputed by reports.summaries / reports.ranking (select_related('summary'))
+    percentage = serializers.FloatField(source='summary.percentage', read_only=True)
+    class_rank = serializers.IntegerField(source='summary.class_rank', read_only=True)
+    class_percentile = serializers.FloatField(source='summary.class_percentile', read_only=True)
+    cohort_size = serializers.IntegerField(source='summary.cohort_size', read_only=True)
 
     class Meta:
         model = Report
         fields = '__all__'
+        # Changed only through the finalize action (reports.renditions)
+        read_only_fields = ('finalized_at', 'snapshot_version')
 
 
 class MessageLogSerializer(serializers.ModelSerializer):
@@ -141,3 +153,68 @@ class FeedbackSerializer(serializers.ModelSerializer):
     class Meta:
         model = Feedback
         fields = "__all__"
+
+
+class RenderJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RenderJob
+        fields = ["id", "report", "lang", "status", "error", "attempts", "created_at", "started_at", "finished_at"]
+        read_only_fields = fields
+
+
+class ReportSummarySerializer(serializers.ModelSerializer):
+    student = serializers.IntegerField(source='report.student_id', read_only=True)
+    student_name = serializers.CharField(source='report.student.full_name', read_only=True)
+    exam = serializers.IntegerField(source='report.exam_id', read_only=True)
+
+    class Meta:
+        model = ReportSummary
+        fields = ["report", "student", "student_name", "exam", "total_obtained", "total_marks",
+                  "percentage", "subject_count", "updated_at"]
+
+
+class ExamSummarySerializer(serializers.ModelSerializer):
+    exam_name = serializers.CharField(source='exam.name', read_only=True)
+
+    class Meta:
+        model = ExamSummary
+        fields = '__all__'
+
+
+class ExamSubjectStatsSerializer(serializers.ModelSerializer):
+    subject_name = serializers.CharField(source='subject.name', read_only=True)
+
+    class Meta:
+        model = ExamSubjectStats
+        fields = '__all__'
+
+
+class MarkSheetRowSerializer(serializers.Serializer):
+    """One row of a bulk mark sheet; `report` or `student` locates the report."""
+    report = serializers.IntegerField(required=False)
+    student = serializers.IntegerField(required=False)
+    subject = serializers.IntegerField()
+    marks_obtained = serializers.FloatField(min_value=0)
+    total_marks = serializers.FloatField(min_value=0)
+
+    def validate(self, attrs):
+        if attrs['total_marks'] and attrs['marks_obtained'] > attrs['total_marks']:
+            raise serializers.ValidationError({'marks_obtained': 'Cannot exceed total_marks.'})
+        return attrs
+
+
+class MarkSheetSerializer(serializers.Serializer):
+    """
+    Envelope of POST /api/entries/bulk_upsert/:
+      {"report": <id>, "entries": [{subject, marks_obtained, total_marks}, ...]}
+      {"exam": <id>,   "entries": [{report|student, subject, marks_obtained, total_marks}, ...]}
+    Rows are validated individually by the view (per-row errors).
+    """
+    report = serializers.IntegerField(required=False)
+    exam = serializers.IntegerField(required=False)
+    entries = serializers.ListField(child=serializers.DictField(), allow_empty=False, max_length=5000)
+
+    def validate(self, attrs):
+        if ('report' in attrs) == ('exam' in attrs):
+            raise serializers.ValidationError("Send exactly one of 'report' or 'exam'.")
+        return attrs
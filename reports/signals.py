@@ -0,0 +1,180 @@
+"""
+Model signal handlers. Connected in ReportsConfig.ready().
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import (
+    Tutor, Student, Subject, Exam, ExamSession, StudentSession, Report, PerformanceEntry, ReportRendition,
+)
+from .pdf_cache import invalidate_report_pdfs
+from .renditions import report_changed
+from .response_cache import bump_versions
+from .snapshots import EXAM_FIELDS, STUDENT_FIELDS, TUTOR_FIELDS, schedule_snapshots
+from .summaries import schedule_refresh
+from .urdu_names import NAME_FIELDS, fill_urdu_name
+
+
+# model -> (its fields copied into report snapshots, Report lookup of the reports that copy them)
+SNAPSHOT_SOURCES = {
+    Student: (STUDENT_FIELDS, "student"),
+    Tutor: (TUTOR_FIELDS, "tutor"),
+    Subject: (("name", "name_urdu"), "entries__subject"),
+    Exam: (EXAM_FIELDS + ("date",), "exam"),
+}
+
+
+def _entry_exam_id(entry):
+    report = entry._state.fields_cache.get("report")
+    if report is not None:
+        return report.exam_id
+    return Report.objects.filter(pk=entry.report_id).values_list("exam_id", flat=True).first()
+
+
+@receiver(pre_save, sender=Report)
+def remember_report_exam(sender, instance, **kwargs):
+    # Needed to refresh the old exam's stats when a report is moved to another exam
+    instance._previous_exam_id = (
+        Report.objects.filter(pk=instance.pk).values_list("exam_id", flat=True).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Report)
+def report_saved(sender, instance, **kwargs):
+    invalidate_report_pdfs(instance.pk)
+
+    exam_ids = {instance.exam_id}
+    previous = getattr(instance, "_previous_exam_id", None)
+    pairs = set()
+    if previous and previous != instance.exam_id:
+        exam_ids.add(previous)
+        subject_ids = instance.entries.values_list("subject_id", flat=True)
+        pairs = {(exam_id, subject_id) for exam_id in exam_ids for subject_id in subject_ids}
+    schedule_refresh([instance.pk], exam_ids, pairs)
+    if instance.finalized_at:
+        # After schedule_refresh: the re-render reads the snapshot it rebuilds
+        report_changed([instance.pk])
+
+
+@receiver(post_delete, sender=Report)
+def report_deleted(sender, instance, **kwargs):
+    invalidate_report_pdfs(instance.pk)
+
+
+@receiver(pre_save, sender=PerformanceEntry)
+def remember_entry_keys(sender, instance, **kwargs):
+    # An edit can move the entry to another report/subject; both sides need refreshing
+    instance._previous_keys = (
+        PerformanceEntry.objects.filter(pk=instance.pk)
+        .values_list("report_id", "report__exam_id", "subject_id").first()
+        if instance.pk else None
+    )
+
+
+@receiver([post_save, post_delete], sender=PerformanceEntry)
+def entry_changed(sender, instance, signal, **kwargs):
+    invalidate_report_pdfs(instance.report_id)
+
+    report_ids, exam_ids, pairs = set(), set(), set()
+    exam_id = _entry_exam_id(instance)
+    if exam_id is not None:
+        report_ids.add(instance.report_id)
+        exam_ids.add(exam_id)
+        pairs.add((exam_id, instance.subject_id))
+
+    previous = getattr(instance, "_previous_keys", None)
+    if previous and previous != (instance.report_id, exam_id, instance.subject_id):
+        old_report_id, old_exam_id, old_subject_id = previous
+        invalidate_report_pdfs(old_report_id)
+        report_ids.add(old_report_id)
+        exam_ids.add(old_exam_id)
+        pairs.add((old_exam_id, old_subject_id))
+
+    if report_ids:
+        schedule_refresh(report_ids, exam_ids, pairs)
+        if signal is post_delete:
+            # May be a cascade from deleting the report (or its student/exam/tutor):
+            # only reports that still exist at commit are re-rendered
+            transaction.on_commit(partial(report_changed, report_ids))
+        else:
+            report_changed(report_ids)
+
+
+@receiver(post_delete, sender=ReportRendition)
+def rendition_deleted(sender, instance, **kwargs):
+    if instance.file:
+        instance.file.delete(save=False)
+
+
+@receiver(post_save, sender=Student)
+def student_saved(sender, instance, created, **kwargs):
+    # Grade level defines the ranking cohort: re-rank the student's exams when it changes.
+    # The old value comes from remember_snapshot_fields (grade_level is printed too).
+    previous = getattr(instance, "_previous_snapshot_fields", None)
+    if created or previous is None:
+        return
+    if previous[STUDENT_FIELDS.index("grade_level")] != instance.grade_level:
+        exam_ids = instance.reports.values_list("exam_id", flat=True).distinct()
+        schedule_refresh(exam_ids=list(exam_ids))
+
+
+@receiver(pre_save, sender=Student)
+@receiver(pre_save, sender=Tutor)
+@receiver(pre_save, sender=Subject)
+@receiver(pre_save, sender=Exam)
+def remember_snapshot_fields(sender, instance, **kwargs):
+    # Only edits to what the snapshots copy need them rebuilt (and finalized PDFs re-rendered)
+    fields, _ = SNAPSHOT_SOURCES[sender]
+    instance._previous_snapshot_fields = (
+        sender.objects.filter(pk=instance.pk).values_list(*fields).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Tutor)
+@receiver(post_save, sender=Subject)
+@receiver(post_save, sender=Exam)
+def snapshot_source_saved(sender, instance, created, **kwargs):
+    # Names and exam details are copied into the report snapshots (reports.snapshots)
+    if created:
+        return
+    fields, lookup = SNAPSHOT_SOURCES[sender]
+    previous = getattr(instance, "_previous_snapshot_fields", None)
+    # Compared as text: assigned values may not be parsed yet (e.g. a date string)
+    if previous is not None and [str(v) for v in previous] == [str(getattr(instance, f)) for f in fields]:
+        return
+    schedule_snapshots(**{lookup: instance.pk})
+    # After schedule_snapshots: the re-render reads the snapshot it rebuilds
+    report_changed(Report.objects.filter(**{lookup: instance.pk}).values_list("pk", flat=True).distinct())
+
+
+@receiver(pre_save, sender=Subject)
+def fill_urdu_names(sender, instance, update_fields=None, **kwargs):
+    name_field, urdu_field = NAME_FIELDS[sender]
+    if update_fields is not None and name_field not in update_fields:
+        return
+    previous = None
+    if instance.pk and getattr(instance, urdu_field):
+        # Only needed to tell an automatic value (follows renames) from a hand-corrected one
+        previous = sender.objects.filter(pk=instance.pk).values_list(name_field, flat=True).first()
+    fill_urdu_name(instance, previous)
+
+
+@receiver([post_save, post_delete], sender=Subject)
+@receiver([post_save, post_delete], sender=Exam)
+@receiver([post_save, post_delete], sender=ExamSession)
+@receiver([post_save, post_delete], sender=StudentSession)
+@receiver([post_save, post_delete], sender=Tutor)
+def cached_model_changed(sender, **kwargs):
+    # New version keys for the cached API responses (reports.response_cache)
+    bump_versions(sender)
+
+
+@receiver(m2m_changed, sender=Student.subjects.through)
+def student_subjects_changed(sender, action, **kwargs):
+    if action.startswith("post_"):
+        bump_versions(sender)
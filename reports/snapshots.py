@@ -0,0 +1,196 @@
+"""
+Render-ready snapshots of reports (ReportSnapshot).
+
+What a report prints or lists comes from seven tables (Report, Student, Tutor,
+Exam, ReportSummary, PerformanceEntry, Subject). refresh_snapshots()
+denormalizes it into one JSON row per report, and renders (load_report), the
+report list/detail endpoints, bulk PDFs and session exports read that row
+instead of joining and recomputing.
+
+The live tables stay the source of truth; snapshots are rebuilt on commit
+whenever their content changes:
+  entries, the report row, totals   reports.summaries, after each refresh
+  ranks                             reports.ranking, for reports whose rank moved
+  student/tutor/subject/exam names  reports.signals (and backfill_urdu_names)
+Bulk writes go through entries_changed() like the other derived tables, and
+`manage.py rebuild_summaries` rebuilds every snapshot. A report without a
+current snapshot is read from the live tables instead.
+
+Layout (SNAPSHOT_SCHEMA 1):
+  {"student": {...}, "tutor": {...}, "exam": {...}, "summary": {...} or null,
+   "entries": {column: [one value per entry, in id order]}}
+
+Objects rebuilt from a snapshot (apply_snapshot) are unsaved stand-ins for
+reading and rendering only; never save them.
+"""
+
+from functools import partial
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils.dateparse import parse_date
+
+from .models import Exam, PerformanceEntry, Report, ReportSnapshot, ReportSummary, Student, Subject, Tutor
+
+# Bump when the layout changes: older rows are then ignored until rebuilt
+SNAPSHOT_SCHEMA = 1
+BATCH_SIZE = 500
+
+STUDENT_FIELDS = ("id", "full_name", "full_name_urdu", "grade_level")
+TUTOR_FIELDS = ("id", "full_name", "full_name_urdu")
+EXAM_FIELDS = ("id", "name", "exam_type", "session_id")
+SUMMARY_FIELDS = (
+    "total_obtained", "total_marks", "percentage", "subject_count", "class_rank", "class_percentile", "cohort_size",
+)
+ENTRY_FIELDS = (
+    "id", "subject_id", "marks_obtained", "total_marks", "subject_rank", "subject_percentile", "subject_cohort_size",
+)
+
+LIVE_RELATED = ("student", "tutor", "exam", "summary")
+
+
+def live_entries():
+    return PerformanceEntry.objects.select_related("subject").order_by("id")
+
+
+def live_reports(report_ids):
+    """Reports with everything a snapshot copies, read from the live tables."""
+    return (
+        Report.objects.filter(pk__in=report_ids)
+        .select_related(*LIVE_RELATED)
+        .prefetch_related(Prefetch("entries", queryset=live_entries()))
+    )
+
+
+def _pick(obj, fields):
+    return {name: getattr(obj, name) for name in fields}
+
+
+def _summary(report):
+    try:
+        return report.summary
+    except ObjectDoesNotExist:
+        return None
+
+
+def _percentage(obtained, total):
+    # Same arithmetic as analytics.percentage_expression(), so exports match the SQL they replace
+    return obtained * 100.0 / total if total else 0.0
+
+
+def snapshot_data(report, entries):
+    """Snapshot of `report` (student/tutor/exam/summary loaded) and its `entries` (subject loaded)."""
+    summary = _summary(report)
+    exam = _pick(report.exam, EXAM_FIELDS)
+    exam["date"] = report.exam.date.isoformat() if report.exam.date else None
+    columns = {name: [getattr(entry, name) for entry in entries] for name in ENTRY_FIELDS}
+    columns["subject"] = [entry.subject.name for entry in entries]
+    columns["subject_urdu"] = [entry.subject.name_urdu for entry in entries]
+    columns["percentage"] = [_percentage(entry.marks_obtained, entry.total_marks) for entry in entries]
+    return {
+        "student": _pick(report.student, STUDENT_FIELDS),
+        "tutor": _pick(report.tutor, TUTOR_FIELDS),
+        "exam": exam,
+        "summary": _pick(summary, SUMMARY_FIELDS) if summary is not None else None,
+        "entries": columns,
+    }
+
+
+def entry_rows(data):
+    """The snapshot's entries as dicts (column name -> value)."""
+    columns = data["entries"]
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+def refresh_snapshots(report_ids):
+    """Rebuild the snapshots of `report_ids` (ids of deleted reports are skipped). Returns rows written."""
+    report_ids = sorted(set(report_ids))
+    written = 0
+    for start in range(0, len(report_ids), BATCH_SIZE):
+        snapshots = [
+            ReportSnapshot(report_id=r.pk, schema=SNAPSHOT_SCHEMA, data=snapshot_data(r, list(r.entries.all())))
+            for r in live_reports(report_ids[start:start + BATCH_SIZE])
+        ]
+        ReportSnapshot.objects.bulk_create(
+            snapshots, update_conflicts=True, unique_fields=["report"], update_fields=["schema", "data", "built_at"],
+        )
+        written += len(snapshots)
+    return written
+
+
+def refresh_snapshots_where(**report_filter):
+    """Rebuild the snapshots of Report.objects.filter(**report_filter) (all reports without a filter)."""
+    return refresh_snapshots(Report.objects.filter(**report_filter).values_list("pk", flat=True).distinct())
+
+
+def schedule_snapshots(**report_filter):
+    """refresh_snapshots_where() once the current transaction commits (immediately in autocommit)."""
+    transaction.on_commit(partial(refresh_snapshots_where, **report_filter))
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+def current_snapshot(report):
+    """The report's snapshot if it was selected along with it and has the current layout, else None."""
+    try:
+        snapshot = report.snapshot
+    except ObjectDoesNotExist:
+        return None
+    return snapshot if snapshot.schema == SNAPSHOT_SCHEMA else None
+
+
+def _cache(instance, field_name, value):
+    instance._meta.get_field(field_name).set_cached_value(instance, value)
+
+
+def apply_snapshot(report, data):
+    """
+    Attach the student, tutor, exam, summary and entries stored in `data` to
+    `report`, as if they had been select_related/prefetched. Returns the entries.
+    """
+    _cache(report, "student", Student(**data["student"]))
+    _cache(report, "tutor", Tutor(**data["tutor"]))
+    exam = data["exam"]
+    _cache(report, "exam", Exam(**{**exam, "date": parse_date(exam["date"]) if exam["date"] else None}))
+    summary = data["summary"]
+    _cache(report, "summary", ReportSummary(report_id=report.pk, **summary) if summary is not None else None)
+
+    entries = []
+    for row in entry_rows(data):
+        entry = PerformanceEntry(report_id=report.pk, **{name: row[name] for name in ENTRY_FIELDS})
+        _cache(entry, "subject", Subject(id=row["subject_id"], name=row["subject"], name_urdu=row["subject_urdu"]))
+        _cache(entry, "report", report)
+        entries.append(entry)
+    # What prefetch_related("entries") leaves behind, so report.entries.all() runs no query
+    prefetched = report.entries.all()
+    prefetched._result_cache = entries
+    prefetched._prefetch_done = True
+    report._prefetched_objects_cache = {**getattr(report, "_prefetched_objects_cache", {}), "entries": prefetched}
+    return entries
+
+
+def attach_snapshots(reports):
+    """
+    Load the related objects and entries of `reports` (fetched with
+    select_related("snapshot")) from their snapshots. Reports without a
+    current snapshot are read from the live tables, two queries for all of them.
+    """
+    missing = []
+    for report in reports:
+        snapshot = current_snapshot(report)
+        if snapshot is None:
+            missing.append(report)
+        else:
+            apply_snapshot(report, snapshot.data)
+    if missing:
+        live = {r.pk: snapshot_data(r, list(r.entries.all())) for r in live_reports([r.pk for r in missing])}
+        for report in missing:
+            apply_snapshot(report, live[report.pk])
+    return reports
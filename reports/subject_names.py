@@ -0,0 +1,453 @@
+"""
+English -> Urdu subject names.
+
+PARENT_MAP / SUB_MAP / ALIASES are compiled once at import into flat lookup
+dicts plus a prefix trie per parent (for loose "modern ..." -> "modern physics"
+matches), and results are memoized in a bounded LRU. subject_to_urdu() returns
+exactly what the original regex/scan implementation returned; that
+implementation is kept below as legacy_subject_to_urdu() for parity checks
+(tests, `manage.py bench_urdu`).
+"""
+
+import re
+from functools import lru_cache
+
+# 1) Base subjects (parent level)
+PARENT_MAP = {
+    "mathematics": "ریاضی",
+    "math": "ریاضی",
+    "general mathematics": "جنرل ریاضی",
+    "further mathematics": "اعلیٰ ریاضی",
+    "english": "انگریزی",
+    "science": "سائنس",
+    "general science": "جنرل سائنس",
+    "physics": "طبیعیات",
+    "chemistry": "کیمسٹری",
+    "biology": "حیاتیات",
+    "botany": "علم نباتات",
+    "zoology": "علم حیوانات",
+    "computer science": "کمپیوٹر سائنس",
+    "information technology": "انفارمیشن ٹیکنالوجی",
+    "islamic studies": "اسلامیات",
+    "pakistan studies": "مطالعہ پاکستان",
+    "history": "تاریخ",
+    "geography": "جغرافیہ",
+    "civics": "شہریت",
+    "economics": "معاشیات",
+    "business studies": "کاروباری مطالعہ",
+    "commerce": "کامرس",
+    "accounting": "محاسبہ",
+    "statistics": "شماریات",
+    "environmental science": "ماحولیاتی سائنس",
+    "social studies": "معاشرتی علوم",
+    "education": "تعلیم",
+    "philosophy": "فلسفہ",
+    "psychology": "نفسیات",
+    "sociology": "معاشرتیات",
+    "law": "قانون",
+    "library science": "لائبریری سائنس",
+    "food and nutrition": "خوراک و غذائیت",
+    "engineering drawing": "انجینئرنگ ڈرائنگ",
+    "electronics": "الیکٹرانکس",
+    "art": "فن",
+    "drawing": "ڈرائنگ",
+    "physical education": "جسمانی تعلیم",
+    "health education": "صحت کی تعلیم",
+    "moral education": "اخلاقی تعلیم",
+    "music": "موسیقی",
+    "arabic": "عربی",
+    "persian": "فارسی",
+    "punjabi": "پنجابی",
+    "sindhi": "سندھی",
+    "pashto": "پشتو",
+    "balochi": "بلوچی",
+    "french": "فرانسیسی",
+    "german": "جرمن",
+    "chinese": "چینی",
+    "urdu": "اردو",
+    "islamic history": "اسلامی تاریخ",
+}
+
+# 2) Sub-branches per parent (common school/board syllabi)
+SUB_MAP = {
+    # English
+    "english": {
+        "language": "انگریزی زبان",
+        "literature": "انگریزی ادب",
+        "grammar": "گرامر",
+        "composition": "انشاء",
+        "comprehension": "تفہیمِ مطلب",
+        "reading": "مطالعہ",
+        "writing": "تحریر",
+        "speaking": "گفتگو",
+        "listening": "سماعت",
+        "phonics": "صوتیات",
+        "spelling": "املا",
+        "essay": "مضمون نویسی",
+        "precis": "خلاصہ نویسی",
+        "translation": "ترجمہ",
+    },
+    # Urdu
+    "urdu": {
+        "language": "اردو زبان",
+        "literature": "اردو ادب",
+        "grammar": "قواعد",
+        "essay": "مضمون نویسی",
+        "comprehension": "تفہیم",
+        "translation": "ترجمہ",
+    },
+    # Mathematics
+    "mathematics": {
+        "arithmetic": "حساب",
+        "algebra": "الجبرہ",
+        "geometry": "ہندسہ",
+        "trigonometry": "مثلثات",
+        "calculus": "حسابِ اوّل/کلکیولس",
+        "analytic geometry": "تجزیاتی ہندسہ",
+        "number theory": "نظریہ اعداد",
+        "set theory": "نظریہ مجموعہ",
+        "probability": "امکان",
+        "statistics": "شماریات",
+        "vectors": "سمتیات",
+        "matrices": "میٹرکس",
+    },
+    # Physics
+    "physics": {
+        "mechanics": "میکانیکیات",
+        "electricity": "برقیات",
+        "magnetism": "مقناطیسیت",
+        "electromagnetism": "برقی مقناطیسیت",
+        "optics": "نوریات",
+        "waves": "امواج",
+        "thermodynamics": "حرکیاتِ حرارت",
+        "modern physics": "جدید طبیعیات",
+        "atomic physics": "جوہری طبیعیات",
+        "nuclear physics": "ایٹمی طبیعیات",
+    },
+    # Chemistry
+    "chemistry": {
+        "organic": "نامیاتی کیمسٹری",
+        "inorganic": "غیر نامیاتی کیمسٹری",
+        "physical": "طبعی کیمسٹری",
+        "analytical": "تجزیاتی کیمسٹری",
+        "biochemistry": "حیات کیمسٹری",
+    },
+    # Biology
+    "biology": {
+        "cell biology": "علم خلویات",
+        "genetics": "وراثیات",
+        "microbiology": "خرد حیاتیات",
+        "human biology": "انسانی حیاتیات",
+        "ecology": "ماحولیات",
+        "botany": "علم نباتات",
+        "zoology": "علم حیوانات",
+    },
+    # Computer Science / IT
+    "computer science": {
+        "programming": "برنامہ نویسی",
+        "data structures": "ڈھانچےِ معلومات",
+        "algorithms": "الگورتھمز",
+        "databases": "ڈیٹابیس",
+        "operating systems": "عملیاتی نظام",
+        "networking": "نیٹ ورکنگ",
+        "web development": "ویب ڈویلپمنٹ",
+        "artificial intelligence": "مصنوعی ذہانت",
+        "machine learning": "مشین لرننگ",
+        "cyber security": "سائبر سکیورٹی",
+    },
+    # Islamic / Pakistan Studies
+    "islamic studies": {
+        "quran": "قرآن",
+        "hadith": "حدیث",
+        "fiqh": "فقہ",
+        "seerah": "سیرت",
+        "islamic history": "اسلامی تاریخ",
+        "ethics": "اخلاقیات",
+    },
+    "pakistan studies": {
+        "history": "پاکستان کی تاریخ",
+        "geography": "پاکستان کا جغرافیہ",
+        "civics": "شہریتِ پاکستان",
+        "economy": "معیشتِ پاکستان",
+    },
+}
+
+# Extra common aliases that appear in school data
+ALIASES = {
+    "english language": "انگریزی زبان",
+    "english literature": "انگریزی ادب",
+    "urdu language": "اردو زبان",
+    "urdu literature": "اردو ادب",
+    "islamiat": "اسلامیات",
+    "islamiyat": "اسلامیات",
+    "pak studies": "مطالعہ پاکستان",
+    "pakistan affairs": "مطالعہ پاکستان",
+    "computer": "کمپیوٹر سائنس",
+    "i.t.": "انفارمیشن ٹیکنالوجی",
+    "it": "انفارمیشن ٹیکنالوجی",
+}
+
+# Sub-branch names understood under any parent
+GENERIC_CHILDREN = {
+    "language": "زبان",
+    "literature": "ادب",
+    "grammar": "گرامر",
+    "composition": "انشاء",
+    "comprehension": "تفہیم",
+    "theory": "نظریہ",
+    "practical": "عملی",
+}
+
+STUDIES_SUFFIX = " (" + "مطالعہ" + ")"
+
+DELIMS = r"\s*[:/\-\u2013\u2014()]\s*"  # :, /, -, en/em dash, ( )
+DELIMS_RE = re.compile(DELIMS)
+
+# Bound on memoized titles; a school has a few hundred distinct subject names at most
+CACHE_SIZE = 2048
+
+
+# ---------------------------------------------------------------------------
+# Compiled index (built once at import)
+# ---------------------------------------------------------------------------
+
+def _build_trie(keys):
+    """Character trie; a node's "" entry holds the insertion index of the key ending there."""
+    root = {}
+    for order, key in enumerate(keys):
+        node = root
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node.setdefault("", order)
+    return root
+
+
+def _compile():
+    # Whole titles: aliases win over parents, as in the original lookup order
+    exact = {**PARENT_MAP, **ALIASES}
+    # Parent part of "Parent - Child": the map itself, then the "<parent> studies" heuristic
+    parents = {f"{key} studies": urdu + STUDIES_SUFFIX for key, urdu in PARENT_MAP.items()}
+    parents.update(PARENT_MAP)
+    children = {
+        parent: (subs, list(subs.values()), _build_trie(subs))
+        for parent, subs in SUB_MAP.items()
+    }
+    return exact, parents, children
+
+
+_EXACT, _PARENTS, _CHILDREN = _compile()
+
+
+def _first_prefix(trie, values, text):
+    """Value of the earliest-declared key that `text` starts with (None if none)."""
+    best = None
+    node = trie
+    for ch in text:
+        node = node.get(ch)
+        if node is None:
+            break
+        order = node.get("")
+        if order is not None and (best is None or order < best):
+            best = order
+    return None if best is None else values[best]
+
+
+def _child(parent_key, child):
+    c = " ".join(child.split())
+    if c in ALIASES:
+        return ALIASES[c]
+    compiled = _CHILDREN.get(parent_key)
+    if compiled:
+        subs, values, trie = compiled
+        if c in subs:
+            return subs[c]
+        found = _first_prefix(trie, values, c)
+        if found:
+            return found
+    return GENERIC_CHILDREN.get(c)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _translate(title):
+    s = " ".join(title.split()).lower()
+    found = _EXACT.get(s)
+    if found:
+        return found
+
+    parts = DELIMS_RE.split(s)
+    if len(parts) < 2:
+        return title  # single unknown name
+    parent_key = parts[0]
+    child_raw = " ".join(parts[1:]).strip()
+
+    ur_parent = _PARENTS.get(parent_key) if parent_key else None
+    ur_child = _child(parent_key, child_raw) if child_raw else None
+    if ur_parent and ur_child:
+        return f"{ur_parent} ({ur_child})"
+    if ur_child:
+        return ur_child
+    if ur_parent and child_raw:
+        return f"{ur_parent} ({child_raw})"
+    return title
+
+
+def subject_to_urdu(title):
+    """
+    Translate English subject names to Urdu, with sub-branch support.
+    Examples:
+      - "English Language" -> "انگریزی زبان"
+      - "Mathematics - Algebra" -> "ریاضی (الجبرہ)"
+      - "Physics: Optics" -> "طبیعیات (نوریات)"
+      - "Computer Science (Programming)" -> "کمپیوٹر سائنس (برنامہ نویسی)"
+      - "Pakistan Studies: History" -> "مطالعہ پاکستان (پاکستان کی تاریخ)"
+    """
+    if not title:
+        return title
+    if not isinstance(title, str):
+        return legacy_subject_to_urdu(title)
+    return _translate(title)
+
+
+def translate_many(titles):
+    """subject_to_urdu() over an iterable; repeated titles are translated once."""
+    seen = {}
+    result = []
+    for title in titles:
+        if title not in seen:
+            seen[title] = subject_to_urdu(title)
+        result.append(seen[title])
+    return result
+
+
+def translation_cache_info():
+    return _translate.cache_info()
+
+
+def clear_translation_cache():
+    _translate.cache_clear()
+
+
+# ---------------------------------------------------------------------------
+# Parity corpus
+# ---------------------------------------------------------------------------
+
+def dictionary_corpus():
+    """
+    Every title the dictionaries can produce (and near misses): aliases,
+    parents, "<parent> studies", every parent/sub pair in each delimiter style,
+    loose prefixes, generic children and casing/spacing variants.
+    """
+    titles = list(ALIASES) + list(PARENT_MAP)
+    titles += [f"{parent} studies" for parent in PARENT_MAP]
+    children = set(GENERIC_CHILDREN) | set(ALIASES) | {"advanced", "paper 2", ""}
+    for subs in SUB_MAP.values():
+        children.update(subs)
+        children.update(f"{sub} ii" for sub in subs)
+    parents = list(PARENT_MAP) + list(ALIASES) + ["unknown", "english studies", ""]
+    for parent in parents:
+        for child in sorted(children):
+            titles += [f"{parent} - {child}", f"{parent}: {child}", f"{parent} ({child})", f"{parent}/{child}"]
+    titles += [t.title() for t in list(titles[:500])]
+    titles += ["  Physics   :  Modern   Physics ", "Mathematics – Algebra", "Biology — Genetics",
+               "English - - Grammar", "(Optics)", "Chemistry ( Organic ) Lab", "Ürdu", "Unknown Subject"]
+    return titles
+
+
+# ---------------------------------------------------------------------------
+# Reference implementation (pre-index), kept for parity checks
+# ---------------------------------------------------------------------------
+
+def _norm(s: str) -> str:
+    return re.sub(r"\s+", " ", (s or "").strip().lower())
+
+def _split_parent_child(title: str):
+    """
+    Split subject into parent and (optional) sub-branch.
+    Supports: 'Parent - Child', 'Parent: Child', 'Parent (Child)'
+    """
+    s = _norm(title)
+    # Try direct alias first
+    if s in ALIASES:
+        return None, ALIASES[s]  # already fully translated
+
+    parts = re.split(DELIMS, s)
+    if len(parts) >= 2:
+        parent = parts[0]
+        child = " ".join(parts[1:]).strip()
+        return parent, child
+    return s, None
+
+def _translate_parent(p: str) -> str:
+    if not p:
+        return None
+    # try direct parent map
+    if p in PARENT_MAP:
+        return PARENT_MAP[p]
+    # small heuristics
+    if p.endswith(" studies") and p[:-8] in PARENT_MAP:
+        return PARENT_MAP[p[:-8]] + " (" + "مطالعہ" + ")"
+    return None
+
+def _translate_child(parent_key: str, child: str) -> str:
+    if not child:
+        return None
+    c = _norm(child)
+    # direct alias like "english language"
+    if c in ALIASES:
+        return ALIASES[c]
+    # per-parent sub-map
+    pk = parent_key or ""
+    if pk in SUB_MAP:
+        # exact sub match
+        if c in SUB_MAP[pk]:
+            return SUB_MAP[pk][c]
+        # loose matches: e.g., "modern" -> "modern physics"
+        for key, ur in SUB_MAP[pk].items():
+            if c.startswith(key):
+                return ur
+    # generic fallbacks
+    generic = {
+        "language": "زبان",
+        "literature": "ادب",
+        "grammar": "گرامر",
+        "composition": "انشاء",
+        "comprehension": "تفہیم",
+        "theory": "نظریہ",
+        "practical": "عملی",
+    }
+    if c in generic:
+        return generic[c]
+    return None
+
+def legacy_subject_to_urdu(title):
+    """Original implementation (regex split + linear scans on every call)."""
+    if not title:
+        return title
+
+    # First try full-alias & simple exact map
+    s = _norm(title)
+    if s in ALIASES:
+        return ALIASES[s]
+    if s in PARENT_MAP:
+        return PARENT_MAP[s]
+
+    parent_key, child_raw = _split_parent_child(title)
+
+    # If alias returned a direct Urdu phrase (parent_key None), just use that
+    if parent_key is None and child_raw:
+        return child_raw
+
+    ur_parent = _translate_parent(parent_key) if parent_key else None
+    ur_child = _translate_child(parent_key, child_raw) if child_raw else None
+
+    # Compose results smartly
+    if ur_parent and ur_child:
+        return f"{ur_parent} ({ur_child})"
+    if ur_child and not ur_parent:
+        # we know child but not parent -> just child
+        return ur_child
+    if ur_parent and not ur_child and child_raw:
+        # have parent translation, show raw child in Urdu digits if numeric
+        return f"{ur_parent} ({child_raw})"
+    # nothing matched -> return original
+    return title
@@ -0,0 +1,223 @@
+"""
+Maintenance of the precomputed summary tables (ReportSummary, ExamSummary,
+ExamSubjectStats) and of the report snapshots built from them.
+
+Signals schedule targeted refreshes when entries/reports change; the work runs
+on transaction commit, so cascades have settled and each refresh can simply
+check whether its rows still exist. `rebuild_summaries()` recomputes everything
+in bulk (used by the rebuild_summaries command and after bulk writes).
+Class ranks (reports.ranking) are recomputed alongside the exam rows, and the
+snapshots (reports.snapshots) of every refreshed or re-ranked report rebuilt.
+"""
+
+import statistics
+from collections import defaultdict
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .analytics import percentage_expression
+from .models import Exam, Subject, Report, PerformanceEntry, ReportSummary, ExamSummary, ExamSubjectStats
+from .ranking import recompute_exam_ranks
+from .snapshots import refresh_snapshots
+
+RANK_FIELDS = ("class_rank", "class_percentile", "cohort_size")
+STAT_FIELDS = ("count", "mean", "stddev", "minimum", "p25", "median", "p75", "p90", "maximum")
+
+
+def distribution(values):
+    """count/mean/stddev/min/percentiles/max of a list of numbers (population stddev)."""
+    values = sorted(values)
+    n = len(values)
+    if not n:
+        return dict.fromkeys(STAT_FIELDS, 0)
+    if n == 1:
+        deciles = [values[0]] * 9
+        quartiles = [values[0]] * 3
+    else:
+        deciles = statistics.quantiles(values, n=10, method="inclusive")
+        quartiles = statistics.quantiles(values, n=4, method="inclusive")
+    return {
+        "count": n,
+        "mean": statistics.fmean(values),
+        "stddev": statistics.pstdev(values),
+        "minimum": values[0],
+        "p25": quartiles[0],
+        "median": quartiles[1],
+        "p75": quartiles[2],
+        "p90": deciles[8],
+        "maximum": values[-1],
+    }
+
+
+def _report_percentage(obtained, total):
+    return (obtained / total) * 100 if total else 0
+
+
+# ---------------------------------------------------------------------------
+# Targeted refreshes
+# ---------------------------------------------------------------------------
+
+def refresh_report_summary(report_id):
+    if not Report.objects.filter(pk=report_id).exists():
+        return None
+    agg = PerformanceEntry.objects.filter(report_id=report_id).aggregate(
+        obtained=Sum("marks_obtained"), total=Sum("total_marks"), n=Count("id"),
+    )
+    obtained, total = agg["obtained"] or 0, agg["total"] or 0
+    summary, _ = ReportSummary.objects.update_or_create(
+        report_id=report_id,
+        defaults={
+            "total_obtained": obtained,
+            "total_marks": total,
+            "percentage": _report_percentage(obtained, total),
+            "subject_count": agg["n"],
+        },
+    )
+    return summary
+
+
+def refresh_exam_summary(exam_id):
+    if not Exam.objects.filter(pk=exam_id).exists():
+        return None
+    per_report = (
+        PerformanceEntry.objects.filter(report__exam_id=exam_id)
+        .values("report_id")
+        .annotate(obtained=Sum("marks_obtained"), total=Sum("total_marks"))
+        .values_list("obtained", "total")
+    )
+    values = [_report_percentage(o, t) for o, t in per_report]
+    if not values:
+        ExamSummary.objects.filter(exam_id=exam_id).delete()
+        return None
+    summary, _ = ExamSummary.objects.update_or_create(exam_id=exam_id, defaults=distribution(values))
+    return summary
+
+
+def refresh_exam_subject_stats(exam_id, subject_id):
+    if not (Exam.objects.filter(pk=exam_id).exists() and Subject.objects.filter(pk=subject_id).exists()):
+        return None
+    values = list(
+        PerformanceEntry.objects.filter(report__exam_id=exam_id, subject_id=subject_id)
+        .annotate(pct=percentage_expression())
+        .values_list("pct", flat=True)
+    )
+    if not values:
+        ExamSubjectStats.objects.filter(exam_id=exam_id, subject_id=subject_id).delete()
+        return None
+    stats, _ = ExamSubjectStats.objects.update_or_create(
+        exam_id=exam_id, subject_id=subject_id, defaults=distribution(values),
+    )
+    return stats
+
+
+def refresh_summaries(report_ids=(), exam_ids=(), exam_subject_pairs=()):
+    """Refresh the given summary rows and the affected snapshots (duplicates are collapsed)."""
+    report_ids = set(report_ids)
+    for report_id in report_ids:
+        refresh_report_summary(report_id)
+    for exam_id, subject_id in set(exam_subject_pairs):
+        refresh_exam_subject_stats(exam_id, subject_id)
+    for exam_id in set(exam_ids):
+        refresh_exam_summary(exam_id)
+        if Exam.objects.filter(pk=exam_id).exists():
+            report_ids -= recompute_exam_ranks(exam_id)  # re-ranked reports have fresh snapshots
+    refresh_snapshots(report_ids)
+
+
+def schedule_refresh(report_ids=(), exam_ids=(), exam_subject_pairs=()):
+    """Run refresh_summaries() once the current transaction commits (immediately in autocommit)."""
+    transaction.on_commit(partial(
+        refresh_summaries, tuple(report_ids), tuple(exam_ids), tuple(exam_subject_pairs),
+    ))
+
+
+def entries_changed(report_ids):
+    """
+    Schedule refreshes for every summary touched by entries of these reports.
+    For bulk writes (bulk_create/update) that bypass model signals.
+    """
+    report_ids = set(report_ids)
+    pairs = set(
+        PerformanceEntry.objects.filter(report_id__in=report_ids)
+        .values_list("report__exam_id", "subject_id")
+        .distinct()
+    )
+    exam_ids = set(Report.objects.filter(pk__in=report_ids).values_list("exam_id", flat=True))
+    schedule_refresh(report_ids, exam_ids, pairs)
+
+
+# ---------------------------------------------------------------------------
+# Full rebuild
+# ---------------------------------------------------------------------------
+
+@transaction.atomic
+def rebuild_summaries(exam_id=None):
+    """
+    Recompute every summary row (or those of one exam) from PerformanceEntry.
+    Four aggregate/scan queries plus bulk writes, then one rank pass per exam
+    and the reports' snapshots in batches. Returns row counts.
+    """
+    entries = PerformanceEntry.objects.all()
+    reports = Report.objects.all()
+    if exam_id is not None:
+        entries = entries.filter(report__exam_id=exam_id)
+        reports = reports.filter(exam_id=exam_id)
+
+    # Per-report totals (reports without entries get a zero row)
+    totals = {
+        row["report_id"]: row
+        for row in entries.values("report_id").annotate(
+            obtained=Sum("marks_obtained"), total=Sum("total_marks"), n=Count("id"),
+        )
+    }
+    # Ranks carried over, so the rank pass only reports (and re-renders) real changes
+    previous_ranks = {
+        report_id: dict(zip(RANK_FIELDS, ranks))
+        for report_id, *ranks in ReportSummary.objects.filter(report__in=reports).values_list("report_id", *RANK_FIELDS)
+    }
+    report_rows = []
+    exam_values = defaultdict(list)
+    for report_id, report_exam_id in reports.values_list("id", "exam_id"):
+        row = totals.get(report_id)
+        obtained, total, n = (row["obtained"], row["total"], row["n"]) if row else (0, 0, 0)
+        pct = _report_percentage(obtained, total)
+        report_rows.append(ReportSummary(
+            report_id=report_id, total_obtained=obtained, total_marks=total, percentage=pct, subject_count=n,
+            **previous_ranks.get(report_id, {}),
+        ))
+        if n:
+            exam_values[report_exam_id].append(pct)
+
+    # Per-exam/subject distributions from one scan of the percentages
+    subject_values = defaultdict(list)
+    for key_exam, subject_id, pct in entries.annotate(pct=percentage_expression()).values_list(
+        "report__exam_id", "subject_id", "pct"
+    ):
+        subject_values[(key_exam, subject_id)].append(pct)
+
+    ReportSummary.objects.filter(report__in=reports).delete()
+    ReportSummary.objects.bulk_create(report_rows, batch_size=1000)
+
+    exam_filter = {"exam_id": exam_id} if exam_id is not None else {}
+    ExamSummary.objects.filter(**exam_filter).delete()
+    ExamSummary.objects.bulk_create(
+        [ExamSummary(exam_id=e, **distribution(v)) for e, v in exam_values.items()], batch_size=1000,
+    )
+    ExamSubjectStats.objects.filter(**exam_filter).delete()
+    ExamSubjectStats.objects.bulk_create(
+        [ExamSubjectStats(exam_id=e, subject_id=s, **distribution(v)) for (e, s), v in subject_values.items()],
+        batch_size=1000,
+    )
+    ranked_exams = reports.values_list("exam_id", flat=True).distinct()
+    for ranked_exam_id in ranked_exams:
+        recompute_exam_ranks(ranked_exam_id, update_snapshots=False)
+    snapshots = refresh_snapshots(reports.values_list("id", flat=True))
+
+    return {
+        "report_summaries": len(report_rows),
+        "exam_summaries": len(exam_values),
+        "exam_subject_stats": len(subject_values),
+        "report_snapshots": snapshots,
+    }
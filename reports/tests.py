@@ -1,6 +1,36 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+import threading
+import zipfile
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import LiveServerTestCase, TestCase, override_settings
+from django.urls import include, path
 from django.contrib.auth.models import User
-from .models import Tutor, Student, Exam, Subject, Report, PerformanceEntry
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from .models import (
+    Tutor, Student, Exam, Subject, Report, PerformanceEntry, RenderJob, ExamSession, StudentSession,
+    ReportSummary, ExamSummary, ExamSubjectStats, ReportSnapshot,
+)
+from .bulk import bulk_reports
+from .analytics import student_progress_rows
+from .ranking import competition_ranks
+from .utils import load_report, render_report_html
+from .pagination import KeysetPagination
+from .render_context import get_render_context, invalidate_render_context, render_context_stats
+from .render_queue import enqueue_render, claim_next_job, run_job
+from .scoping import cache_tutor_id
+from . import render_pool
+from .authentication import TutorTokenObtainPairSerializer
+from .renditions import finalize_report
+from .urls import async_download_urls
+from .export import session_results
+from .summaries import rebuild_summaries
 
 class ReportAPITestCase(TestCase):
     def setUp(self):
@@ -50,3 +80,1473 @@ class ReportAPITestCase(TestCase):
             self.assertIsNotNone(pdf)
         except ImportError:
             self.fail('PDF utility import failed.')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(prefix="pdfcache-tests-"), REPORT_FONT_SUBSETS=False)
+class ReportPDFCacheTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tutor2', password='testpass123')
+        self.tutor = Tutor.objects.create(user=self.user, full_name='Ms. Sara')
+        self.student = Student.objects.create(tutor=self.tutor, full_name='Bilal', gender='Male', grade_level='9')
+        self.subject = Subject.objects.create(name='Physics')
+        self.exam = Exam.objects.create(name='Final', exam_type='Final', date='2025-08-01')
+        self.report = Report.objects.create(student=self.student, tutor=self.tutor, exam=self.exam)
+        self.entry = PerformanceEntry.objects.create(
+            report=self.report, subject=self.subject, marks_obtained=40, total_marks=50
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/reports/{self.report.id}/generate_pdf/?lang=ur'
+
+    def test_second_download_is_served_from_cache(self):
+        with mock.patch('reports.pdf_cache.render_report_pdf', return_value=b'%PDF-fake') as render:
+            first = self.client.get(self.url)
+            second = self.client.get(self.url)
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first['X-PDF-Cache'], 'miss')
+        self.assertEqual(second['X-PDF-Cache'], 'hit')
+        self.assertEqual(second.content, b'%PDF-fake')
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_if_none_match_returns_304(self):
+        with mock.patch('reports.pdf_cache.render_report_pdf', return_value=b'%PDF-fake'):
+            etag = self.client.get(self.url)['ETag']
+            resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+    def test_entry_change_invalidates_cache(self):
+        with mock.patch('reports.pdf_cache.render_report_pdf', return_value=b'%PDF-fake') as render:
+            etag = self.client.get(self.url)['ETag']
+            self.entry.marks_obtained = 45
+            self.entry.save()
+            resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['X-PDF-Cache'], 'miss')
+        self.assertNotEqual(resp['ETag'], etag)
+        self.assertEqual(render.call_count, 2)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(prefix="renderqueue-tests-"), REPORT_FONT_SUBSETS=False)
+class RenderQueueTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tutor3', password='testpass123')
+        self.tutor = Tutor.objects.create(user=self.user, full_name='Mr. Kamal')
+        self.student = Student.objects.create(tutor=self.tutor, full_name='Hina', gender='Female', grade_level='8')
+        self.exam = Exam.objects.create(name='Mid', exam_type='Mid Term', date='2025-06-01')
+        self.report = Report.objects.create(student=self.student, tutor=self.tutor, exam=self.exam)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_enqueue_is_deduplicated_while_pending(self):
+        first = self.client.post(f'/api/reports/{self.report.id}/render/?lang=ur')
+        second = self.client.post(f'/api/reports/{self.report.id}/render/?lang=ur')
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.data['id'], second.data['id'])
+        self.assertEqual(RenderJob.objects.count(), 1)
+
+    def test_worker_renders_into_report_pdf_file(self):
+        job, _ = enqueue_render(self.report.id, 'ur')
+        self.assertEqual(claim_next_job(), job.id)
+        self.assertIsNone(claim_next_job())
+
+        with mock.patch('reports.pdf_cache.render_report_pdf', return_value=b'%PDF-job'):
+            self.assertEqual(run_job(job.id), RenderJob.DONE)
+
+        self.report.refresh_from_db()
+        self.assertTrue(self.report.pdf_file.name.endswith('.pdf'))
+        resp = self.client.get(f'/api/render-jobs/{job.id}/download/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(b''.join(resp.streaming_content), b'%PDF-job')
+
+    def test_download_before_done_is_conflict(self):
+        job, _ = enqueue_render(self.report.id, 'en')
+        resp = self.client.get(f'/api/render-jobs/{job.id}/download/')
+        self.assertEqual(resp.status_code, 409)
+        self.assertEqual(resp.data['status'], RenderJob.QUEUED)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(prefix="rendition-tests-"), REPORT_FONT_SUBSETS=False)
+class ReportFinalizeTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tutor20', password='testpass123')
+        tutor = Tutor.objects.create(user=self.user, full_name='Mr. Kamal')
+        student = Student.objects.create(tutor=tutor, full_name='Hina', gender='Female', grade_level='8')
+        exam = Exam.objects.create(name='Mid', exam_type='Mid Term', date='2025-06-01')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.report = Report.objects.create(student=student, tutor=tutor, exam=exam)
+            self.entry = PerformanceEntry.objects.create(
+                report=self.report, subject=Subject.objects.create(name='Math'), marks_obtained=40, total_marks=50,
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def drain_queue(self):
+        while (job_id := claim_next_job()) is not None:
+            self.assertEqual(run_job(job_id), RenderJob.DONE)
+
+    def test_finalize_prerenders_both_languages(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(f'/api/reports/{self.report.id}/finalize/')
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp.data['snapshot_version'], 1)
+        self.assertEqual(sorted(RenderJob.objects.values_list('lang', flat=True)), ['en', 'ur'])
+        with mock.patch('reports.pdf_cache.render_report_pdf', return_value=b'%PDF-final'):
+            self.drain_queue()
+        self.assertEqual(set(self.report.renditions.values_list('lang', 'version')), {('en', 1), ('ur', 1)})
+
+        with mock.patch('reports.pdf_cache.render_report_pdf') as render:
+            resp = self.client.get(f'/api/reports/{self.report.id}/pdf/?lang=ur')
+        render.assert_not_called()
+        self.assertEqual(resp['X-Rendition'], 'stored')
+        self.assertEqual(b''.join(resp.streaming_content), b'%PDF-final')
+
+    def test_entry_edit_bumps_version_and_requeues(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/reports/{self.report.id}/finalize/')
+        with mock.patch('reports.pdf_cache.render_report_pdf', return_value=b'%PDF-v1'):
+            self.drain_queue()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.entry.marks_obtained = 45
+            self.entry.save()
+        self.report.refresh_from_db()
+        self.assertEqual(self.report.snapshot_version, 2)
+        self.assertEqual(RenderJob.objects.filter(status=RenderJob.QUEUED).count(), 2)
+
+        # Downloaded before the worker caught up: rendered, stored and served once
+        with mock.patch('reports.pdf_cache.render_report_pdf', return_value=b'%PDF-v2') as render:
+            resp = self.client.get(f'/api/reports/{self.report.id}/pdf/?lang=en')
+            again = self.client.get(f'/api/reports/{self.report.id}/pdf/?lang=en')
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual((resp['X-Rendition'], resp['X-Snapshot-Version']), ('rendered', '2'))
+        self.assertEqual(b''.join(again.streaming_content), b'%PDF-v2')
+        self.assertEqual(again['X-Rendition'], 'stored')
+
+    def test_older_render_never_replaces_newer_rendition(self):
+        from .renditions import store_rendition
+
+        store_rendition(self.report.id, 'en', 3, b'%PDF-v3')
+        kept = store_rendition(self.report.id, 'en', 2, b'%PDF-v2')
+        self.assertEqual(kept.version, 3)
+        with kept.file.open('rb') as fh:
+            self.assertEqual(fh.read(), b'%PDF-v3')
+
+    def test_deleting_student_with_finalized_report(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/reports/{self.report.id}/finalize/')
+        RenderJob.objects.all().delete()
+        # Deleting one entry still changes what the PDF prints
+        with self.captureOnCommitCallbacks(execute=True):
+            PerformanceEntry.objects.create(
+                report=self.report, subject=Subject.objects.create(name='Urdu'), marks_obtained=30, total_marks=50,
+            ).delete()
+        self.report.refresh_from_db()
+        self.assertEqual(self.report.snapshot_version, 3)
+        RenderJob.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.delete(f'/api/students/{self.report.student_id}/')
+        self.assertEqual(resp.status_code, 204)
+        self.assertFalse(Report.objects.filter(pk=self.report.id).exists())
+        # Nothing queued for the cascaded report (its job insert would fail the commit)
+        self.assertFalse(RenderJob.objects.exists())
+
+    def test_noop_rebuild_does_not_rerender(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/reports/{self.report.id}/finalize/')
+        RenderJob.objects.all().delete()
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command('rebuild_summaries', stdout=io.StringIO())
+        self.report.refresh_from_db()
+        self.assertEqual(self.report.snapshot_version, 1)
+        self.assertFalse(RenderJob.objects.exists())
+        self.assertEqual(self.report.summary.class_rank, 1)
+
+    def test_renaming_subject_rerenders_finalized_report(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/reports/{self.report.id}/finalize/')
+        with mock.patch('reports.pdf_cache.render_report_pdf', return_value=b'%PDF-v1'):
+            self.drain_queue()
+
+        subject = self.entry.subject
+        # Edits the PDF doesn't print leave the rendition alone
+        with self.captureOnCommitCallbacks(execute=True):
+            subject.category = 'Science'
+            subject.save()
+        self.report.refresh_from_db()
+        self.assertEqual(self.report.snapshot_version, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            subject.name = 'Mathematics'
+            subject.save()
+        self.report.refresh_from_db()
+        self.assertEqual(self.report.snapshot_version, 2)
+        self.assertEqual(RenderJob.objects.filter(status=RenderJob.QUEUED).count(), 2)
+        _, entries = load_report(self.report.id)
+        self.assertEqual(entries[0].subject.name_urdu, 'ریاضی')
+        self.assertEqual(self.client.get(f'/api/reports/{self.report.id}/pdf/')['X-Snapshot-Version'], '2')
+
+    def test_unfinalized_report_is_untouched(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.entry.marks_obtained = 45
+            self.entry.save()
+        self.report.refresh_from_db()
+        self.assertEqual(self.report.snapshot_version, 0)
+        self.assertFalse(RenderJob.objects.exists())
+        self.assertEqual(self.client.get(f'/api/reports/{self.report.id}/pdf/').status_code, 404)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(prefix="bulk-tests-"), REPORT_BULK_WORKERS=1, REPORT_FONT_SUBSETS=False)
+class BulkExamPDFTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tutor4', password='testpass123')
+        self.tutor = Tutor.objects.create(user=self.user, full_name='Ms. Ayesha')
+        self.session = ExamSession.objects.create(name='2025 Term-1')
+        self.exam = Exam.objects.create(name='Final', exam_type='Final', date='2025-09-01', session=self.session)
+        subjects = [Subject.objects.create(name=n) for n in ('Math', 'English', 'Urdu')]
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(4):
+                student = Student.objects.create(tutor=self.tutor, full_name=f'Student {i}', gender='Male', grade_level='7')
+                report = Report.objects.create(student=student, tutor=self.tutor, exam=self.exam)
+                for subject in subjects:
+                    PerformanceEntry.objects.create(report=report, subject=subject, marks_obtained=50 + i, total_marks=100)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_fetch_uses_constant_queries(self):
+        with self.assertNumQueries(1):  # reports + snapshots
+            reports = bulk_reports(exam_id=self.exam.id)
+            self.assertEqual(sum(len(r.entries.all()) for r in reports), 12)
+
+    def test_zip_contains_one_pdf_per_report(self):
+        with mock.patch('reports.pdf_cache.render_report_pdf', return_value=b'%PDF-bulk'):
+            resp = self.client.get(f'/api/exams/{self.exam.id}/bulk_pdf/?lang=ur')
+            payload = b''.join(resp.streaming_content)
+        self.assertEqual(resp.status_code, 200)
+        with zipfile.ZipFile(io.BytesIO(payload)) as archive:
+            names = archive.namelist()
+        self.assertEqual(len(names), 4)
+        self.assertTrue(all(n.endswith('_ur.pdf') for n in names))
+
+    def test_session_merged_pdf(self):
+        resp = self.client.get(f'/api/exam-sessions/{self.session.id}/bulk_pdf/?output=pdf')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Type'], 'application/pdf')
+
+
+class RenderContextTestCase(TestCase):
+    def setUp(self):
+        invalidate_render_context()
+
+    def test_context_is_built_once_and_reused(self):
+        before = render_context_stats()
+        first = get_render_context()
+        second = get_render_context()
+        self.assertIs(first, second)
+        after = render_context_stats()
+        self.assertEqual(after['builds'] - before['builds'], 1)
+        self.assertEqual(after['reuses'] - before['reuses'], 1)
+
+    def test_context_rebuilds_when_template_changes(self):
+        ctx = get_render_context()
+        template_path = ctx.template.origin.name
+        stat = os.stat(template_path)
+        try:
+            os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            self.assertIsNot(get_render_context(), ctx)
+        finally:
+            os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+@override_settings(REPORT_FONT_SUBSETS=False)
+class BenchPDFCommandTestCase(TestCase):
+    def test_bench_writes_stage_percentiles(self):
+        out_path = os.path.join(tempfile.mkdtemp(prefix="bench-tests-"), "bench.json")
+        call_command('bench_pdf', reports=2, subjects=3, iterations=1, langs='en,ur', output=out_path, stdout=io.StringIO())
+        with open(out_path, encoding='utf-8') as fh:
+            results = json.load(fh)
+        self.assertEqual(set(results['stages']), {'en', 'ur'})
+        self.assertEqual(results['stages']['ur']['layout']['n'], 2)
+        self.assertIn('p95_ms', results['stages']['en']['total'])
+        self.assertEqual(set(results['pdf_kib']), {'en', 'ur'})
+        # seeded rows are rolled back
+        self.assertFalse(Report.objects.exists())
+
+    @override_settings(REPORTLAB_URDU_FONT=None)
+    def test_bench_compares_engines(self):
+        out_path = os.path.join(tempfile.mkdtemp(prefix="bench-tests-"), "bench.json")
+        err = io.StringIO()
+        call_command('bench_pdf', reports=2, subjects=3, iterations=1, langs='en,ur', engine='both',
+                     output=out_path, stdout=io.StringIO(), stderr=err)
+        with open(out_path, encoding='utf-8') as fh:
+            results = json.load(fh)
+        # Urdu needs REPORTLAB_URDU_FONT for the fast path, so only English is timed there
+        self.assertEqual(set(results['stages']), {'en', 'ur', 'en/reportlab'})
+        self.assertIn('Skipping ur/reportlab', err.getvalue())
+        self.assertEqual(results['stages']['en/reportlab']['write']['n'], 2)
+        self.assertEqual(results['stages']['en/reportlab']['layout']['n'], 0)
+        self.assertGreater(results['reports_per_second']['en/reportlab'], 0)
+
+
+class StudentProgressTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tutor5', password='testpass123')
+        self.tutor = Tutor.objects.create(user=self.user, full_name='Mr. Asif')
+        self.student = Student.objects.create(tutor=self.tutor, full_name='Zain', gender='Male', grade_level='10')
+        self.rival = Student.objects.create(tutor=self.tutor, full_name='Omar', gender='Male', grade_level='10')
+        self.math = Subject.objects.create(name='Math')
+        self.session = ExamSession.objects.create(name='2025')
+        # A grade 9 student outscores both in every exam but is ranked in their own cohort
+        self.junior = Student.objects.create(tutor=self.tutor, full_name='Ali', gender='Male', grade_level='9')
+        marks = [('2025-01-10', 'Monthly', 50, 90), ('2025-03-10', 'Mid Term', 70, 60), ('2025-06-10', 'Final', 80, 95)]
+        with self.captureOnCommitCallbacks(execute=True):
+            for day, exam_type, mine, theirs in marks:
+                exam = Exam.objects.create(name=exam_type, exam_type=exam_type, date=day, session=self.session)
+                for student, score in ((self.student, mine), (self.rival, theirs), (self.junior, 100)):
+                    report = Report.objects.create(student=student, tutor=self.tutor, exam=exam)
+                    PerformanceEntry.objects.create(
+                        report=report, subject=self.math, marks_obtained=score, total_marks=100,
+                    )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/reports/student_progress/{self.student.id}/'
+
+    def test_progress_is_one_query(self):
+        with self.assertNumQueries(1):
+            rows = student_progress_rows(self.student.id)
+        self.assertEqual([r['pct'] for r in rows], [50.0, 70.0, 80.0])
+        self.assertEqual([r['rank'] for r in rows], [2, 1, 2])
+        self.assertEqual(rows[-1]['ranked_of'], 2)
+
+    def test_summary_aggregates(self):
+        resp = self.client.get(self.url, {'summary': '1'})
+        summary = resp.data['summary']['Math']
+        self.assertEqual((summary['min'], summary['max'], summary['count']), (50.0, 80.0, 3))
+        self.assertAlmostEqual(summary['mean'], 200 / 3)
+        self.assertAlmostEqual(summary['trend_slope'], 15.0)
+        self.assertEqual(summary['delta'], 10.0)
+        self.assertEqual(len(resp.data['series']['Math']), 3)
+
+    def test_filters(self):
+        resp = self.client.get(self.url, {'date_from': '2025-02-01', 'exam_type': 'Final'})
+        self.assertEqual([p['exam_type'] for p in resp.data['Math']], ['Final'])
+        self.assertEqual(self.client.get(self.url, {'date_to': 'June'}).status_code, 400)
+
+
+class SummaryTablesTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tutor6', password='testpass123')
+        self.tutor = Tutor.objects.create(user=self.user, full_name='Ms. Noor')
+        self.exam = Exam.objects.create(name='Final', exam_type='Final', date='2025-09-01')
+        self.math = Subject.objects.create(name='Math')
+        self.english = Subject.objects.create(name='English')
+        self.reports = []
+        with self.captureOnCommitCallbacks(execute=True):
+            for i, (m, e) in enumerate([(80, 60), (40, 70), (60, 50)]):
+                student = Student.objects.create(tutor=self.tutor, full_name=f'S{i}', gender='Female', grade_level='6')
+                report = Report.objects.create(student=student, tutor=self.tutor, exam=self.exam)
+                PerformanceEntry.objects.create(report=report, subject=self.math, marks_obtained=m, total_marks=100)
+                PerformanceEntry.objects.create(report=report, subject=self.english, marks_obtained=e, total_marks=100)
+                self.reports.append(report)
+
+    def test_rows_maintained_on_save(self):
+        summary = ReportSummary.objects.get(report=self.reports[0])
+        self.assertEqual((summary.total_obtained, summary.subject_count), (140, 2))
+        self.assertAlmostEqual(summary.percentage, 70.0)
+        stats = ExamSubjectStats.objects.get(exam=self.exam, subject=self.math)
+        self.assertEqual((stats.count, stats.minimum, stats.median, stats.maximum), (3, 40, 60, 80))
+        self.assertAlmostEqual(ExamSummary.objects.get(exam=self.exam).mean, 60.0)
+
+    def test_rows_maintained_on_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            PerformanceEntry.objects.filter(report=self.reports[1], subject=self.math).delete()
+        self.assertEqual(ReportSummary.objects.get(report=self.reports[1]).subject_count, 1)
+        self.assertEqual(ExamSubjectStats.objects.get(exam=self.exam, subject=self.math).count, 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reports[0].delete()
+        self.assertEqual(ExamSummary.objects.get(exam=self.exam).count, 2)
+
+    def test_rebuild_matches_incremental(self):
+        before = list(ExamSubjectStats.objects.order_by('subject_id').values_list('count', 'mean', 'p75'))
+        ExamSubjectStats.objects.all().delete()
+        ReportSummary.objects.all().delete()
+        call_command('rebuild_summaries', stdout=io.StringIO())
+        after = list(ExamSubjectStats.objects.order_by('subject_id').values_list('count', 'mean', 'p75'))
+        self.assertEqual(before, after)
+        self.assertEqual(ReportSummary.objects.count(), 3)
+
+    def test_read_endpoints(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        resp = self.client.get('/api/exam-stats/', {'exam': self.exam.id})
+        self.assertEqual(resp.data['count'], 2)
+        resp = self.client.get('/api/report-summaries/', {'exam': self.exam.id})
+        self.assertEqual(sorted(round(r['percentage'], 2) for r in resp.data['results']), [55.0, 55.0, 70.0])
+
+
+class RankingTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tutor7', password='testpass123')
+        self.tutor = Tutor.objects.create(user=self.user, full_name='Mr. Raza')
+        self.exam = Exam.objects.create(name='Final', exam_type='Final', date='2025-09-01')
+        self.math = Subject.objects.create(name='Math')
+        self.reports = {}
+        with self.captureOnCommitCallbacks(execute=True):
+            for name, grade, score in [('A', '9', 90), ('B', '9', 75), ('C', '9', 75), ('D', '9', 40), ('E', '10', 10)]:
+                student = Student.objects.create(tutor=self.tutor, full_name=name, gender='Male', grade_level=grade)
+                report = Report.objects.create(student=student, tutor=self.tutor, exam=self.exam)
+                PerformanceEntry.objects.create(report=report, subject=self.math, marks_obtained=score, total_marks=100)
+                self.reports[name] = report
+
+    def ranks(self):
+        return {
+            name: (r.summary.class_rank, r.summary.cohort_size)
+            for name, r in ((n, Report.objects.select_related('summary').get(pk=r.pk)) for n, r in self.reports.items())
+        }
+
+    def test_competition_ranks_handle_ties(self):
+        self.assertEqual(competition_ranks({'a': 90, 'b': 75, 'c': 75, 'd': 40}), {
+            'a': (1, 87.5, 4), 'b': (2, 50.0, 4), 'c': (2, 50.0, 4), 'd': (4, 12.5, 4),
+        })
+
+    def test_ranks_are_per_grade_level(self):
+        self.assertEqual(self.ranks(), {'A': (1, 4), 'B': (2, 4), 'C': (2, 4), 'D': (4, 4), 'E': (1, 1)})
+        entry = PerformanceEntry.objects.get(report=self.reports['D'])
+        self.assertEqual((entry.subject_rank, entry.subject_cohort_size), (4, 4))
+
+    def test_ranks_follow_mark_changes(self):
+        entry = PerformanceEntry.objects.get(report=self.reports['D'])
+        entry.marks_obtained = 95
+        with self.captureOnCommitCallbacks(execute=True):
+            entry.save()
+        self.assertEqual(self.ranks()['D'], (1, 4))
+        self.assertEqual(self.ranks()['A'], (2, 4))
+
+    def test_only_grade_changes_rerank(self):
+        student = self.reports['E'].student
+        # A rename only rebuilds the snapshots
+        with mock.patch('reports.signals.schedule_refresh') as refresh, \
+                mock.patch('reports.signals.schedule_snapshots') as snapshots:
+            student.full_name = 'Eman'
+            student.save()
+        refresh.assert_not_called()
+        snapshots.assert_called_once_with(student=student.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            student.grade_level = '9'
+            student.save()
+        self.assertEqual(self.ranks(), {'A': (1, 5), 'B': (2, 5), 'C': (2, 5), 'D': (4, 5), 'E': (5, 5)})
+
+    def test_serializer_and_template_show_rank(self):
+        api = APIClient()
+        api.force_authenticate(self.user)
+        resp = api.get(f"/api/reports/{self.reports['B'].id}/")
+        self.assertEqual((resp.data['class_rank'], resp.data['cohort_size']), (2, 4))
+        report, entries = load_report(self.reports['B'].id)
+        self.assertIn('Position in class: 2 / 4', render_report_html(report, entries, 'en'))
+
+
+class KeysetPaginationTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tutor8', password='testpass123')
+        self.tutor = Tutor.objects.create(user=self.user, full_name='Ms. Hira')
+        student = Student.objects.create(tutor=self.tutor, full_name='Sana', gender='Female', grade_level='5')
+        exam = Exam.objects.create(name='Monthly', exam_type='Monthly', date='2025-04-01')
+        report = Report.objects.create(student=student, tutor=self.tutor, exam=exam)
+        PerformanceEntry.objects.bulk_create(
+            PerformanceEntry(report=report, subject=Subject.objects.create(name=f'Subject {i}'),
+                             marks_obtained=i, total_marks=50)
+            for i in range(25)
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_page_numbers_remain_the_default(self):
+        resp = self.client.get('/api/entries/')
+        self.assertEqual(resp.data['count'], 25)
+        self.assertEqual(len(resp.data['results']), 20)
+
+    def test_keyset_walks_all_rows_without_count(self):
+        seen = []
+        url = '/api/entries/?pagination=cursor&page_size=10'
+        while url:
+            resp = self.client.get(url)
+            self.assertNotIn('count', resp.data)
+            seen += [row['id'] for row in resp.data['results']]
+            url = resp.data['next']
+        self.assertEqual(seen, sorted(PerformanceEntry.objects.values_list('id', flat=True)))
+
+    def test_keyset_count_and_page_size_cap(self):
+        resp = self.client.get('/api/entries/', {'pagination': 'cursor', 'count': 'approx', 'page_size': 1000})
+        self.assertEqual(resp.data['count'], 25)
+        self.assertEqual(len(resp.data['results']), 25)
+        self.assertEqual(KeysetPagination.max_page_size, 200)
+
+
+class ReportListQueryCountTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tutor9', password='testpass123')
+        self.tutor = Tutor.objects.create(user=self.user, full_name='Mr. Tariq')
+        self.exam = Exam.objects.create(name='Final', exam_type='Final', date='2025-09-01')
+        self.subjects = [Subject.objects.create(name=f'Subject {i}') for i in range(6)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # As the token's tutor_id claim does, so scoping adds no query
+        cache_tutor_id(self.user, self.tutor.id)
+
+    def add_reports(self, n, entries_each):
+        # The snapshots are built when the reports' refresh runs on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(n):
+                student = Student.objects.create(tutor=self.tutor, full_name=f'S{i}', gender='Male', grade_level='9')
+                report = Report.objects.create(student=student, tutor=self.tutor, exam=self.exam)
+                PerformanceEntry.objects.bulk_create(
+                    PerformanceEntry(report=report, subject=s, marks_obtained=30, total_marks=50)
+                    for s in self.subjects[:entries_each]
+                )
+
+    def test_list_query_count_is_constant(self):
+        self.add_reports(2, 1)
+        # COUNT for the page, the reports (+ joined snapshots with names, summary and entries)
+        with self.assertNumQueries(2):
+            small = self.client.get('/api/reports/')
+        self.add_reports(15, 6)
+        with self.assertNumQueries(2):
+            large = self.client.get('/api/reports/')
+        self.assertEqual(len(small.data['results']), 2)
+        self.assertEqual(len(large.data['results']), 17)
+        self.assertEqual(len(large.data['results'][-1]['entries']), 6)
+        self.assertEqual(large.data['results'][-1]['entries'][0]['subject_name'], 'Subject 0')
+
+    def test_keyset_list_query_count(self):
+        self.add_reports(12, 4)
+        with self.assertNumQueries(1):
+            resp = self.client.get('/api/reports/', {'pagination': 'cursor', 'page_size': 10})
+        self.assertEqual(len(resp.data['results']), 10)
+
+    def test_detail_query_count(self):
+        self.add_reports(1, 6)
+        report = Report.objects.get()
+        with self.assertNumQueries(1):
+            resp = self.client.get(f'/api/reports/{report.id}/')
+        self.assertEqual(resp.data['student_name'], 'S0')
+
+
+class BulkMarksTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tutor10', password='testpass123')
+        self.tutor = Tutor.objects.create(user=self.user, full_name='Ms. Amna')
+        self.exam = Exam.objects.create(name='Final', exam_type='Final', date='2025-09-01')
+        self.math = Subject.objects.create(name='Math')
+        self.urdu = Subject.objects.create(name='Urdu')
+        self.students = [
+            Student.objects.create(tutor=self.tutor, full_name=f'S{i}', gender='Male', grade_level='8') for i in range(2)
+        ]
+        self.reports = [Report.objects.create(student=s, tutor=self.tutor, exam=self.exam) for s in self.students]
+        PerformanceEntry.objects.create(report=self.reports[0], subject=self.math, marks_obtained=10, total_marks=50)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_report_sheet_upserts_in_one_batch(self):
+        payload = {'report': self.reports[0].id, 'entries': [
+            {'subject': self.math.id, 'marks_obtained': 45, 'total_marks': 50},
+            {'subject': self.urdu.id, 'marks_obtained': 30, 'total_marks': 50},
+        ]}
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post('/api/entries/bulk_upsert/', payload, format='json')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual((resp.data['created'], resp.data['updated'], resp.data['errors']), (1, 1, []))
+        self.assertEqual(PerformanceEntry.objects.get(report=self.reports[0], subject=self.math).marks_obtained, 45)
+        self.assertEqual(ReportSummary.objects.get(report=self.reports[0]).total_obtained, 75)
+
+    def test_exam_sheet_reports_per_row_errors(self):
+        payload = {'exam': self.exam.id, 'entries': [
+            {'student': self.students[1].id, 'subject': self.math.id, 'marks_obtained': 20, 'total_marks': 50},
+            {'student': self.students[1].id, 'subject': self.math.id, 'marks_obtained': 25, 'total_marks': 50},
+            {'student': 999999, 'subject': self.math.id, 'marks_obtained': 20, 'total_marks': 50},
+            {'report': self.reports[0].id, 'subject': 999999, 'marks_obtained': 20, 'total_marks': 50},
+            {'report': self.reports[0].id, 'subject': self.urdu.id, 'marks_obtained': 60, 'total_marks': 50},
+            {'report': self.reports[0].id, 'subject': self.urdu.id, 'marks_obtained': 'abc', 'total_marks': 50},
+        ]}
+        resp = self.client.post('/api/entries/bulk_upsert/', payload, format='json')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['created'], 1)
+        self.assertEqual([e['index'] for e in resp.data['errors']], [1, 2, 3, 4, 5])
+
+    def test_all_rows_invalid_is_400(self):
+        payload = {'report': self.reports[0].id, 'entries': [{'subject': 999999, 'marks_obtained': 1, 'total_marks': 2}]}
+        resp = self.client.post('/api/entries/bulk_upsert/', payload, format='json')
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(len(resp.data['errors']), 1)
+
+
+class ImportTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='amna', password='testpass123')
+        self.tutor = Tutor.objects.create(user=self.user, full_name='Ms. Amna', phone='03001234567')
+        self.exam = Exam.objects.create(name='Final 2025', exam_type='Final', date='2025-09-01')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def csv_file(self, text):
+        return io.BytesIO(text.encode('utf-8'))
+
+    def test_subjects_then_students_then_results(self):
+        from reports.importer import import_file
+
+        result = import_file(self.csv_file('name,name_urdu\nMath,ریاضی\nUrdu,\nmath,\n'), 'subjects.csv', 'subjects')
+        self.assertEqual((result.created, result.skipped), (2, 1))
+
+        students_csv = (
+            'full_name,gender,grade_level,tutor,subjects\n'
+            'Ali,M,8,amna,Math;Urdu\n'
+            'Sara,female,8,03001234567,math\n'
+            'Bad,X,8,nobody,Physics\n'
+        )
+        # savepoint, tutor map, subject map, students INSERT, M2M links INSERT, release
+        with self.assertNumQueries(6):
+            result = import_file(self.csv_file(students_csv), 'students.csv', 'students', batch_size=10)
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.error_count, 1)
+        self.assertEqual(result.errors[0]['line'], 4)
+        self.assertEqual(set(result.errors[0]['errors']), {'gender', 'tutor', 'subjects'})
+        ali = Student.objects.get(full_name='Ali')
+        self.assertEqual(sorted(ali.subjects.values_list('name', flat=True)), ['Math', 'Urdu'])
+
+        sara = Student.objects.get(full_name='Sara')
+        results_csv = (
+            'student,exam,subject,marks_obtained,total_marks\n'
+            f'{ali.id},Final 2025,Math,40,50\n'
+            f'{ali.id},{self.exam.id},Urdu,30,50\n'
+            f'{sara.id},Final 2025,Math,60,50\n'
+            '999999,Final 2025,Math,10,50\n'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            result = import_file(self.csv_file(results_csv), 'marks.csv', 'results')
+        self.assertEqual((result.created, result.updated, result.error_count), (2, 0, 2))
+        report = Report.objects.get(student=ali, exam=self.exam)
+        self.assertEqual(report.tutor_id, self.tutor.id)
+        self.assertEqual(ReportSummary.objects.get(report=report).total_obtained, 70)
+
+        # Re-import updates in place
+        result = import_file(self.csv_file(results_csv), 'marks.csv', 'results')
+        self.assertEqual((result.created, result.updated), (0, 2))
+
+    def test_ambiguous_subject_names_are_rejected(self):
+        from reports.importer import import_file
+
+        Subject.objects.create(name='Math')
+        other = Subject.objects.create(name='math ')
+        student = Student.objects.create(tutor=self.tutor, full_name='Ali', gender='Male', grade_level='8')
+        students_csv = 'full_name,gender,grade_level,tutor,subjects\nSara,F,8,amna,Math\n'
+        result = import_file(self.csv_file(students_csv), 'students.csv', 'students')
+        self.assertEqual(result.errors[0]['errors']['subjects'], ['Unknown (or ambiguous) subject(s): Math.'])
+
+        results_csv = (
+            'student,exam,subject,marks_obtained,total_marks\n'
+            f'{student.id},Final 2025,MATH,40,50\n'
+            f'{student.id},Final 2025,{other.id},30,50\n'
+        )
+        result = import_file(self.csv_file(results_csv), 'marks.csv', 'results')
+        self.assertEqual((result.created, result.error_count), (1, 1))
+        self.assertEqual(result.errors[0]['errors'], {'subject': ['Unknown (or ambiguous) subject.']})
+        self.assertEqual(PerformanceEntry.objects.get().subject_id, other.id)
+
+    def test_dry_run_rolls_back(self):
+        from reports.importer import import_file
+
+        result = import_file(self.csv_file('name\nMath\nUrdu\n'), 'subjects.csv', 'subjects', dry_run=True)
+        self.assertEqual(result.created, 2)
+        self.assertFalse(Subject.objects.exists())
+
+    def test_api_upload(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        def upload():
+            return SimpleUploadedFile('subjects.csv', b'name,category\nMath,Science\n', content_type='text/csv')
+
+        # Subjects are shared by every tutor: only staff import them
+        resp = self.client.post('/api/imports/', {'file': upload(), 'kind': 'subjects'}, format='multipart')
+        self.assertEqual(resp.status_code, 403)
+        self.assertFalse(Subject.objects.exists())
+
+        staff = APIClient()
+        staff.force_authenticate(User.objects.create_user(username='staff12', password='testpass123', is_staff=True))
+        resp = staff.post('/api/imports/', {'file': upload(), 'kind': 'subjects'}, format='multipart')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['created'], 1)
+        self.assertIn('rows_per_second', resp.data)
+        self.assertTrue(Subject.objects.filter(name='Math', category='Science').exists())
+
+        upload = SimpleUploadedFile('students.ods', b'x', content_type='application/octet-stream')
+        resp = self.client.post('/api/imports/', {'file': upload, 'kind': 'students'}, format='multipart')
+        self.assertEqual(resp.status_code, 400)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as fh:
+            fh.write('name\nMath\n')
+        self.addCleanup(os.remove, fh.name)
+        out = io.StringIO()
+        call_command('import_data', 'subjects', fh.name, stdout=out)
+        self.assertIn('1 created', out.getvalue())
+        self.assertTrue(Subject.objects.filter(name='Math').exists())
+
+
+class SessionExportTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tutor12', password='testpass123')
+        tutor = Tutor.objects.create(user=self.user, full_name='Ms. Amna', full_name_urdu='مس آمنہ')
+        self.session = ExamSession.objects.create(name='2025 Term-1')
+        other = ExamSession.objects.create(name='2025 Term-2')
+        math = Subject.objects.create(name='Math', name_urdu='ریاضی')
+        with self.captureOnCommitCallbacks(execute=True):
+            for session in (self.session, other):
+                exam = Exam.objects.create(name='Final', exam_type='Final', date='2025-09-01', session=session)
+                for i in range(3):
+                    student = Student.objects.create(tutor=tutor, full_name=f'S{i}', gender='Male', grade_level='8')
+                    report = Report.objects.create(student=student, tutor=tutor, exam=exam)
+                    PerformanceEntry.objects.create(report=report, subject=math, marks_obtained=40, total_marks=50)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        cache_tutor_id(self.user, tutor.id)
+
+    def test_csv_streams_session_rows(self):
+        with self.assertNumQueries(2):  # session lookup + one export query (reports + snapshots)
+            resp = self.client.get(f'/api/exam-sessions/{self.session.id}/export/')
+            body = b''.join(resp.streaming_content).decode('utf-8-sig')
+        self.assertEqual(resp.status_code, 200)
+        lines = body.strip().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].startswith('session,exam_id,exam'))
+        self.assertIn('2025 Term-1', lines[1])
+        self.assertIn('80.0', lines[1])
+        self.assertNotIn('ریاضی', body)
+
+    def test_jsonl_with_urdu_names(self):
+        resp = self.client.get(f'/api/exam-sessions/{self.session.id}/export/?output=jsonl&urdu=1')
+        rows = [json.loads(line) for line in b''.join(resp.streaming_content).decode('utf-8').splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['subject_urdu'], 'ریاضی')
+        self.assertEqual(rows[0]['tutor_urdu'], 'مس آمنہ')
+        self.assertEqual(rows[0]['exam_date'], '2025-09-01')
+
+
+class SubjectTranslationTestCase(TestCase):
+    def test_identical_to_original_over_dictionary(self):
+        from reports.subject_names import dictionary_corpus, legacy_subject_to_urdu, subject_to_urdu
+
+        for title in dictionary_corpus():
+            self.assertEqual(subject_to_urdu(title), legacy_subject_to_urdu(title), title)
+
+    def test_examples_and_batch_api(self):
+        from reports.subject_names import translate_many, translation_cache_info
+        from reports.templatetags.urdu_filters import subject_to_urdu
+
+        titles = ["Mathematics - Algebra", "Physics: Modern Physics II", "Unknown", None, "Mathematics - Algebra"]
+        self.assertEqual(
+            translate_many(titles),
+            ["ریاضی (الجبرہ)", "طبیعیات (جدید طبیعیات)", "Unknown", None, "ریاضی (الجبرہ)"],
+        )
+        hits = translation_cache_info().hits
+        subject_to_urdu("Mathematics - Algebra")
+        self.assertEqual(translation_cache_info().hits, hits + 1)
+
+    def test_bench_command(self):
+        out = io.StringIO()
+        call_command('bench_urdu', '--iterations', '1', stdout=out)
+        self.assertIn('Parity OK', out.getvalue())
+
+
+class UrduNamesTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tutor14', password='testpass123')
+        self.tutor = Tutor.objects.create(user=self.user, full_name='Ms. Amna')
+
+    def test_filled_on_save_and_follow_renames(self):
+        subject = Subject.objects.create(name='Physics: Optics')
+        self.assertEqual(subject.name_urdu, 'طبیعیات (نوریات)')
+
+        subject.name = 'Chemistry - Organic'
+        subject.save()
+        self.assertEqual(subject.name_urdu, 'کیمسٹری (نامیاتی کیمسٹری)')
+
+        # A hand correction sticks across later renames
+        subject.name_urdu = 'نامیاتی کیمیا'
+        subject.save()
+        subject.name = 'Chemistry: Organic'
+        subject.save()
+        self.assertEqual(Subject.objects.get(pk=subject.pk).name_urdu, 'نامیاتی کیمیا')
+
+        # No translation -> stays empty (template falls back to the English name)
+        self.assertIsNone(Subject.objects.create(name='Robotics').name_urdu)
+        self.assertIsNone(self.tutor.full_name_urdu)
+
+    def test_people_are_not_translated_as_subjects(self):
+        student = Student.objects.create(tutor=self.tutor, full_name='Art-Ali', gender='Male', grade_level='8')
+        self.assertIsNone(student.full_name_urdu)
+        self.tutor.full_name = 'Music - Noor'
+        self.tutor.save()
+        self.assertIsNone(Tutor.objects.get(pk=self.tutor.pk).full_name_urdu)
+
+    def test_backfill_command(self):
+        ids = Subject.objects.bulk_create([Subject(name='Mathematics'), Subject(name='Art'), Subject(name='Robotics')])
+        Subject.objects.filter(pk=ids[1].pk).update(name_urdu='آرٹ')
+        out = io.StringIO()
+        call_command('backfill_urdu_names', '--model', 'subject', stdout=out)
+        self.assertIn('Subject=1', out.getvalue())
+        self.assertEqual(
+            dict(Subject.objects.values_list('name', 'name_urdu')),
+            {'Mathematics': 'ریاضی', 'Art': 'آرٹ', 'Robotics': None},
+        )
+
+    @override_settings(REPORT_FONT_SUBSETS=False)
+    def test_template_reads_stored_names(self):
+        from reports.subject_names import translation_cache_info
+
+        subject = Subject.objects.create(name='Physics: Optics', name_urdu='بصریات')
+        student = Student.objects.create(tutor=self.tutor, full_name='Ali', full_name_urdu='علی',
+                                         gender='Male', grade_level='8')
+        exam = Exam.objects.create(name='Final', exam_type='Final', date='2025-09-01')
+        report = Report.objects.create(student=student, tutor=self.tutor, exam=exam)
+        PerformanceEntry.objects.create(report=report, subject=subject, marks_obtained=40, total_marks=50)
+        report, entries = load_report(report.pk)
+        before = translation_cache_info()
+        html = render_report_html(report, entries, 'ur')
+        after = translation_cache_info()
+        self.assertIn('بصریات', html)
+        self.assertIn('علی', html)
+        self.assertEqual((after.hits, after.misses), (before.hits, before.misses))
+
+
+class LocalizationTestCase(TestCase):
+    def test_digits_and_decimal_separator(self):
+        from reports.localization import format_urdu_number, localize_many, to_urdu_digits
+        from reports.templatetags.urdu_filters import convert_urdu
+        from reports.utils import convert_to_urdu_digits
+
+        self.assertEqual(to_urdu_digits(80.5), '۸۰٫۵')
+        # Filter and utils helper agree now
+        self.assertEqual(convert_urdu('12.25'), convert_to_urdu_digits('12.25'))
+        self.assertEqual(format_urdu_number(2 / 3, places=2), '۰٫۶۷')
+        self.assertEqual(localize_many([0.125, 10], places=2), ['۰٫۱۳', '۱۰٫۰۰'])
+
+    def test_date_formatting(self):
+        import datetime
+        from reports.templatetags.urdu_filters import convert_urdu_date
+
+        self.assertEqual(convert_urdu_date(datetime.date(2025, 9, 1)), '۲۰۲۵ ۱, ستمبر')
+
+    @override_settings(REPORT_FONT_SUBSETS=False)
+    def test_urdu_table_rendered_from_localized_rows(self):
+        user = User.objects.create_user(username='tutor15', password='testpass123')
+        tutor = Tutor.objects.create(user=user, full_name='Ms. Amna')
+        student = Student.objects.create(tutor=tutor, full_name='Ali', gender='Male', grade_level='8')
+        exam = Exam.objects.create(name='Final', exam_type='Final', date='2025-09-01')
+        report = Report.objects.create(student=student, tutor=tutor, exam=exam)
+        PerformanceEntry.objects.create(report=report, subject=Subject.objects.create(name='Math'),
+                                        marks_obtained=2, total_marks=3)
+        report, entries = load_report(report.pk)
+        html = render_report_html(report, entries, 'ur')
+        self.assertIn('<td>ریاضی</td>', html)
+        self.assertIn('<td>۲٫۰</td>', html)
+        self.assertIn('<td>۶۶٫۶۷%</td>', html)
+
+
+class FontSubsetTestCase(TestCase):
+    def setUp(self):
+        from reports.font_subsets import FontSubsetCache, full_font_path
+
+        self.tmp = tempfile.mkdtemp()
+        self.cache = FontSubsetCache(full_font_path(), self.tmp)
+
+    def test_font_found_at_template_path(self):
+        from reports.font_subsets import full_font_path
+
+        self.assertTrue(full_font_path().endswith(os.path.join('reports', 'fonts', 'NotoNastaliqUrdu-Regular.ttf')))
+
+    def test_subset_is_cached_and_smaller(self):
+        codepoints = frozenset(map(ord, '0123456789۰۱۲۳'))
+        path = self.cache.build(codepoints)
+        self.assertLess(path.stat().st_size, os.path.getsize(self.cache.font_path) / 10)
+        mtime = path.stat().st_mtime_ns
+        self.assertEqual(self.cache.build(codepoints), path)
+        self.assertEqual(path.stat().st_mtime_ns, mtime)
+
+    def test_smallest_covering_tier(self):
+        self.assertEqual(self.cache.tier_for('ریاضی ۸۰٫۵ Report')[0], 'vocabulary')
+        rare = next(chr(c) for c in sorted(self.cache.tiers[1][1] - self.cache.tiers[0][1]))
+        self.assertEqual(self.cache.tier_for('ریاضی' + rare)[0], 'urdu')
+
+    def test_rendered_html_points_at_subset(self):
+        from reports import font_subsets
+
+        with override_settings(FONT_SUBSET_DIR=self.tmp), \
+                mock.patch.object(font_subsets.FontSubsetCache, 'build', autospec=True,
+                                  side_effect=lambda cache, cps: cache.subset_path(cps)):
+            font_subsets.reset_font_subsets()
+            self.addCleanup(font_subsets.reset_font_subsets)
+            html = font_subsets.with_urdu_font(f'<style>src: url("{font_subsets.FONT_URL_PLACEHOLDER}")</style>ریاضی')
+        self.assertIn('file://' + self.tmp, html)
+        self.assertNotIn(font_subsets.FONT_URL_PLACEHOLDER, html)
+
+    def test_each_font_file_gets_its_own_family(self):
+        from reports import font_subsets
+        from reports.utils import render_report_html
+
+        tiers = [self.cache.subset_path(codepoints).as_uri() for _, codepoints in self.cache.tiers]
+        full = f'file://{self.cache.font_path}'
+        families = {font_subsets.urdu_font_family(url) for url in tiers + [full]}
+        self.assertEqual(len(families), 3)
+
+        user = User.objects.create_user(username='tutor18', password='testpass123')
+        tutor = Tutor.objects.create(user=user, full_name='Ms. Amna')
+        student = Student.objects.create(tutor=tutor, full_name='Ali', gender='Male', grade_level='8')
+        exam = Exam.objects.create(name='Final', exam_type='Final', date='2025-09-01')
+        report = Report.objects.create(student=student, tutor=tutor, exam=exam)
+        html = render_report_html(report, [], 'ur', font_url=tiers[0])
+        family = font_subsets.urdu_font_family(tiers[0])
+        self.assertIn(f'font-family: "{family}";', html)
+        self.assertIn(f'font-family: "{family}", "Noto Naskh Arabic"', html)
+        self.assertNotIn(font_subsets.FONT_FAMILY_PLACEHOLDER, html)
+
+
+@override_settings(REPORT_FONT_SUBSETS=False)
+class MergedReportsPDFTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tutor17', password='testpass123')
+        tutor = Tutor.objects.create(user=self.user, full_name='Ms. Amna')
+        self.student = Student.objects.create(tutor=tutor, full_name='Ali', gender='Male', grade_level='8')
+        other = Student.objects.create(tutor=tutor, full_name='Sara', gender='Female', grade_level='8')
+        self.session = ExamSession.objects.create(name='2025 Term-1')
+        math = Subject.objects.create(name='Math')
+        self.reports = []
+        for i, exam_type in enumerate(['Mid Term', 'Final']):
+            exam = Exam.objects.create(name=exam_type, exam_type=exam_type, date=f'2025-0{i + 3}-01', session=self.session)
+            for student in (self.student, other):
+                report = Report.objects.create(student=student, tutor=tutor, exam=exam)
+                PerformanceEntry.objects.create(report=report, subject=math, marks_obtained=40, total_marks=50)
+                self.reports.append(report)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_student_session_merged_with_contents_page(self):
+        from reports import bulk
+
+        with mock.patch('reports.bulk._toc_html', wraps=bulk._toc_html) as toc:
+            resp = self.client.get(f'/api/reports/merged_pdf/?student={self.student.id}&session={self.session.id}')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Type'], 'application/pdf')
+        self.assertEqual(resp['X-Report-Count'], '2')
+        # contents page + one page per report, written once
+        self.assertEqual(resp.content.count(b'page\n'), 3)
+        reports, documents, lang, first_page, font_url = toc.call_args.args
+        self.assertEqual([r.student_id for r in reports], [self.student.id, self.student.id])
+        self.assertEqual(first_page, 2)
+
+    def test_contents_running_over_several_pages(self):
+        from reports import bulk
+
+        real_render = bulk.render_html_document
+
+        def render(html, lang):
+            if html.startswith('contents from '):
+                # Contents that start numbering at page n take n pages, up to five
+                return mock.Mock(pages=['toc'] * min(int(html.split()[-1]), 5))
+            return real_render(html, lang)
+
+        with mock.patch('reports.bulk._toc_html', side_effect=lambda *args: f'contents from {args[3]}') as toc, \
+                mock.patch('reports.bulk.render_html_document', side_effect=render):
+            pdf = bulk.render_merged_pdf(bulk_reports(report_ids=[r.id for r in self.reports]), toc=True)
+        # Laid out with first pages 2..6; the last layout assumed its own five pages
+        self.assertEqual([call.args[3] for call in toc.call_args_list], [2, 3, 4, 5, 6])
+        self.assertEqual(pdf.count(b'page\n'), 5 + 4)
+
+    def test_contents_lists_first_pages(self):
+        from reports.bulk import _toc_html, bulk_reports
+
+        reports = bulk_reports(report_ids=[r.id for r in self.reports])
+        documents = [mock.Mock(pages=[1, 2]), mock.Mock(pages=[1]), mock.Mock(pages=[1]), mock.Mock(pages=[1])]
+        html = _toc_html(reports, documents, 'ur', 2, 'file:///font.ttf')
+        self.assertIn(f'href="#report-{reports[0].pk}"', html)
+        self.assertIn('>۲</a>', html)
+        self.assertIn('>۴</a>', html)  # second report starts after the first one's two pages
+        self.assertIn('file:///font.ttf', html)
+
+    def test_ids_and_validation(self):
+        ids = ','.join(str(r.id) for r in self.reports[:3])
+        resp = self.client.get(f'/api/reports/merged_pdf/?ids={ids}&lang=ur')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['X-Report-Count'], '3')
+        self.assertEqual(self.client.get('/api/reports/merged_pdf/?student=1').status_code, 400)
+        self.assertEqual(self.client.get('/api/reports/merged_pdf/?ids=a,b').status_code, 400)
+        self.assertEqual(self.client.get('/api/reports/merged_pdf/?ids=999999').status_code, 404)
+
+
+def _html_text(html):
+    """Visible text of a rendered report (body only), whitespace-collapsed."""
+    from html.parser import HTMLParser
+
+    class Collector(HTMLParser):
+        def __init__(self):
+            super().__init__()
+            self.in_body, self.parts = False, []
+
+        def handle_starttag(self, tag, attrs):
+            self.in_body = self.in_body or tag == 'body'
+
+        def handle_data(self, data):
+            if self.in_body:
+                self.parts.append(data)
+
+    collector = Collector()
+    collector.feed(html)
+    return ' '.join(' '.join(collector.parts).split())
+
+
+@override_settings(REPORT_FONT_SUBSETS=False, REPORTLAB_URDU_FONT=None)
+class ReportLabEngineTestCase(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='tutor19', password='testpass123')
+        tutor = Tutor.objects.create(user=user, full_name='Ms. Amna')
+        student = Student.objects.create(tutor=tutor, full_name='Ali Raza', gender='Male', grade_level='8')
+        exam = Exam.objects.create(name='Final 2025', exam_type='Final', date='2025-03-01')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.report = Report.objects.create(
+                student=student, tutor=tutor, exam=exam, remarks='Steady progress; ' * 20,
+            )
+            for i, name in enumerate(['Mathematics', 'Physics: Optics', 'Computer Science (Programming)'] * 15):
+                PerformanceEntry.objects.create(
+                    report=self.report, subject=Subject.objects.create(name=f'{name} {i}'),
+                    marks_obtained=33 + i, total_marks=67,
+                )
+
+    def test_text_matches_weasyprint_template(self):
+        from .fast_pdf import report_blocks
+
+        report, entries = load_report(self.report.id)
+        self.assertEqual(report.summary.class_rank, 1)
+        for lang in ('en', 'ur'):
+            blocks = report_blocks(report, entries, lang)
+            self.assertEqual(' '.join(' '.join(blocks.texts()).split()), _html_text(render_report_html(report, entries, lang)))
+
+    def test_reportlab_engine_draws_pdf(self):
+        from .utils import generate_report_pdf
+
+        with mock.patch('reports.utils.render_report_document') as weasy:
+            pdf = generate_report_pdf(self.report.id, engine='reportlab')
+        weasy.assert_not_called()
+        self.assertTrue(pdf.startswith(b'%PDF-'))
+        # 45 rows with wrapped subjects don't fit on one A4 page
+        self.assertGreaterEqual(pdf.count(b'/Type /Page\n'), 2)
+
+    def test_urdu_without_font_falls_back_in_auto_mode(self):
+        from .fast_pdf import FastPathUnavailable
+        from .utils import generate_report_pdf
+
+        with self.assertRaises(FastPathUnavailable):
+            generate_report_pdf(self.report.id, lang='ur', engine='reportlab')
+        self.assertTrue(generate_report_pdf(self.report.id, lang='ur', engine='auto').startswith(b'%PDF-1.7\npage'))
+        with self.assertRaises(ValueError):
+            generate_report_pdf(self.report.id, engine='latex')
+
+    def test_row_taller_than_a_page_is_not_dropped(self):
+        from .fast_pdf import FastPathUnavailable, ReportBlocks, render_blocks_pdf
+
+        blocks = ReportBlocks('en', 'Report', header=['Subject', 'Marks', 'Total', 'Rank'])
+        blocks.rows = [['Math', '1', '2', '1'], [' '.join(['word'] * 2000), '1', '2', '1']]
+        with self.assertRaises(FastPathUnavailable):
+            render_blocks_pdf(blocks)
+
+    def test_engine_is_part_of_cache_fingerprint(self):
+        from .pdf_cache import report_fingerprint
+
+        report, entries = load_report(self.report.id)
+        with override_settings(REPORT_PDF_ENGINE='weasyprint'):
+            weasy = report_fingerprint(report, entries, 'en')
+        with override_settings(REPORT_PDF_ENGINE='reportlab'):
+            self.assertNotEqual(report_fingerprint(report, entries, 'en'), weasy)
+
+    def test_fonts_are_part_of_cache_fingerprint(self):
+        from .pdf_cache import report_fingerprint
+
+        report, entries = load_report(self.report.id)
+        english, urdu = report_fingerprint(report, entries, 'en'), report_fingerprint(report, entries, 'ur')
+        with override_settings(REPORT_FONT_SUBSETS=True):
+            self.assertNotEqual(report_fingerprint(report, entries, 'ur'), urdu)
+            self.assertEqual(report_fingerprint(report, entries, 'en'), english)
+        with tempfile.NamedTemporaryFile(suffix='.ttf') as font:
+            font.write(b'another font')
+            font.flush()
+            with mock.patch('reports.pdf_cache.full_font_path', return_value=font.name):
+                self.assertNotEqual(report_fingerprint(report, entries, 'ur'), urdu)
+            with override_settings(REPORTLAB_URDU_FONT=font.name):
+                self.assertNotEqual(report_fingerprint(report, entries, 'ur'), urdu)
+
+
+class QueryPlanTestCase(TestCase):
+    def test_hot_queries_use_indexes(self):
+        from .query_plans import hot_queries, sequential_scans
+
+        for name, queryset in hot_queries().items():
+            with self.subTest(name):
+                self.assertEqual(sequential_scans(queryset), [], name)
+
+    def test_harness_detects_full_scans(self):
+        from .query_plans import sequential_scans
+
+        self.assertEqual(sequential_scans(Tutor.objects.filter(bio='x')), ['reports_tutor'])
+
+    def test_duplicate_report_for_student_and_exam_is_rejected(self):
+        user = User.objects.create_user(username='tutor21', password='testpass123')
+        tutor = Tutor.objects.create(user=user, full_name='Mr. Bilal')
+        student = Student.objects.create(tutor=tutor, full_name='Usman', gender='Male', grade_level='9')
+        exam = Exam.objects.create(name='Final', exam_type='Final', date='2025-03-01')
+        Report.objects.create(student=student, tutor=tutor, exam=exam)
+        client = APIClient()
+        client.force_authenticate(user)
+        resp = client.post('/api/reports/', {'student': student.id, 'tutor': tutor.id, 'exam': exam.id}, format='json')
+        self.assertEqual(resp.status_code, 400)
+
+
+class ScopingTestCase(TestCase):
+    def setUp(self):
+        self.exam = Exam.objects.create(name='Final', exam_type='Final', date='2025-09-01')
+        self.math = Subject.objects.create(name='Math')
+        self.users, self.tutors, self.students, self.reports = [], [], [], []
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(2):
+                user = User.objects.create_user(username=f'scoped{i}', password='testpass123')
+                tutor = Tutor.objects.create(user=user, full_name=f'Tutor {i}')
+                student = Student.objects.create(tutor=tutor, full_name=f'Student {i}', gender='Male', grade_level='7')
+                report = Report.objects.create(student=student, tutor=tutor, exam=self.exam)
+                PerformanceEntry.objects.create(report=report, subject=self.math, marks_obtained=30 + i, total_marks=50)
+                self.users.append(user)
+                self.tutors.append(tutor)
+                self.students.append(student)
+                self.reports.append(report)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def ids(self, resp):
+        return sorted(row['id'] for row in resp.data['results'])
+
+    def test_tutor_sees_only_own_data(self):
+        client = self.client_for(self.users[0])
+        self.assertEqual(self.ids(client.get('/api/students/')), [self.students[0].id])
+        self.assertEqual(self.ids(client.get('/api/reports/')), [self.reports[0].id])
+        self.assertEqual(self.ids(client.get('/api/tutors/')), [self.tutors[0].id])
+        entries = client.get('/api/entries/')
+        self.assertEqual([row['report'] for row in entries.data['results']], [self.reports[0].id])
+        self.assertEqual(client.get(f'/api/reports/{self.reports[1].id}/').status_code, 404)
+        self.assertEqual(client.get(f'/api/reports/student_progress/{self.students[1].id}/').status_code, 404)
+
+    def test_staff_and_users_without_tutor(self):
+        staff = User.objects.create_user(username='admin', password='testpass123', is_staff=True)
+        self.assertEqual(len(self.client_for(staff).get('/api/reports/').data['results']), 2)
+        nobody = User.objects.create_user(username='nobody', password='testpass123')
+        self.assertEqual(self.client_for(nobody).get('/api/reports/').data['results'], [])
+        self.assertEqual(APIClient().get('/api/reports/').status_code, 401)
+
+    def test_cannot_write_to_another_tutors_student(self):
+        client = self.client_for(self.users[0])
+        other = Exam.objects.create(name='Mid', exam_type='Midterm', date='2025-05-01')
+        resp = client.post(
+            '/api/reports/', {'student': self.students[1].id, 'tutor': self.tutors[0].id, 'exam': other.id},
+            format='json',
+        )
+        self.assertEqual(resp.status_code, 403)
+        resp = client.post(
+            '/api/entries/',
+            {'report': self.reports[1].id, 'subject': Subject.objects.create(name='Art').id,
+             'marks_obtained': 10, 'total_marks': 50},
+            format='json',
+        )
+        self.assertEqual(resp.status_code, 403)
+
+    def test_session_export_is_scoped(self):
+        session = ExamSession.objects.create(name='2025 Term-1')
+        Exam.objects.filter(pk=self.exam.pk).update(session=session)
+        resp = self.client_for(self.users[1]).get(f'/api/exam-sessions/{session.id}/export/')
+        body = b''.join(resp.streaming_content).decode('utf-8-sig')
+        self.assertIn('Student 1', body)
+        self.assertNotIn('Student 0', body)
+
+    def test_catalog_writes_need_staff(self):
+        tutor = self.client_for(self.users[0])
+        self.assertEqual(tutor.get('/api/exams/').status_code, 200)
+        self.assertEqual(tutor.delete(f'/api/exams/{self.exam.id}/').status_code, 403)
+        self.assertEqual(tutor.patch(f'/api/subjects/{self.math.id}/', {'name': 'X'}, format='json').status_code, 403)
+        self.assertEqual(tutor.post('/api/exam-sessions/', {'name': '2026'}, format='json').status_code, 403)
+        self.assertTrue(Report.objects.filter(pk=self.reports[1].id).exists())
+
+        staff = self.client_for(User.objects.create_user(username='staff', password='testpass123', is_staff=True))
+        self.assertEqual(staff.post('/api/exam-sessions/', {'name': '2026'}, format='json').status_code, 201)
+
+    @override_settings(API_RESPONSE_CACHE=True)
+    def test_student_filters_on_catalogs_are_scoped(self):
+        cache.clear()
+        session = ExamSession.objects.create(name='2025 Term-1')
+        for student in self.students:
+            StudentSession.objects.create(student=student, session=session)
+            student.subjects.add(self.math)
+        mine, theirs = self.client_for(self.users[0]), self.client_for(self.users[1])
+        for url in ('/api/exam-sessions/', '/api/subjects/'):
+            query = {'student': self.students[1].id}
+            # The owner's response must not be cached for the other tutor, nor the other way round
+            self.assertEqual(len(theirs.get(url, query).data['results']), 1, url)
+            self.assertEqual(mine.get(url, query).data['results'], [], url)
+            self.assertEqual(len(theirs.get(url, query).data['results']), 1, url)
+            self.assertEqual(len(mine.get(url, {'student': self.students[0].id}).data['results']), 1, url)
+
+    def test_token_carries_tutor_id(self):
+        resp = APIClient().post('/api/token/', {'username': 'scoped1', 'password': 'testpass123'}, format='json')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {resp.data['access']}")
+        # User lookup, COUNT, reports (+ snapshots): no query for the tutor
+        with self.assertNumQueries(3):
+            listing = client.get('/api/reports/')
+        self.assertEqual(self.ids(listing), [self.reports[1].id])
+
+
+# One process here, so per-process memory behaves like a shared cache
+@override_settings(API_RESPONSE_CACHE=True)
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='tutor20', password='testpass123')
+        self.tutor = Tutor.objects.create(user=self.user, full_name='Ms. Hina')
+        self.math = Subject.objects.create(name='Math')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_second_get_served_from_cache(self):
+        first = self.client.get('/api/subjects/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/subjects/')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_save_and_delete_invalidate(self):
+        self.client.get('/api/subjects/')
+        staff = APIClient()
+        staff.force_authenticate(User.objects.create_user(username='staff20', password='testpass123', is_staff=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            staff.post('/api/subjects/', {'name': 'English'}, format='json')
+        resp = self.client.get('/api/subjects/')
+        self.assertEqual(resp['X-Cache'], 'MISS')
+        self.assertEqual([row['name'] for row in resp.data['results']], ['English', 'Math'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.math.delete()
+        self.assertEqual([row['name'] for row in self.client.get('/api/subjects/').data['results']], ['English'])
+
+    def test_student_subjects_invalidate_filtered_list(self):
+        student = Student.objects.create(tutor=self.tutor, full_name='Ali', gender='Male', grade_level='5')
+        self.assertEqual(self.client.get('/api/subjects/', {'student': student.id}).data['results'], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            student.subjects.add(self.math)
+        resp = self.client.get('/api/subjects/', {'student': student.id})
+        self.assertEqual([row['name'] for row in resp.data['results']], ['Math'])
+
+    def test_imports_invalidate(self):
+        from reports.importer import import_file
+
+        self.client.get('/api/subjects/')
+        with self.captureOnCommitCallbacks(execute=True):
+            import_file(io.BytesIO(b'name\nEnglish\n'), 'subjects.csv', 'subjects')
+        resp = self.client.get('/api/subjects/')
+        self.assertEqual([row['name'] for row in resp.data['results']], ['English', 'Math'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            import_file(io.BytesIO(b'full_name,gender,grade_level,tutor,subjects\nAli,M,5,tutor20,Math\n'),
+                        'students.csv', 'students')
+        ali = Student.objects.get(full_name='Ali')
+        resp = self.client.get('/api/subjects/', {'student': ali.id})
+        self.assertEqual([row['name'] for row in resp.data['results']], ['Math'])
+
+    def test_conditional_get(self):
+        first = self.client.get('/api/subjects/')
+        resp = self.client.get('/api/subjects/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(resp.status_code, 304)
+        resp = self.client.get('/api/subjects/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(resp.status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Subject.objects.create(name='Urdu')
+        resp = self.client.get('/api/subjects/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp['ETag'], first['ETag'])
+
+    def test_scoped_entries_are_per_tutor(self):
+        other_user = User.objects.create_user(username='tutor21', password='testpass123')
+        other = Tutor.objects.create(user=other_user, full_name='Mr. Bilal')
+        self.assertEqual([row['id'] for row in self.client.get('/api/tutors/').data['results']], [self.tutor.id])
+        client = APIClient()
+        client.force_authenticate(other_user)
+        resp = client.get('/api/tutors/')
+        self.assertEqual(resp['X-Cache'], 'MISS')
+        self.assertEqual([row['id'] for row in resp.data['results']], [other.id])
+
+
+@override_settings(
+    ROOT_URLCONF='reports.tests', MEDIA_ROOT=tempfile.mkdtemp(prefix="async-tests-"),
+    REPORT_FONT_SUBSETS=False, REPORT_RENDER_POOL_WORKERS=0,
+)
+class AsyncDownloadsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tutor22', password='testpass123')
+        self.tutor = Tutor.objects.create(user=self.user, full_name='Ms. Saima')
+        student = Student.objects.create(tutor=self.tutor, full_name='Zara', gender='Female', grade_level='9')
+        self.session = ExamSession.objects.create(name='2025 Term-1')
+        exam = Exam.objects.create(name='Final', exam_type='Final', date='2025-09-01', session=self.session)
+        self.report = Report.objects.create(student=student, tutor=self.tutor, exam=exam)
+        PerformanceEntry.objects.create(
+            report=self.report, subject=Subject.objects.create(name='Math'), marks_obtained=40, total_marks=50,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            finalize_report(self.report.id)
+        token = TutorTokenObtainPairSerializer.get_token(self.user).access_token
+        self.auth = {'Authorization': f'Bearer {token}'}
+
+    async def read(self, resp):
+        if not resp.is_async:  # FileResponse
+            return b''.join(resp.streaming_content)
+        return b''.join([chunk async for chunk in resp.streaming_content])
+
+    async def test_pdf_rendered_in_pool_then_stored(self):
+        with mock.patch('reports.pdf_cache.render_report_pdf', return_value=b'%PDF-async') as render:
+            resp = await self.async_client.get(f'/api/reports/{self.report.id}/pdf/?lang=en', headers=self.auth)
+            again = await self.async_client.get(f'/api/reports/{self.report.id}/pdf/?lang=en', headers=self.auth)
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual((resp['X-Rendition'], again['X-Rendition']), ('rendered', 'stored'))
+        self.assertEqual(await self.read(again), b'%PDF-async')
+
+    async def test_auth_and_scoping(self):
+        resp = await self.async_client.get(f'/api/reports/{self.report.id}/pdf/')
+        self.assertEqual(resp.status_code, 401)
+        other = await User.objects.acreate(username='tutor23')
+        await Tutor.objects.acreate(user=other, full_name='Mr. Umer')
+        token = await sync_to_async(TutorTokenObtainPairSerializer.get_token)(other)
+        headers = {'Authorization': f'Bearer {token.access_token}'}
+        resp = await self.async_client.get(f'/api/reports/{self.report.id}/pdf/', headers=headers)
+        self.assertEqual(resp.status_code, 404)
+        resp = await self.async_client.get(f'/api/exam-sessions/{self.session.id}/export/', headers=headers)
+        self.assertNotIn('Zara', (await self.read(resp)).decode('utf-8-sig'))
+
+    async def test_busy_pool_returns_503(self):
+        full = threading.BoundedSemaphore(1)
+        full.acquire()
+        with mock.patch.object(render_pool, '_slots', full):
+            resp = await self.async_client.get(f'/api/reports/{self.report.id}/pdf/', headers=self.auth)
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(resp['Retry-After'], '5')
+
+    async def test_export_streams_asynchronously(self):
+        resp = await self.async_client.get(
+            f'/api/exam-sessions/{self.session.id}/export/?output=jsonl', headers=self.auth,
+        )
+        self.assertTrue(resp.is_async)
+        rows = [json.loads(line) for line in (await self.read(resp)).decode('utf-8').splitlines()]
+        self.assertEqual([(r['student'], r['subject']) for r in rows], [('Zara', 'Math')])
+
+
+class LoadTestCommandTestCase(LiveServerTestCase):
+    def test_reports_both_groups(self):
+        user = User.objects.create_user(username='tutor24', password='testpass123')
+        Tutor.objects.create(user=user, full_name='Ms. Rabia')
+        Subject.objects.create(name='Math')
+        output = os.path.join(tempfile.mkdtemp(prefix="load-test-"), 'run.json')
+        call_command(
+            'load_test', url=self.live_server_url, username='tutor24', password='testpass123',
+            slow=1, fast=1, duration=0.5, read_kbps=0, slow_path=['/api/subjects/'], output=output,
+            stdout=io.StringIO(),
+        )
+        with open(output, encoding='utf-8') as fh:
+            results = json.load(fh)
+        for group in ('slow', 'fast'):
+            self.assertGreater(results['groups'][group]['n'], 0)
+            self.assertEqual(results['groups'][group]['errors'], 0)
+
+
+class ReportSnapshotTestCase(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='tutor20', password='testpass123')
+        self.tutor = Tutor.objects.create(user=user, full_name='Ms. Hina')
+        self.session = ExamSession.objects.create(name='2025 Term-1')
+        self.exam = Exam.objects.create(name='Final', exam_type='Final', date='2025-09-01', session=self.session)
+        self.math = Subject.objects.create(name='Math')
+        self.urdu = Subject.objects.create(name='Urdu')
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        cache_tutor_id(user, self.tutor.id)
+        self.reports = []
+        with self.captureOnCommitCallbacks(execute=True):
+            for i, marks in enumerate((35, 30)):
+                student = Student.objects.create(tutor=self.tutor, full_name=f'S{i}', gender='Male', grade_level='7')
+                report = Report.objects.create(student=student, tutor=self.tutor, exam=self.exam)
+                PerformanceEntry.objects.create(report=report, subject=self.urdu, marks_obtained=marks, total_marks=50)
+                PerformanceEntry.objects.create(report=report, subject=self.math, marks_obtained=marks, total_marks=50)
+                self.reports.append(report)
+
+    def data(self, report):
+        return ReportSnapshot.objects.get(report=report).data
+
+    def test_snapshot_follows_marks_and_ranks(self):
+        data = self.data(self.reports[1])
+        self.assertEqual(data['entries']['marks_obtained'], [30, 30])
+        self.assertEqual((data['summary']['class_rank'], data['summary']['cohort_size']), (2, 2))
+        entry = PerformanceEntry.objects.get(report=self.reports[1], subject=self.math)
+        entry.marks_obtained = 50
+        with self.captureOnCommitCallbacks(execute=True):
+            entry.save()
+        data = self.data(self.reports[1])
+        self.assertEqual(data['entries']['marks_obtained'], [30, 50])
+        self.assertEqual(data['summary']['class_rank'], 1)
+        # Re-ranked only: the other report's snapshot follows too
+        self.assertEqual(self.data(self.reports[0])['summary']['class_rank'], 2)
+
+    def test_renames_refresh_snapshots(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            student = Student.objects.get(pk=self.reports[0].student_id)
+            student.full_name = 'Sana'
+            student.save()
+            self.math.name = 'Mathematics'
+            self.math.save()
+        data = self.data(self.reports[0])
+        self.assertEqual(data['student']['full_name'], 'Sana')
+        self.assertIn('Mathematics', data['entries']['subject'])
+
+    def test_load_report_reads_the_snapshot(self):
+        with self.assertNumQueries(1):
+            report, entries = load_report(self.reports[0].id)
+            html = render_report_html(report, entries, 'en')
+        self.assertIn('S0', html)
+        self.assertEqual([e.subject.name for e in entries], ['Urdu', 'Math'])
+        self.assertEqual(report.summary.percentage, 70.0)
+
+    def test_reads_match_live_tables(self):
+        with_snapshots = self.client.get('/api/reports/').data['results']
+        rows = list(session_results(self.session.id, urdu=True))
+        pdf_data = [(r.pk, r.student.full_name, [e.percentage for e in r.entries.all()])
+                    for r in bulk_reports(exam_id=self.exam.id)]
+        ReportSnapshot.objects.all().delete()
+        self.assertEqual(self.client.get('/api/reports/').data['results'], with_snapshots)
+        self.assertEqual(list(session_results(self.session.id, urdu=True)), rows)
+        self.assertEqual(
+            [(r.pk, r.student.full_name, [e.percentage for e in r.entries.all()])
+             for r in bulk_reports(exam_id=self.exam.id)],
+            pdf_data,
+        )
+        self.assertEqual(load_report(self.reports[0].id)[0].student.full_name, 'S0')
+
+    def test_rebuild_restores_snapshots(self):
+        ReportSnapshot.objects.all().delete()
+        self.assertEqual(rebuild_summaries()['report_snapshots'], 2)
+        self.assertEqual(self.data(self.reports[0])['entries']['subject'], ['Urdu', 'Math'])
+
+# Async download URLs for AsyncDownloadsTestCase (mounted only with ASYNC_DOWNLOADS in reports.urls)
+urlpatterns = [path('api/', include(async_download_urls))]
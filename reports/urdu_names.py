@@ -0,0 +1,101 @@
+"""
+Stored Urdu subject names (Subject.name_urdu).
+
+Rows are filled on save (pre_save signal, and explicitly by bulk paths that
+skip signals) using the subject_to_urdu translator, so Urdu renders just read a
+column. A stored value is only replaced while it is still the automatic one:
+if an admin corrected it, later saves keep the correction.
+
+Student.full_name_urdu and Tutor.full_name_urdu are never auto-filled: the
+subject translator reads names as "subject - topic" ("Art-Ali" comes out as
+"فن (ali)"), which is wrong for people. Admins enter them (or the importer
+reads them) and the template falls back to the English name.
+"""
+
+import re
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Subject
+from .snapshots import schedule_snapshots
+from .subject_names import subject_to_urdu
+
+# model -> (English field, Urdu field), for the models whose Urdu name is auto-filled
+NAME_FIELDS = {
+    Subject: ("name", "name_urdu"),
+}
+
+# model -> Report lookup of the snapshots that copy its Urdu name
+SNAPSHOT_LOOKUPS = {
+    Subject: "entries__subject__in",
+}
+
+_URDU_SCRIPT = re.compile(r"[\u0600-\u06FF]")
+
+
+def auto_urdu(name):
+    """Translation of `name`, or None when the translator has nothing Urdu for it."""
+    translated = subject_to_urdu(name)
+    if translated and translated != name and _URDU_SCRIPT.search(translated):
+        return translated
+    return None
+
+
+def fill_urdu_name(instance, previous_name=None):
+    """
+    Set the Urdu field of `instance` in place. Empty fields are filled; a
+    field that still equals the translation of `previous_name` (the English
+    name before this save) follows the new name. Returns True if changed.
+    """
+    name_field, urdu_field = NAME_FIELDS[type(instance)]
+    name = getattr(instance, name_field)
+    current = getattr(instance, urdu_field)
+    if current:
+        renamed = previous_name is not None and previous_name != name
+        if not (renamed and current == auto_urdu(previous_name)):
+            return False  # hand-corrected, or still matches the name
+    value = auto_urdu(name) if name else None
+    if (value or None) == (current or None):
+        return False
+    setattr(instance, urdu_field, value)
+    return True
+
+
+def _write_batch(model, objs, urdu_field):
+    if objs:
+        model.objects.bulk_update(objs, [urdu_field])
+        # bulk_update skips model signals
+        schedule_snapshots(**{SNAPSHOT_LOOKUPS[model]: [obj.pk for obj in objs]})
+
+
+def backfill_urdu_names(models=None, overwrite=False, dry_run=False, batch_size=500):
+    """
+    Fill missing Urdu names; overwrite=True recomputes every translatable row
+    (discarding hand corrections).
+    Streams each table with .iterator() and writes with bulk_update; the
+    snapshots of affected reports are rebuilt on commit.
+    Returns {model name: rows updated}.
+    """
+    counts = {}
+    with transaction.atomic():
+        for model in models or NAME_FIELDS:
+            name_field, urdu_field = NAME_FIELDS[model]
+            qs = model.objects.only("pk", name_field, urdu_field).order_by("pk")
+            if not overwrite:
+                qs = qs.filter(Q(**{f"{urdu_field}__isnull": True}) | Q(**{urdu_field: ""}))
+            pending, updated = [], 0
+            for obj in qs.iterator(chunk_size=batch_size):
+                value = auto_urdu(getattr(obj, name_field))
+                if value and value != getattr(obj, urdu_field):
+                    setattr(obj, urdu_field, value)
+                    pending.append(obj)
+                if len(pending) >= batch_size:
+                    _write_batch(model, pending, urdu_field)
+                    updated += len(pending)
+                    pending = []
+            _write_batch(model, pending, urdu_field)
+            counts[model.__name__] = updated + len(pending)
+        if dry_run:
+            transaction.set_rollback(True)
+    return counts
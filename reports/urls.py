@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import (
     TutorViewSet,
     StudentViewSet,
@@ -10,7 +12,12 @@ from .views import (
     MessageLogViewSet,
     FeedbackViewSet,
     ExamSessionViewSet,
-    StudentSessionViewSet
+    StudentSessionViewSet,
+    RenderJobViewSet,
+    ReportSummaryViewSet,
+    ExamSummaryViewSet,
+    ExamSubjectStatsViewSet,
+    ImportViewSet,
 )
 
 # DRF router to auto-generate standard CRUD endpoints
@@ -25,12 +32,26 @@ router.register(r'reports', ReportViewSet, 'report')  # <--- This enables /api/r
 router.register(r'entries', PerformanceEntryViewSet, 'entries')
 router.register(r'messages', MessageLogViewSet, 'messages')
 router.register(r'feedback', FeedbackViewSet, 'feedback')
+router.register(r'render-jobs', RenderJobViewSet, 'render-job')
+router.register(r'report-summaries', ReportSummaryViewSet, 'report-summary')
+router.register(r'exam-summaries', ExamSummaryViewSet, 'exam-summary')
+router.register(r'exam-stats', ExamSubjectStatsViewSet, 'exam-stats')
+router.register(r'imports', ImportViewSet, 'import')
 
 
+# Async views for the same download/export URLs (ASGI deployments, see reports.async_views)
+async_download_urls = [
+    path('reports/<int:pk>/pdf/', async_views.report_pdf),
+    path('render-jobs/<int:pk>/download/', async_views.render_job_download),
+    path('exam-sessions/<int:pk>/export/', async_views.session_export),
+]
+
 # Main urlpatterns - expose all endpoints under this app
 urlpatterns = [
     path('', include(router.urls)),  # All /api/<model>/ routes auto-included
 ]
+if settings.ASYNC_DOWNLOADS:
+    urlpatterns = async_download_urls + urlpatterns
 
 # --- Usage Guide ---
 # With this config, the following endpoints are available:
@@ -38,6 +59,13 @@ urlpatterns = [
 # /api/students/
 # /api/subjects/
 # /api/exams/
-# /api/reports/
-# /api/entries/
+# /api/exam-sessions/<id>/export/?output=csv|jsonl&urdu=1  (streamed results)
+# /api/reports/  (GET /api/reports/merged_pdf/?student=&session= or ?ids= for one PDF with contents;
+#                 POST /api/reports/<id>/finalize/ pre-renders en + ur, served by GET /api/reports/<id>/pdf/?lang=)
+# /api/entries/  (POST /api/entries/bulk_upsert/ for a whole mark sheet)
 # /api/messages/
+# /api/render-jobs/
+# /api/report-summaries/
+# /api/exam-summaries/
+# /api/exam-stats/
+# /api/imports/  (POST a CSV/XLSX of subjects, students or results)
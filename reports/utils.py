@@ -1,69 +1,143 @@
-import os
+import logging
 from typing import List
 from django.conf import settings
-from django.template.loader import render_to_string
 from django.http import HttpResponse
-from django.contrib.staticfiles import finders
-from weasyprint import HTML, CSS
+from weasyprint import HTML
 from .models import Report, PerformanceEntry
+from .snapshots import apply_snapshot, current_snapshot
+from .render_context import get_render_context
+from .localization import to_urdu_digits, localize_marks_table
+from .subject_names import subject_to_urdu
+from .font_subsets import FONT_FAMILY_PLACEHOLDER, FONT_URL_PLACEHOLDER, with_urdu_font
 
-# Optional: digit conversion for Urdu numerals
-def convert_to_urdu_digits(value):
-    english = "0123456789."
-    urdu    = "۰۱۲۳۴۵۶۷۸۹٫"
-    return ''.join(urdu[english.index(c)] if c in english else c for c in str(value))
-
-def _resolve_static_paths(paths: List[str]) -> List[CSS]:
-    """Resolve a list of static file paths to WeasyPrint CSS objects, skipping missing ones."""
-    css_objs = []
-    for p in paths:
-        fs_path = finders.find(p)  # e.g. "reports/css/report_style.css"
-        if fs_path and os.path.exists(fs_path):
-            css_objs.append(CSS(filename=fs_path))
-    return css_objs
-
-def generate_report_pdf(report_id, lang='en'):
+logger = logging.getLogger(__name__)
+
+REPORT_TEMPLATE = "report_template.html"
+TOC_TEMPLATE = "report_toc.html"
+BASE_CSS = "reports/css/report_style.css"
+URDU_CSS = "reports/css/report_style_ur.css"
+# "auto" uses the ReportLab fast path where it can draw the report, WeasyPrint otherwise
+PDF_ENGINES = ("weasyprint", "reportlab", "auto")
+
+# Optional: digit conversion for Urdu numerals (one translate table, see reports.localization)
+convert_to_urdu_digits = to_urdu_digits
+
+
+def _urdu_subject_name(entry):
+    # Stored on save (reports.urdu_names); translate only rows not backfilled yet
+    return entry.subject.name_urdu or subject_to_urdu(entry.subject.name)
+
+def normalize_lang(lang) -> str:
+    """Map 'en'/'english'/'ur'/'urdu' (any case) to 'en' or 'ur'."""
+    return "ur" if str(lang or "en").strip().lower() in {"ur", "urdu"} else "en"
+
+def stylesheet_paths(lang) -> List[str]:
+    """Static paths of the stylesheets used for a report in `lang`."""
+    return [BASE_CSS] + ([URDU_CSS] if normalize_lang(lang) == "ur" else [])
+
+def load_report(report_id):
     """
-    Build a PDF for the given report id.
-    - For Urdu, we include an RTL stylesheet with @font-face for Noto Nastaliq Urdu.
-    - Returns raw PDF bytes (let the view set headers/filename).
+    Fetch a report and everything its template prints: one query when it has
+    a current snapshot (reports.snapshots), else two more on the live tables
+    (summary/rank and student/tutor/exam joined, then entries with subjects).
     """
-    # 1) Fetch data
-    report = Report.objects.select_related("student", "tutor", "exam").get(id=report_id)
-    entries = PerformanceEntry.objects.filter(report=report).select_related("subject")
+    report = Report.objects.select_related("snapshot").get(id=report_id)
+    snapshot = current_snapshot(report)
+    if snapshot is not None:
+        return report, apply_snapshot(report, snapshot.data)
+    report = Report.objects.select_related("student", "tutor", "exam", "summary").get(id=report_id)
+    entries = list(PerformanceEntry.objects.filter(report=report).select_related("subject").order_by("id"))
+    return report, entries
 
-    is_ur = (str(lang or "en").lower() in {"ur", "urdu"})
-    chosen_lang = "ur" if is_ur else "en"
+def exam_display(exam):
+    """
+    What to print as "Exam: ...".
+    Prefer type (Mid Term / Final) and fall back to exam.name if type missing.
+    """
+    exam_type = getattr(exam, "exam_type", "") or ""
+    exam_name = getattr(exam, "name", "") or ""
+    return exam_type or exam_name  # <- key fix to avoid showing a subject name
 
-    # Choose what to print in the header as “Exam: …”
-    # Prefer type (Mid Term / Final) and fall back to exam.name if type missing.
-    exam_type = getattr(report.exam, "exam_type", "") or ""
-    exam_name = getattr(report.exam, "name", "") or ""
-    exam_display = exam_type or exam_name  # <- key fix to avoid showing a subject name
+def render_report_html(report, entries, lang='en', font_url=None):
+    """
+    Render the report template to an HTML string.
+    `font_url` forces the Urdu @font-face source (merged documents share one
+    font); FONT_URL_PLACEHOLDER leaves the placeholders for the caller to fill.
+    """
+    chosen_lang = normalize_lang(lang)
+    is_ur = chosen_lang == "ur"
 
-    # 2) Template & context
     # If you create a dedicated Urdu template, set template_ur = "reports/report_template_ur.html"
-    template = "report_template.html"
     context = {
         "report": report,
         "entries": entries,
         "lang": chosen_lang,
         "is_ur": is_ur,
         "convert_to_urdu_digits": convert_to_urdu_digits,
-        "exam_display": exam_display,  # <- use this in template instead of report.exam.name
+        "exam_display": exam_display(report.exam),  # <- use this in template instead of report.exam.name
+        # Urdu marks table localized in one pass instead of a filter per cell
+        "ur_rows": localize_marks_table(entries, _urdu_subject_name) if is_ur else None,
+        # Filled in after rendering with the cached font subset covering the page's characters
+        "urdu_font_url": FONT_URL_PLACEHOLDER if is_ur else "",
+        "urdu_font_family": FONT_FAMILY_PLACEHOLDER if is_ur else "",
     }
+    # Compiled once per process (see render_context)
+    html = get_render_context().template.render(context)
+    if not is_ur or font_url == FONT_URL_PLACEHOLDER:
+        return html
+    return with_urdu_font(html, font_url)
 
-    html_string = render_to_string(template, context)
+def render_html_document(html_string, lang='en', stylesheets=None):
+    """Lay out report-style HTML with the shared stylesheets and FontConfiguration."""
+    ctx = get_render_context()
+    if stylesheets is None:
+        stylesheets = ctx.stylesheets[normalize_lang(lang)]
 
-    # 3) Stylesheets
-    base_css = "reports/css/report_style.css"
-    urdu_css = "reports/css/report_style_ur.css"
-    css_files = [base_css] + ([urdu_css] if is_ur else [])
-    css_objs = _resolve_static_paths(css_files)
-
-    # 4) Base URL for resolving <img src="...">, etc.
+    # Base URL for resolving <img src="...">, etc.
     base_url = settings.STATIC_ROOT if getattr(settings, "STATIC_ROOT", None) else settings.BASE_DIR
+    return HTML(string=html_string, base_url=base_url).render(
+        stylesheets=stylesheets, font_config=ctx.font_config,
+    )
 
-    # 5) Render to PDF bytes
-    pdf_bytes = HTML(string=html_string, base_url=base_url).write_pdf(stylesheets=css_objs)
-    return pdf_bytes
+def render_report_document(report, entries, lang='en', stylesheets=None, font_url=None):
+    """
+    Lay out a report as a WeasyPrint Document (pages not yet written).
+    - For Urdu, we include an RTL stylesheet with @font-face for Noto Nastaliq Urdu.
+    - Stylesheets and fonts come from the process-level render context unless
+      `stylesheets` is given explicitly.
+    """
+    html_string = render_report_html(report, entries, lang, font_url=font_url)
+    return render_html_document(html_string, lang, stylesheets)
+
+def pdf_engine(engine=None) -> str:
+    """The engine to use: `engine` if given, else settings.REPORT_PDF_ENGINE."""
+    engine = (engine or getattr(settings, "REPORT_PDF_ENGINE", "weasyprint")).strip().lower()
+    if engine not in PDF_ENGINES:
+        raise ValueError(f"Unknown PDF engine {engine!r}; expected one of {', '.join(PDF_ENGINES)}.")
+    return engine
+
+def render_report_pdf(report, entries, lang='en', stylesheets=None, engine=None):
+    """
+    Render already-loaded report data to PDF bytes.
+    - engine="reportlab" draws the fixed layout directly (reports.fast_pdf) and
+      raises FastPathUnavailable if it can't; "auto" falls back to WeasyPrint then.
+    """
+    engine = pdf_engine(engine)
+    if engine != "weasyprint":
+        from .fast_pdf import FastPathUnavailable, render_report_pdf_fast
+        try:
+            return render_report_pdf_fast(report, entries, lang)
+        except FastPathUnavailable as exc:
+            if engine == "reportlab":
+                raise
+            logger.debug("Report %s (%s) rendered with WeasyPrint: %s", report.pk, lang, exc)
+    return render_report_document(report, entries, lang, stylesheets).write_pdf()
+
+def generate_report_pdf(report_id, lang='en', engine=None):
+    """
+    Build a PDF for the given report id.
+    - Returns raw PDF bytes (let the view set headers/filename).
+    - `engine`: "weasyprint", "reportlab" or "auto" (default: settings.REPORT_PDF_ENGINE).
+    """
+    report, entries = load_report(report_id)
+    return render_report_pdf(report, entries, lang=lang, engine=engine)
@@ -1,68 +1,209 @@
+from django.db.models import Prefetch
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.http import HttpResponse, FileResponse
-from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from .models import (
     Tutor, Student, Subject, Exam, Report,
-    PerformanceEntry, MessageLog, Feedback, ExamSession, StudentSession
+    PerformanceEntry, MessageLog, Feedback, ExamSession, StudentSession, RenderJob,
+    ReportSummary, ExamSummary, ExamSubjectStats,
 )
 from .serializers import (
     TutorSerializer, StudentSerializer, SubjectSerializer, ExamSerializer,
-    ReportSerializer, PerformanceEntrySerializer, MessageLogSerializer, FeedbackSerializer, ExamSessionSerializer, StudentSessionSerializer
+    ReportSerializer, PerformanceEntrySerializer, MessageLogSerializer, FeedbackSerializer, ExamSessionSerializer, StudentSessionSerializer,
+    RenderJobSerializer, ReportSummarySerializer, ExamSummarySerializer, ExamSubjectStatsSerializer,
+    MarkSheetSerializer,
 )
-from .utils import generate_report_pdf
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+from django.utils.http import parse_etags
+from .pdf_cache import report_fingerprint, get_or_render_pdf
+from .render_queue import enqueue_render
+from .scoping import IsStaffOrReadOnly, TutorScopedMixin, is_unscoped, scope_queryset, scope_tutor_id
+from .response_cache import CachedResponseMixin
+from .snapshots import attach_snapshots
+from .renditions import current_rendition, finalize_report, render_rendition
+from .utils import normalize_lang
+from .bulk import bulk_reports, iter_rendered, stream_zip, render_merged_pdf
+from .analytics import student_progress_rows, summarize_progress
+from .pagination import KeysetOrPagePagination
+from .marks import upsert_mark_sheet
+from .export import iter_csv, iter_jsonl
+from .importer import KINDS as IMPORT_KINDS, ImportFileError, import_file
+from rest_framework.parsers import MultiPartParser, FormParser
 import logging
 
 logger = logging.getLogger(__name__)
 
-class ExamSessionViewSet(viewsets.ModelViewSet):
+# Merged documents are laid out in-process; keep one request bounded
+MERGED_PDF_MAX_REPORTS = 200
+
+
+def _bulk_pdf_response(request, reports, basename):
+    """
+    Shared body of the exam/session bulk_pdf actions.
+    ?lang=en|ur  ?output=zip (streamed, default) | pdf (one merged document)
+    """
+    if not reports:
+        return Response({'detail': 'No reports found.'}, status=status.HTTP_404_NOT_FOUND)
+    lang = normalize_lang(request.query_params.get('lang'))
+    output = (request.query_params.get('output') or 'zip').lower()
+
+    def log_progress(done, total, report):
+        if done == total or done % 25 == 0:
+            logger.info("bulk %s: rendered %s/%s (%s)", basename, done, total, lang)
+
+    if output == 'pdf':
+        pdf_bytes = render_merged_pdf(reports, lang, progress=log_progress)
+        resp = HttpResponse(pdf_bytes, content_type='application/pdf')
+        resp['Content-Disposition'] = f'attachment; filename="{basename}_{lang}.pdf"'
+        return resp
+
+    workers = getattr(settings, 'REPORT_BULK_WORKERS', 2)
+    rendered = iter_rendered(reports, lang, workers=workers, progress=log_progress)
+    resp = StreamingHttpResponse(stream_zip(rendered, lang), content_type='application/zip')
+    resp['Content-Disposition'] = f'attachment; filename="{basename}_{lang}.zip"'
+    resp['X-Report-Count'] = str(len(reports))
+    return resp
+
+def session_export_rows(session_id, params, tutor_id):
+    """(rows, output, content_type) for ?output=csv|jsonl&urdu=1, or None for an unknown output."""
+    output = (params.get('output') or 'csv').lower()
+    urdu = params.get('urdu') in ('1', 'true', 'yes')
+    if output == 'jsonl':
+        return iter_jsonl(session_id, urdu, tutor_id), output, 'application/x-ndjson; charset=utf-8'
+    if output == 'csv':
+        return iter_csv(session_id, urdu, tutor_id), output, 'text/csv; charset=utf-8'
+    return None
+
+
+def export_response(rows, session_id, output, content_type):
+    resp = StreamingHttpResponse(rows, content_type=content_type)
+    resp['Content-Disposition'] = f'attachment; filename="session_{session_id}_results.{output}"'
+    return resp
+
+
+def visible_students(request, student_id):
+    """The ?student= filter as a subquery, limited to students the requesting tutor may see."""
+    if not str(student_id).isdigit():
+        return Student.objects.none()
+    return scope_queryset(Student.objects.filter(pk=student_id), request.user).values("pk")
+
+
+def report_file_response(report, pdf_file):
+    """The last file written by the render queue for an unfinalized report."""
+    response = FileResponse(pdf_file, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename=report_{report.id}.pdf'
+    return response
+
+
+def rendition_response(report, rendition, pdf_file, lang, fresh):
+    response = FileResponse(pdf_file, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="report_{report.id}_{lang}.pdf"'
+    response['Content-Language'] = lang
+    response['X-Snapshot-Version'] = str(rendition.version)
+    response['X-Rendition'] = 'stored' if fresh else 'rendered'
+    return response
+
+
+def job_file_response(report, job, pdf_file):
+    response = FileResponse(pdf_file, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename=report_{report.id}_{job.lang}.pdf'
+    return response
+
+
+# Sessions, exams and subjects are shared by every tutor: any tutor reads, staff write.
+# Everything tied to a student is scoped to the requesting tutor (reports.scoping).
+# The catalogs and tutors are read on every page load: their GETs are cached
+# (reports.response_cache) until a save/delete of `cache_models`.
+
+class ExamSessionViewSet(CachedResponseMixin, viewsets.ModelViewSet):
+    permission_classes = [IsStaffOrReadOnly]
     queryset = ExamSession.objects.all().order_by('name')
     serializer_class = ExamSessionSerializer
+    cache_ttl = 60 * 60
+    cache_models = (ExamSession, StudentSession)  # ?student= follows enrollments
+    tutor_scoped_params = ('student',)
 
-    # optional filter: /api/exam-sessions/?student=<id>
+    # optional filter: /api/exam-sessions/?student=<id> (one of the tutor's own students)
     def get_queryset(self):
         qs = super().get_queryset()
         student_id = self.request.query_params.get('student')
         if student_id:
-            qs = qs.filter(enrollments__student_id=student_id).distinct()
+            qs = qs.filter(enrollments__student__in=visible_students(self.request, student_id)).distinct()
         return qs
 
-class StudentSessionViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'], url_path='bulk_pdf', permission_classes=[IsAuthenticated])
+    def bulk_pdf(self, request, pk=None):
+        """GET /api/exam-sessions/<pk>/bulk_pdf/?lang=en|ur&output=zip|pdf"""
+        session = self.get_object()
+        reports = bulk_reports(session_id=session.pk, tutor_id=scope_tutor_id(request.user))
+        return _bulk_pdf_response(request, reports, f"session_{session.pk}")
+
+    @action(detail=True, methods=['get'], url_path='export', permission_classes=[IsAuthenticated])
+    def export(self, request, pk=None):
+        """
+        GET /api/exam-sessions/<pk>/export/?output=csv|jsonl&urdu=1
+        Streams every result of the session (student, tutor, exam, subject, marks).
+        """
+        session = self.get_object()
+        export = session_export_rows(session.pk, request.query_params, scope_tutor_id(request.user))
+        if export is None:
+            return Response({'detail': "output must be csv or jsonl."}, status=status.HTTP_400_BAD_REQUEST)
+        rows, output, content_type = export
+        return export_response(rows, session.pk, output, content_type)
+
+class StudentSessionViewSet(TutorScopedMixin, viewsets.ModelViewSet):
     queryset = StudentSession.objects.select_related('student','session')
     serializer_class = StudentSessionSerializer
 
 
-class TutorViewSet(viewsets.ModelViewSet):
-    queryset = Tutor.objects.all().select_related("user")
+class TutorViewSet(CachedResponseMixin, TutorScopedMixin, viewsets.ModelViewSet):
+    """A tutor sees and edits only their own profile; sign-up (POST) stays open."""
+    queryset = Tutor.objects.all().select_related("user").order_by("id")
     serializer_class = TutorSerializer
+    cache_ttl = 5 * 60
 
+    def get_permissions(self):
+        if self.action == 'create':
+            return [AllowAny()]
+        return super().get_permissions()
 
-class StudentViewSet(viewsets.ModelViewSet):
+
+class StudentViewSet(TutorScopedMixin, viewsets.ModelViewSet):
     queryset = Student.objects.all().select_related("tutor")
     serializer_class = StudentSerializer
 
 
-class SubjectViewSet(viewsets.ModelViewSet):
+class SubjectViewSet(CachedResponseMixin, viewsets.ModelViewSet):
+    permission_classes = [IsStaffOrReadOnly]
     serializer_class = SubjectSerializer
     queryset = Subject.objects.all() 
+    cache_ttl = 60 * 60
+    cache_models = (Subject, Student.subjects.through)  # ?student= follows Student.subjects
+    tutor_scoped_params = ("student",)
 
     def get_queryset(self):
         qs = Subject.objects.all()
         student_id = self.request.query_params.get("student")
         if student_id:
-            qs = qs.filter(students__id=student_id)  # ← ONLY subjects linked to that student
+            # ← ONLY subjects linked to that student, if it is one of the tutor's own
+            qs = qs.filter(students__in=visible_students(self.request, student_id))
         return qs.order_by("name")
 
 
 
-class ExamViewSet(viewsets.ModelViewSet):
+class ExamViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     """
     Keep `.queryset` so DRF can auto-derive a basename.
     We still override `get_queryset()` for runtime filtering.
     """
+    permission_classes = [IsStaffOrReadOnly]
     queryset = Exam.objects.all()  # <-- IMPORTANT for DRF router
     serializer_class = ExamSerializer
+    cache_ttl = 15 * 60
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -80,11 +221,44 @@ class ExamViewSet(viewsets.ModelViewSet):
 
         return qs
 
+    @action(detail=True, methods=['get'], url_path='bulk_pdf', permission_classes=[IsAuthenticated])
+    def bulk_pdf(self, request, pk=None):
+        """GET /api/exams/<pk>/bulk_pdf/?lang=en|ur&output=zip|pdf"""
+        exam = self.get_object()
+        reports = bulk_reports(exam_id=exam.pk, tutor_id=scope_tutor_id(request.user))
+        return _bulk_pdf_response(request, reports, f"exam_{exam.pk}")
 
-class ReportViewSet(viewsets.ModelViewSet):
-    permission_classes = [IsAuthenticated]
-    queryset = Report.objects.all().select_related("student", "tutor", "exam")
+
+class ReportViewSet(TutorScopedMixin, viewsets.ModelViewSet):
+    queryset = Report.objects.all().select_related("student", "tutor", "exam", "summary").order_by("id")
     serializer_class = ReportSerializer
+    pagination_class = KeysetOrPagePagination
+    keyset_ordering = '-id'
+
+    # Read from the report snapshots (reports.snapshots) instead of the live tables
+    snapshot_actions = ('list', 'retrieve', 'generate_pdf')
+
+    def get_queryset(self):
+        """
+        Reads join each report's snapshot, which holds its names, summary and
+        entries: one query per page or report. Other actions get entries
+        (+ subject) from one prefetch query instead of one query per report.
+        """
+        qs = super().get_queryset()
+        if self.action in self.snapshot_actions:
+            return qs.select_related(None).select_related("snapshot")
+        entries = PerformanceEntry.objects.select_related("subject").order_by("id")
+        return qs.prefetch_related(Prefetch("entries", queryset=entries))
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        return attach_snapshots(page) if page is not None else None
+
+    def get_object(self):
+        report = super().get_object()
+        if self.action in self.snapshot_actions:
+            attach_snapshots([report])
+        return report
 
     @action(detail=True, methods=['get'], url_path='generate_pdf')
     def generate_pdf(self, request, pk=None):
@@ -95,54 +269,158 @@ class ReportViewSet(viewsets.ModelViewSet):
 
         # Ensure report exists (respects queryset filters/permissions)
         try:
-            self.get_object()
+            report = self.get_object()
         except Exception as e:
             logger.exception("Report not found: %s", pk)
             return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
 
+        # Content address: same data + template + CSS + lang => same bytes
+        entries = list(report.entries.all())  # from the snapshot (attach_snapshots in get_object())
+        fingerprint = report_fingerprint(report, entries, lang)
+        etag = f'"{fingerprint}"'
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            resp = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            resp['ETag'] = etag
+            return resp
+
         try:
-            pdf_bytes = generate_report_pdf(pk, lang=lang)
+            pdf_bytes, _, hit = get_or_render_pdf(report, entries, lang, fingerprint)
         except Exception as e:
             logger.exception("PDF generation failed for report=%s lang=%s", pk, lang)
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        # Wrap bytes with language-aware headers and cache-busting filename
+        # Wrap bytes with language-aware headers; clients may keep a private copy but must revalidate
         resp = HttpResponse(pdf_bytes, content_type='application/pdf')
         resp['Content-Disposition'] = f'attachment; filename="report_{pk}_{lang}.pdf"'
         resp['Content-Language'] = lang
-        resp['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-        resp['Pragma'] = 'no-cache'
+        resp['ETag'] = etag
+        resp['Cache-Control'] = 'private, no-cache'
+        resp['X-PDF-Cache'] = 'hit' if hit else 'miss'
+        return resp
+
+    @action(detail=True, methods=['post'], url_path='render')
+    def queue_render(self, request, pk=None):
+        """POST /api/reports/<pk>/render/?lang=en|ur -> queue a background render"""
+        report = self.get_object()
+        lang = normalize_lang(request.data.get('lang') or request.query_params.get('lang'))
+        job, created = enqueue_render(report.pk, lang)
+        data = RenderJobSerializer(job).data
+        data['status_url'] = request.build_absolute_uri(reverse('render-job-detail', args=[job.pk]))
+        return Response(data, status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='merged_pdf')
+    def merged_pdf(self, request):
+        """
+        GET /api/reports/merged_pdf/?student=<id>&session=<id>&lang=en|ur
+        GET /api/reports/merged_pdf/?ids=3,5,8&lang=en|ur
+        One PDF with a contents page, then each report (fonts/CSS embedded once).
+        """
+        params = request.query_params
+        ids, student_id, session_id = params.get('ids'), params.get('student'), params.get('session')
+        try:
+            report_ids = [int(i) for i in ids.split(',') if i.strip()] if ids else None
+            student_id = int(student_id) if student_id else None
+            session_id = int(session_id) if session_id else None
+        except ValueError:
+            return Response({'detail': 'ids, student and session must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not (report_ids or (student_id and session_id)):
+            return Response({'detail': "Pass ?ids=1,2,3 or ?student=<id>&session=<id>."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if report_ids and len(report_ids) > MERGED_PDF_MAX_REPORTS:
+            return Response({'detail': f'At most {MERGED_PDF_MAX_REPORTS} reports per document.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        reports = bulk_reports(
+            student_id=student_id, session_id=session_id, report_ids=report_ids,
+            tutor_id=scope_tutor_id(request.user),
+        )
+        if not reports:
+            return Response({'detail': 'No reports found.'}, status=status.HTTP_404_NOT_FOUND)
+        lang = normalize_lang(params.get('lang'))
+        pdf_bytes = render_merged_pdf(reports, lang, toc=True)
+        name = f"student_{student_id}_session_{session_id}" if student_id else f"reports_{len(reports)}"
+        resp = HttpResponse(pdf_bytes, content_type='application/pdf')
+        resp['Content-Disposition'] = f'attachment; filename="{name}_{lang}.pdf"'
+        resp['X-Report-Count'] = str(len(reports))
         return resp
 
     @action(detail=False, methods=['get'], url_path=r'student_progress/(?P<student_id>[^/.]+)')
     def student_progress(self, request, student_id=None):
-        entries = (
-            PerformanceEntry.objects
-            .filter(report__student__id=student_id)
-            .select_related("report__exam", "subject")
-            .order_by("report__exam__date", "subject__name")
+        """
+        GET /api/reports/student_progress/<student_id>/
+            ?session=<id>&exam_type=<type>&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD&summary=1
+        Percentages, ranks and per-subject aggregates are computed in one query.
+        """
+        student = scope_queryset(Student.objects.filter(pk=student_id), request.user) if student_id.isdigit() else None
+        if not (student and student.exists()):
+            return Response({'detail': 'Student not found.'}, status=status.HTTP_404_NOT_FOUND)
+        params = request.query_params
+        dates = {}
+        for key in ('date_from', 'date_to'):
+            if params.get(key):
+                dates[key] = parse_date(params[key])
+                if dates[key] is None:
+                    return Response({key: 'Use YYYY-MM-DD.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = student_progress_rows(
+            student_id,
+            session_id=params.get('session'),
+            exam_type=params.get('exam_type'),
+            **dates,
         )
         data = {}
-        for entry in entries:
-            subject = entry.subject.name
-            data.setdefault(subject, []).append({
-                'exam': entry.report.exam.name,
-                'exam_type': entry.report.exam.exam_type,   # <- include type
-                'date': entry.report.exam.date,
-                'marks_obtained': entry.marks_obtained,
-                'total_marks': entry.total_marks,
-                'percentage': entry.percentage,
+        for row in rows:
+            data.setdefault(row['subject__name'], []).append({
+                'exam': row['report__exam__name'],
+                'exam_type': row['report__exam__exam_type'],   # <- include type
+                'date': row['report__exam__date'],
+                'marks_obtained': row['marks_obtained'],
+                'total_marks': row['total_marks'],
+                'percentage': row['pct'],
+                'delta': None if row['prev_pct'] is None else row['pct'] - row['prev_pct'],
+                'rank': row['rank'],
+                'ranked_of': row['ranked_of'],
             })
+        if params.get('summary') in ('1', 'true'):
+            return Response({'series': data, 'summary': summarize_progress(rows)})
         return Response(data)
 
     @action(detail=True, methods=['get'], url_path='pdf')
     def pdf(self, request, pk=None):
+        """
+        GET /api/reports/<pk>/pdf/?lang=en|ur
+        Finalized reports: the stored rendition of the current snapshot version
+        (rendered now and stored if the background render hasn't caught up yet).
+        Other reports: the last file written by the render queue.
+        """
         report = self.get_object()
-        if not report.pdf_file:
-            return Response({'detail': 'PDF not generated for this report.'}, status=404)
-        response = FileResponse(report.pdf_file.open('rb'), content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename=report_{report.id}.pdf'
-        return response
+        if not report.finalized_at:
+            if not report.pdf_file:
+                return Response({'detail': 'PDF not generated for this report.'}, status=404)
+            return report_file_response(report, report.pdf_file.open('rb'))
+
+        lang = normalize_lang(request.query_params.get('lang'))
+        rendition = current_rendition(report, lang)
+        fresh = rendition is not None
+        if not fresh:
+            try:
+                rendition = render_rendition(report.pk, lang)
+            except Exception as e:
+                logger.exception("PDF generation failed for report=%s lang=%s", pk, lang)
+                return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return rendition_response(report, rendition, rendition.file.open('rb'), lang, fresh)
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        """POST /api/reports/<pk>/finalize/ -> snapshot the report and pre-render en + ur in the background"""
+        report = self.get_object()
+        finalize_report(report.pk)
+        report.refresh_from_db(fields=['finalized_at', 'snapshot_version'])
+        return Response(
+            {'id': report.pk, 'finalized_at': report.finalized_at, 'snapshot_version': report.snapshot_version},
+            status=status.HTTP_202_ACCEPTED,
+        )
 
     @action(detail=True, methods=['post'])
     def send_report(self, request, pk=None):
@@ -158,23 +436,147 @@ class ReportViewSet(viewsets.ModelViewSet):
             return Response({"error": "Invalid method"}, status=400)
 
 
-class PerformanceEntryViewSet(viewsets.ModelViewSet):
+class RenderJobViewSet(TutorScopedMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    GET /api/render-jobs/<id>/           -> job status
+    GET /api/render-jobs/<id>/download/  -> the rendered PDF once status == done
+    """
+    queryset = RenderJob.objects.select_related("report").order_by("-created_at")
+    serializer_class = RenderJobSerializer
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        report_id = self.request.query_params.get("report")
+        if report_id:
+            qs = qs.filter(report_id=report_id)
+        return qs
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != RenderJob.DONE:
+            return Response(RenderJobSerializer(job).data, status=status.HTTP_409_CONFLICT)
+        report = job.report
+        if not report.pdf_file:
+            return Response({'detail': 'Rendered file is missing.'}, status=404)
+        return job_file_response(report, job, report.pdf_file.open('rb'))
+
+
+class ImportViewSet(viewsets.ViewSet):
+    """
+    POST /api/imports/  (multipart)
+      file=<csv|xlsx>  kind=subjects|students|results  dry_run=1 (optional)
+    Streams the upload row by row (see reports.importer); returns counts,
+    per-line errors and throughput. Subjects are a shared catalog, so only
+    staff import them (as with IsStaffOrReadOnly on SubjectViewSet).
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def create(self, request):
+        upload = request.FILES.get('file')
+        kind = request.data.get('kind')
+        if upload is None or kind not in IMPORT_KINDS:
+            return Response(
+                {'detail': f"Send a 'file' and a 'kind' ({', '.join(IMPORT_KINDS)})."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if kind == 'subjects' and not is_unscoped(request.user):
+            return Response({'detail': 'Only staff can import subjects.'}, status=status.HTTP_403_FORBIDDEN)
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        try:
+            result = import_file(upload, upload.name, kind, dry_run=dry_run, tutor_id=scope_tutor_id(request.user))
+        except ImportFileError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
+
+
+class ReportSummaryViewSet(TutorScopedMixin, viewsets.ReadOnlyModelViewSet):
+    """Precomputed per-report totals. Filters: ?exam=<id>&student=<id>"""
+    queryset = ReportSummary.objects.select_related("report__student").order_by("report_id")
+    serializer_class = ReportSummarySerializer
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        exam_id = self.request.query_params.get("exam")
+        student_id = self.request.query_params.get("student")
+        if exam_id:
+            qs = qs.filter(report__exam_id=exam_id)
+        if student_id:
+            qs = qs.filter(report__student_id=student_id)
+        return qs
+
+
+class ExamSummaryViewSet(viewsets.ReadOnlyModelViewSet):
+    """Precomputed per-exam distributions (whole cohorts, no per-student rows). Filter: ?session=<id>"""
+    permission_classes = [IsAuthenticated]
+    queryset = ExamSummary.objects.select_related("exam").order_by("-exam__date")
+    serializer_class = ExamSummarySerializer
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        session_id = self.request.query_params.get("session")
+        if session_id:
+            qs = qs.filter(exam__session_id=session_id)
+        return qs
+
+
+class ExamSubjectStatsViewSet(viewsets.ReadOnlyModelViewSet):
+    """Precomputed per-exam, per-subject distributions. Filters: ?exam=<id>&subject=<id>"""
+    permission_classes = [IsAuthenticated]
+    queryset = ExamSubjectStats.objects.select_related("subject").order_by("exam_id", "subject__name")
+    serializer_class = ExamSubjectStatsSerializer
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        exam_id = self.request.query_params.get("exam")
+        subject_id = self.request.query_params.get("subject")
+        if exam_id:
+            qs = qs.filter(exam_id=exam_id)
+        if subject_id:
+            qs = qs.filter(subject_id=subject_id)
+        return qs
+
+
+class PerformanceEntryViewSet(TutorScopedMixin, viewsets.ModelViewSet):
     serializer_class = PerformanceEntrySerializer
     queryset = PerformanceEntry.objects.select_related("subject", "report", "report__exam")
+    pagination_class = KeysetOrPagePagination
+    keyset_ordering = 'id'
     
     def get_queryset(self):
-        qs = PerformanceEntry.objects.select_related("subject", "report", "report__exam")
+        qs = super().get_queryset()
         report_id = self.request.query_params.get("report")
         if report_id:
             qs = qs.filter(report_id=report_id)      # ← ONLY entries for this report
         return qs.order_by("id")
 
-class MessageLogViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'], url_path='bulk_upsert')
+    def bulk_upsert(self, request):
+        """
+        POST /api/entries/bulk_upsert/
+        Upsert a whole mark sheet in one transaction; bad rows come back in
+        "errors" (by index) without rejecting the rest.
+        """
+        envelope = MarkSheetSerializer(data=request.data)
+        envelope.is_valid(raise_exception=True)
+        result = upsert_mark_sheet(
+            envelope.validated_data['entries'],
+            report_id=envelope.validated_data.get('report'),
+            exam_id=envelope.validated_data.get('exam'),
+            tutor_id=scope_tutor_id(request.user),
+        )
+        written = result['created'] + result['updated']
+        return Response(result, status=status.HTTP_200_OK if written else status.HTTP_400_BAD_REQUEST)
+
+class MessageLogViewSet(TutorScopedMixin, viewsets.ModelViewSet):
     queryset = MessageLog.objects.all().select_related("student")
     serializer_class = MessageLogSerializer
+    pagination_class = KeysetOrPagePagination
+    keyset_ordering = '-id'
 
 
-class FeedbackViewSet(viewsets.ModelViewSet):
+class FeedbackViewSet(TutorScopedMixin, viewsets.ModelViewSet):
     queryset = Feedback.objects.all().select_related("tutor")
     serializer_class = FeedbackSerializer
 